@@ -0,0 +1,138 @@
+import json
+from typing import Dict, Iterable, Iterator, List, Optional
+from html_templates import HTMLTemplates, PROGRAM_PAGE_TEMPLATE
+from models import Day, Week
+
+class AppShell:
+    """Single-page output: one program data file, one shell page and a redirect per week.
+
+    Pages differ only in their workout data, so the shell carries the
+    skeleton, styles and navigation once and renders any week client-side
+    from program.json with the same markup ProgramPageRenderer produces.
+    Training days repeat from week to week, so the data file lists each
+    distinct day once and weeks refer to their days by index.
+    """
+
+    DATA_FILENAME = "program.json"
+    SHELL_FILENAME = "app.html"
+    FORMAT = 1
+
+    @staticmethod
+    def iter_data_file(weeks: Iterable[Week]) -> Iterator[str]:
+        """Yields the program data: a [week, date, bar, gear, day indexes] row per week, then the days table"""
+        day_index: Dict[Day, int] = {}
+        days: List[List] = []
+        yield f'{{"format":{AppShell.FORMAT},"weeks":['
+        separator = ''
+        for week in weeks:
+            indexes = []
+            for day in week.days:
+                index = day_index.get(day)
+                if index is None:
+                    index = day_index[day] = len(days)
+                    days.append([day.name, day.to_dict()])
+                indexes.append(index)
+            yield separator + json.dumps([week.number, week.date, week.bar_type, week.gear, indexes],
+                                         separators=(',', ':'))
+            separator = ','
+        yield '],"days":'
+        yield json.dumps(days, separators=(',', ':'))
+        yield '}'
+
+    @staticmethod
+    def render_shell(stylesheet: Optional[str] = None) -> str:
+        """Renders the shell page; CSS is inlined or linked like the program pages"""
+        styles, body_attrs = HTMLTemplates.page_styles(
+            stylesheet, HTMLTemplates.generate_css(), HTMLTemplates.PROGRAM_PAGE_CLASS
+        )
+        return PROGRAM_PAGE_TEMPLATE.render(
+            week="1",
+            styles=styles,
+            body_attrs=body_attrs,
+            nav_links=('<div class="week-links">\n<select class="week-select"></select>\n'
+                       '<a class="nav-link" data-step="-1"></a>\n<a class="nav-link" data-step="1"></a>\n</div>'),
+            content=('<div class="week-content"><noscript>This program needs JavaScript; '
+                     'see the <a href="index.html">index</a>.</noscript></div>\n'
+                     f'<script>{SHELL_SCRIPT}</script>')
+        )
+
+    @staticmethod
+    def render_redirect(week: Week) -> str:
+        """Renders the stub that keeps a week's old page URL working"""
+        target = f"{AppShell.SHELL_FILENAME}#{week.date}"
+        return (
+            '<!DOCTYPE html>\n<html lang="en"><head><meta charset="UTF-8">'
+            f'<title>Powerlifting Program - Week {week.number}</title>'
+            f'<meta http-equiv="refresh" content="0; url={target}">'
+            f'<link rel="canonical" href="{target}">'
+            f"<script>location.replace('{target}')</script></head>\n"
+            f'<body><a href="{target}">Week {week.number} - {week.date}</a></body></html>\n'
+        )
+
+# Mirrors ProgramPageRenderer.render_week_header, render_day and _render_list_section
+SHELL_SCRIPT = """
+(function () {
+    var select = document.querySelector('.week-select');
+    var steps = document.querySelectorAll('.nav-link[data-step]');
+    var content = document.querySelector('.week-content');
+    var program = null;
+
+    function listSection(key, items) {
+        var html = '<div class="workout-section"><h4>' + key + ':</h4><ul>\\n';
+        for (var i = 0; i < items.length; i++) {
+            html += items[i].charAt(0) === '-' ? '<li class="sub-item">' + items[i].slice(2) + '</li>\\n'
+                                               : '<li>' + items[i] + '</li>\\n';
+        }
+        return html + '</ul></div>';
+    }
+    function renderDay(name, workout) {
+        var parts = ['<div class="workout-day"><h3>' + name + '</h3>'];
+        for (var key in workout) {
+            var value = workout[key];
+            parts.push(Array.isArray(value) ? listSection(key, value)
+                       : '<div class="workout-section"><h4>' + key + ':</h4><p>' + value + '</p></div>');
+        }
+        parts.push('</div>');
+        return parts.join('\\n');
+    }
+    function render() {
+        var date = decodeURIComponent(location.hash.slice(1)), index = 0;
+        for (var i = 0; i < program.weeks.length; i++) {
+            if (program.weeks[i][1] === date) { index = i; break; }
+        }
+        var week = program.weeks[index];
+        var html = '<div class="week-header">\\n<h2>Week ' + week[0] + ' - ' + week[1] + '</h2>\\n' +
+            '<div class="program-meta">\\n<p><strong>Bar:</strong> ' + week[2] + '</p>\\n' +
+            '<p><strong>Gear:</strong> ' + week[3] + '</p>\\n</div>\\n</div>';
+        for (var d = 0; d < week[4].length; d++) {
+            var day = program.days[week[4][d]];
+            html += '\\n' + renderDay(day[0], day[1]);
+        }
+        content.innerHTML = html;
+        document.title = 'Powerlifting Program - Week ' + week[0];
+        select.value = week[1];
+        for (var s = 0; s < steps.length; s++) {
+            var step = Number(steps[s].getAttribute('data-step')), other = program.weeks[index + step];
+            steps[s].style.display = other ? '' : 'none';
+            if (other) {
+                steps[s].href = '#' + other[1];
+                steps[s].textContent = step < 0 ? '\\u2190 Week ' + other[0] : 'Week ' + other[0] + ' \\u2192';
+            }
+        }
+    }
+
+    fetch('""" + AppShell.DATA_FILENAME + """').then(function (response) { return response.json(); })
+        .then(function (data) {
+            program = data;
+            var options = '';
+            for (var i = 0; i < data.weeks.length; i++) {
+                options += '<option value="' + data.weeks[i][1] + '">Week ' + data.weeks[i][0] + ' - ' +
+                    data.weeks[i][1] + '</option>';
+            }
+            select.innerHTML = options;
+            select.onchange = function () { location.hash = select.value; };
+            window.addEventListener('hashchange', render);
+            render();
+        });
+})();
+"""
@@ -0,0 +1,86 @@
+"""Bytes and first-load cost of the app layout against one page per week.
+
+Builds both layouts for programs of growing length and reports the total
+bytes written (raw and gzipped), the bytes and requests needed to show
+the first week, and what each further week costs. First-load time is
+modelled from those numbers on a fixed connection rather than measured
+in a browser.
+
+    python -m benchmarks.bench_app
+"""
+import contextlib
+import gzip
+import io
+import os
+import tempfile
+import time
+from typing import Dict, List
+from app_shell import AppShell
+from build_manifest import BuildManifest
+from main import ProgramGenerator
+
+SIZES = [24, 104, 520]
+# A slow mobile connection: round trip per request and bytes per second
+ROUND_TRIP_SECONDS = 0.15
+BYTES_PER_SECOND = 1.6e6 / 8
+
+def sizes(output_dir: str) -> Dict[str, int]:
+    raw = compressed = 0
+    for name in os.listdir(output_dir):
+        if name == BuildManifest.FILENAME:
+            continue
+        with open(os.path.join(output_dir, name), 'rb') as f:
+            data = f.read()
+        raw += len(data)
+        compressed += len(gzip.compress(data))
+    return {"bytes": raw, "gzip bytes": compressed}
+
+def gzip_size(path: str) -> int:
+    with open(path, 'rb') as f:
+        return len(gzip.compress(f.read()))
+
+def modelled_seconds(requests: int, size: int) -> float:
+    return requests * ROUND_TRIP_SECONDS + size / BYTES_PER_SECOND
+
+def run(weeks_list: List[int] = SIZES) -> List[Dict]:
+    results = []
+    for weeks in weeks_list:
+        for layout in ProgramGenerator.LAYOUTS:
+            with tempfile.TemporaryDirectory() as output_dir:
+                generator = ProgramGenerator(total_weeks=weeks, incremental=False, output_dir=output_dir,
+                                             layout=layout)
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    generator.generate_program()
+                build_seconds = time.perf_counter() - start
+                first_page = os.path.join(output_dir, f"{generator.program_builder.build_week_model(1).date}-program.html")
+                if layout == ProgramGenerator.APP:
+                    # Entering through a week URL costs the stub, then the shell and its data
+                    first = [first_page, os.path.join(output_dir, AppShell.SHELL_FILENAME),
+                             os.path.join(output_dir, AppShell.DATA_FILENAME)]
+                    further = 0
+                else:
+                    first = [first_page]
+                    further = gzip_size(first_page)
+                first_bytes = sum(gzip_size(path) for path in first)
+                results.append({
+                    "weeks": weeks, "layout": layout, "build seconds": build_seconds, **sizes(output_dir),
+                    "first load requests": len(first), "first load gzip bytes": first_bytes,
+                    "first load ms": modelled_seconds(len(first), first_bytes) * 1000,
+                    "next week gzip bytes": further,
+                })
+    return results
+
+def main():
+    print(f"{'weeks':>6} {'layout':<7}{'total':>11}{'gzip':>10}{'first load':>12}{'reqs':>6}"
+          f"{'model ms':>10}{'next week':>11}{'build s':>9}")
+    for result in run():
+        print(f"{result['weeks']:>6} {result['layout']:<7}{result['bytes']:>11,}{result['gzip bytes']:>10,}"
+              f"{result['first load gzip bytes']:>12,}{result['first load requests']:>6}"
+              f"{result['first load ms']:>10.0f}{result['next week gzip bytes']:>11,}"
+              f"{result['build seconds']:>9.2f}")
+    print(f"first load and next week are gzipped bytes; model: {ROUND_TRIP_SECONDS * 1000:.0f} ms per request, "
+          f"{BYTES_PER_SECOND * 8 / 1e6:g} Mbit/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Loading a program definition cold, from the compiled cache and from memory.
+
+Cold loads parse, validate and compile the bundled definition; cached
+loads read the compiled tables back from disk; repeat loads in one
+process only stat the file. Also reports how fast weeks are then built
+from the compiled tables.
+
+    python -m benchmarks.bench_definitions
+"""
+import os
+import tempfile
+import time
+from typing import Dict
+from program_builder import ProgramBuilder
+from program_definition import DEFAULT_DEFINITION, ProgramCache
+
+LOADS = 200
+WEEKS = 100000
+
+def per_load_us(load, count: int = LOADS) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        load()
+    return (time.perf_counter() - start) / count * 1e6
+
+def run() -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        def cold():
+            for name in os.listdir(cache_dir):
+                os.remove(os.path.join(cache_dir, name))
+            ProgramCache(cache_dir).load(DEFAULT_DEFINITION)
+
+        cold_us = per_load_us(cold)
+        cached_us = per_load_us(lambda: ProgramCache(cache_dir).load(DEFAULT_DEFINITION))
+        cache = ProgramCache(cache_dir)
+        memory_us = per_load_us(lambda: cache.load(DEFAULT_DEFINITION))
+
+        builder = ProgramBuilder(program=cache.load(DEFAULT_DEFINITION))
+        start = time.perf_counter()
+        for week in range(1, WEEKS + 1):
+            builder.build_week_model(week)
+        week_us = (time.perf_counter() - start) / WEEKS * 1e6
+    return {"cold load us": cold_us, "cached load us": cached_us, "in-memory load us": memory_us,
+            "week model us": week_us}
+
+def main():
+    results = run()
+    for name, value in results.items():
+        print(f"{name:<20}{value:>10.1f}")
+    print(f"\ncached load speedup: {results['cold load us'] / results['cached load us']:.1f}x")
+
+if __name__ == "__main__":
+    main()
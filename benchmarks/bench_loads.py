@@ -0,0 +1,50 @@
+"""Load and plate calculation throughput across many athletes.
+
+Schedules every athlete with ScheduleEngine and computes all three main
+lifts with the vectorized LoadCalculator, against a per-row loop over
+LoadCalculator.week for a slice of the same rows.
+
+    python -m benchmarks.bench_loads
+"""
+import time
+from typing import Dict
+import numpy as np
+from loads import MAIN_LIFTS, LoadCalculator, PlateSolver
+from program_builder import ProgramBuilder
+from schedule_engine import ScheduleEngine
+
+def run(athletes: int = 10000, weeks: int = 52, loop_rows: int = 2000) -> Dict[str, float]:
+    rng = np.random.default_rng(0)
+    one_rep_maxes = {lift: rng.uniform(150, 700, athletes) for lift in MAIN_LIFTS}
+    schedule = ScheduleEngine().build(np.arange(athletes), [ProgramBuilder.DEFAULT_START_DATE] * athletes, weeks)
+    rows = len(schedule["week"])
+
+    start = time.perf_counter()
+    PlateSolver.for_inventory.cache_clear()
+    calculator = LoadCalculator()
+    table_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    calculator.batch(schedule, one_rep_maxes)
+    vectorized = rows / (time.perf_counter() - start)
+
+    builder = ProgramBuilder()
+    start = time.perf_counter()
+    for row in range(loop_rows):
+        athlete = schedule["athlete_index"][row]
+        calculator.week({lift: one_rep_maxes[lift][athlete] for lift in MAIN_LIFTS},
+                        int(schedule["week"][row]), builder)
+    looped = loop_rows / (time.perf_counter() - start)
+    return {"rows": rows, "table ms": table_seconds * 1000, "vectorized rows/s": vectorized,
+            "per-row rows/s": looped}
+
+def main():
+    results = run()
+    print(f"{results['rows']:,} athlete-weeks, 3 lifts each")
+    print(f"plate table built in {results['table ms']:.1f} ms")
+    print(f"vectorized {results['vectorized rows/s']:>14,.0f} rows/s")
+    print(f"per-row    {results['per-row rows/s']:>14,.0f} rows/s")
+    print(f"speedup    {results['vectorized rows/s'] / results['per-row rows/s']:>14.0f}x")
+
+if __name__ == "__main__":
+    main()
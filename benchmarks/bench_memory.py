@@ -0,0 +1,63 @@
+"""Peak memory benchmark for full builds.
+
+Runs generate_program into a scratch directory at increasing program
+lengths and reports the tracemalloc peak. With shared navigation and no
+build manifest the streaming pipeline keeps no per-week state, so the peak
+stays flat. The manifest adds one small digest entry per page, and inline
+navigation holds the O(N) week selector by design. The eager list of week
+dicts is shown for comparison.
+
+    python -m benchmarks.bench_memory
+"""
+import contextlib
+import os
+import tempfile
+import tracemalloc
+from typing import Callable, Dict, List
+from html_templates import Navigation
+from main import ProgramGenerator
+
+SIZES = [24, 1000, 4000, 16000]
+
+def peak_bytes(run: Callable[[str], object]) -> int:
+    """Returns the peak traced allocation while run() builds into a scratch directory"""
+    with tempfile.TemporaryDirectory() as output_dir:
+        tracemalloc.start()
+        try:
+            run(output_dir)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+def build(total_weeks: int, nav_mode: str, use_manifest: bool) -> Callable[[str], None]:
+    def run(output_dir: str):
+        generator = ProgramGenerator(total_weeks=total_weeks, nav_mode=nav_mode,
+                                     use_manifest=use_manifest)
+        generator.output_dir = output_dir
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            generator.generate_program()
+    return run
+
+def run(sizes: List[int] = SIZES) -> List[Dict]:
+    # Warm up imports and lazily built caches so they do not count towards the first size
+    peak_bytes(build(4, Navigation.SHARED, False))
+    results = []
+    for size in sizes:
+        results.append({
+            "weeks": size,
+            "shared nav": peak_bytes(build(size, Navigation.SHARED, False)),
+            "shared nav + manifest": peak_bytes(build(size, Navigation.SHARED, True)),
+            "inline nav": peak_bytes(build(size, Navigation.INLINE, False)),
+            "eager week list": peak_bytes(lambda _: ProgramGenerator(total_weeks=size).generate_all_programs()),
+        })
+    return results
+
+def main():
+    results = run()
+    columns = [key for key in results[0] if key != "weeks"]
+    print(f"{'weeks':>8}" + ''.join(f"{column:>24}" for column in columns))
+    for result in results:
+        print(f"{result['weeks']:>8}" + ''.join(f"{result[column] / 1e6:>21.2f} MB" for column in columns))
+
+if __name__ == "__main__":
+    main()
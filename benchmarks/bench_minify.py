@@ -0,0 +1,61 @@
+"""Build time and bytes saved by the HTML minifier.
+
+Builds programs of growing length in both navigation modes, with and
+without --minify, and reports the bytes minifying saves and the build time
+it adds, from the fastest of ROUNDS alternating builds of each. Inline
+navigation lists every week on every page, so its pages grow with the
+program; shared navigation keeps pages the same size.
+
+    python -m benchmarks.bench_minify
+"""
+import contextlib
+import io
+import tempfile
+import time
+from typing import Dict, List, Tuple
+from html_templates import Navigation
+from main import ProgramGenerator
+
+SIZES = [24, 104, 520]
+ROUNDS = 7
+
+def build(weeks: int, nav_mode: str, minify: bool) -> Tuple[float, ProgramGenerator]:
+    """Returns the time of one full build and its generator"""
+    with tempfile.TemporaryDirectory() as output_dir:
+        generator = ProgramGenerator(total_weeks=weeks, incremental=False, output_dir=output_dir,
+                                     nav_mode=nav_mode, minify=minify)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            generator.generate_program()
+        return time.perf_counter() - start, generator
+
+def run(sizes: List[int] = SIZES) -> List[Dict]:
+    results = []
+    for weeks in sizes:
+        for nav_mode in Navigation.MODES:
+            # Plain and minified builds alternate so drift in disk and CPU speed hits both alike
+            plain_seconds = minify_seconds = float("inf")
+            for _ in range(ROUNDS):
+                plain_seconds = min(plain_seconds, build(weeks, nav_mode, False)[0])
+                seconds, generator = build(weeks, nav_mode, True)
+                minify_seconds = min(minify_seconds, seconds)
+            minifier = generator.minifier
+            results.append({
+                "weeks": weeks, "navigation": nav_mode,
+                "bytes": minifier.bytes_in, "bytes saved": minifier.bytes_saved,
+                "build seconds": plain_seconds, "minify build seconds": minify_seconds,
+            })
+    return results
+
+def main():
+    print(f"{'weeks':>6} {'nav':<7}{'bytes':>12}{'saved':>12}{'saved %':>9}{'build s':>9}{'minify s':>10}"
+          f"{'added ms':>10}{'added':>8}")
+    for result in run():
+        added = result['minify build seconds'] - result['build seconds']
+        print(f"{result['weeks']:>6} {result['navigation']:<7}{result['bytes']:>12,}{result['bytes saved']:>12,}"
+              f"{result['bytes saved'] / result['bytes']:>9.1%}{result['build seconds']:>9.3f}"
+              f"{result['minify build seconds']:>10.3f}{added * 1000:>10.2f}"
+              f"{added / result['build seconds']:>8.0%}")
+
+if __name__ == "__main__":
+    main()
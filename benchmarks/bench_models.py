@@ -0,0 +1,41 @@
+"""Per-week memory of the week dict versus the compact Week model.
+
+Builds N weeks both ways, keeps them alive and reports retained bytes and
+allocated blocks per week, plus build time.
+
+    python -m benchmarks.bench_models
+"""
+import time
+import tracemalloc
+from typing import Callable, Dict
+from program_builder import ProgramBuilder
+
+def measure(build: Callable[[int], object], weeks: int) -> Dict[str, float]:
+    build(1)
+    tracemalloc.start()
+    start = time.perf_counter()
+    built = [build(week) for week in range(1, weeks + 1)]
+    elapsed = time.perf_counter() - start
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = snapshot.statistics('filename')
+    blocks = sum(stat.count for stat in stats)
+    size = sum(stat.size for stat in stats)
+    del built
+    return {"bytes/week": size / weeks, "blocks/week": blocks / weeks, "us/week": elapsed / weeks * 1e6}
+
+def run(weeks: int = 20000) -> Dict[str, Dict[str, float]]:
+    builder = ProgramBuilder()
+    return {
+        "dict": measure(builder.build_week, weeks),
+        "model": measure(builder.build_week_model, weeks),
+    }
+
+def main():
+    results = run()
+    print(f"{'':<8}{'bytes/week':>12}{'blocks/week':>13}{'us/week':>10}")
+    for name, result in results.items():
+        print(f"{name:<8}{result['bytes/week']:>12.0f}{result['blocks/week']:>13.1f}{result['us/week']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
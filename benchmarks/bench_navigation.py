@@ -0,0 +1,78 @@
+"""Navigation scaling benchmark.
+
+Renders the navigation block for every page of an N-week program and reports
+total time and bytes. The per-page rebuild grows quadratically with N; the
+shared option list cuts the string work to a single copy per page, and shared
+mode makes both time and output linear.
+
+    python -m benchmarks.bench_navigation
+"""
+import time
+from typing import Callable, Dict, List
+from html_templates import Navigation
+from program_builder import ProgramBuilder
+
+SIZES = [250, 500, 1000, 2000, 4000]
+
+def rebuild_per_page(current_week: int, all_programs: List[Dict]) -> str:
+    """The original per-page implementation, kept as the quadratic reference"""
+    links = ['<div class="week-links">']
+    links.append('<select class="week-select" onchange="window.location.href=this.value">')
+    for program in all_programs:
+        week_num = program["Week"]
+        date = program["Date"]
+        selected = ' selected' if week_num == current_week else ''
+        links.append(
+            f'<option value="{date}-program.html"{selected}>'
+            f'Week {week_num} - {date}</option>'
+        )
+    links.append('</select>')
+    if current_week > 1:
+        prev_program = all_programs[current_week - 2]
+        links.append(
+            f'<a href="{prev_program["Date"]}-program.html" class="nav-link">← Week {current_week - 1}</a>'
+        )
+    if current_week < len(all_programs):
+        next_program = all_programs[current_week]
+        links.append(
+            f'<a href="{next_program["Date"]}-program.html" class="nav-link">Week {current_week + 1} →</a>'
+        )
+    links.append('</div>')
+    return '\n'.join(links)
+
+def render_all(all_programs: List[Dict], render: Callable[[int], str]) -> int:
+    """Renders navigation for every page, returning the total bytes produced"""
+    return sum(len(render(program["Week"]).encode('utf-8')) for program in all_programs)
+
+def run(sizes: List[int] = SIZES) -> List[Dict]:
+    builder = ProgramBuilder()
+    results = []
+    for size in sizes:
+        all_programs = [{"Week": week, "Date": builder.get_week_date(week).strftime('%m-%d-%Y')}
+                        for week in range(1, size + 1)]
+        strategies = {
+            "per-page": lambda: (lambda week: rebuild_per_page(week, all_programs)),
+            "inline": lambda: Navigation.from_programs(all_programs).render,
+            "shared": lambda: Navigation.from_programs(all_programs, Navigation.SHARED).render,
+        }
+        for name, setup in strategies.items():
+            start = time.perf_counter()
+            total_bytes = render_all(all_programs, setup())
+            elapsed = time.perf_counter() - start
+            results.append({"strategy": name, "weeks": size, "seconds": elapsed, "bytes": total_bytes})
+    return results
+
+def main():
+    results = run()
+    print(f"{'strategy':<10}{'weeks':>8}{'seconds':>12}{'MB':>10}{'x time':>9}")
+    previous: Dict[str, float] = {}
+    for result in results:
+        name = result["strategy"]
+        growth = result["seconds"] / previous[name] if name in previous else float('nan')
+        previous[name] = result["seconds"]
+        print(f"{name:<10}{result['weeks']:>8}{result['seconds']:>12.4f}"
+              f"{result['bytes'] / 1e6:>10.2f}{growth:>9.2f}")
+    print("\n'x time' is the growth factor when the week count doubles: ~4 is quadratic, ~2 is linear")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Concurrent load on the in-memory preview server.
+
+Starts a PreviewServer on a free local port and fires a burst of
+concurrent GETs for different weeks of different athletes' programs, first
+against a cold page cache and then again once pages are cached. Reports
+throughput, the slowest response and page cache hit rate.
+
+    python -m benchmarks.bench_preview
+"""
+import asyncio
+import contextlib
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+from preview_server import PreviewServer
+
+ATHLETES = 8
+WEEKS = 52
+CONCURRENCY = 400
+
+async def fetch(port: int, path: str) -> float:
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nAccept-Encoding: gzip\r\n"
+                 "Connection: close\r\n\r\n".encode('latin-1'))
+    await writer.drain()
+    status = (await reader.readline()).split()[1]
+    await reader.read()
+    writer.close()
+    if status != b"200":
+        raise RuntimeError(f"GET {path} returned {status.decode()}")
+    return time.perf_counter() - start
+
+def request_paths(count: int) -> List[str]:
+    first_monday = datetime(2025, 2, 17)
+    paths = []
+    for index in range(count):
+        start = first_monday + timedelta(weeks=index % ATHLETES)
+        week = (index * 7) % WEEKS
+        page = (start + timedelta(weeks=week)).strftime('%m-%d-%Y')
+        paths.append(f"/program/{start:%Y-%m-%d}/{WEEKS}/{page}-program.html")
+    return paths
+
+async def burst(port: int, paths: List[str]) -> Dict[str, float]:
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(fetch(port, path) for path in paths))
+    elapsed = time.perf_counter() - start
+    return {"requests/s": len(paths) / elapsed, "max ms": max(latencies) * 1000}
+
+async def run_async(concurrency: int = CONCURRENCY) -> Dict[str, Dict[str, float]]:
+    server = PreviewServer(port=0)
+    await server.start()
+    try:
+        paths = request_paths(concurrency)
+        results = {"cold": await burst(server.port, paths), "cached": await burst(server.port, paths)}
+        results["cached"]["hit rate"] = server.pages.hit_rate
+        return results
+    finally:
+        server.server.close()
+        await server.server.wait_closed()
+        server.executor.shutdown()
+
+def run(concurrency: int = CONCURRENCY) -> Dict[str, Dict[str, float]]:
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        return asyncio.run(run_async(concurrency))
+
+def main():
+    results = run()
+    print(f"{CONCURRENCY} concurrent requests over {ATHLETES} athletes x {WEEKS} weeks")
+    for name, result in results.items():
+        print(f"{name:<8}{result['requests/s']:>10.0f} req/s{result['max ms']:>10.1f} ms max")
+    print(f"page cache hit rate over both bursts: {results['cached']['hit rate']:.1%}")
+
+if __name__ == "__main__":
+    main()
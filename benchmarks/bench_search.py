@@ -0,0 +1,46 @@
+"""Search index size and lookup speed.
+
+Indexes programs of growing length and reports the delta-encoded payload
+size (raw and gzipped), the time to index each week and the time of a
+"next week with this term" lookup, for an exercise that comes and goes
+with the deadlift style.
+
+    python -m benchmarks.bench_search
+"""
+import gzip
+import time
+from typing import Dict, List
+from program_builder import ProgramBuilder
+from search_index import EXERCISE, SearchIndex
+
+SIZES = [24, 520, 5200, 52000]
+LOOKUPS = 20000
+
+def run(sizes: List[int] = SIZES) -> List[Dict[str, float]]:
+    results = []
+    for weeks in sizes:
+        builder = ProgramBuilder()
+        models = [builder.build_week_model(number) for number in range(1, weeks + 1)]
+        index = SearchIndex(builder.start_date)
+        start = time.perf_counter()
+        for week in models:
+            index.add(week)
+        index_seconds = time.perf_counter() - start
+        data = ''.join(index.iter_data_file()).encode('utf-8')
+
+        start = time.perf_counter()
+        for lookup in range(LOOKUPS):
+            index.next_week(EXERCISE, "Deficit Deadlift", lookup * 7 % weeks + 1)
+        lookup_seconds = (time.perf_counter() - start) / LOOKUPS
+        results.append({"weeks": weeks, "bytes": len(data), "gzip bytes": len(gzip.compress(data)),
+                        "index us/week": index_seconds / weeks * 1e6, "lookup us": lookup_seconds * 1e6})
+    return results
+
+def main():
+    print(f"{'weeks':>8}{'bytes':>12}{'gzip':>10}{'index us/wk':>13}{'lookup us':>11}")
+    for result in run():
+        print(f"{result['weeks']:>8}{result['bytes']:>12,}{result['gzip bytes']:>10,}"
+              f"{result['index us/week']:>13.2f}{result['lookup us']:>11.2f}")
+
+if __name__ == "__main__":
+    main()
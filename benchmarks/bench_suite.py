@@ -0,0 +1,351 @@
+"""Reproducible benchmark suite for the generator's build, render and write stages.
+
+Every case runs at each program length with one athlete and at each
+athlete count with the shortest program, so every point of the default
+matrix runs, the largest in minutes; --product runs every combination of
+lengths and counts instead. Each athlete gets their own program starting a
+week after the previous one. Results hold the best wall time over the
+repeats and their spread, short points looped until a repeat lasts
+MIN_TIMED_SECONDS, the tracemalloc peak of one extra traced run
+and the bytes produced (written to disk for the full build, rendered in
+memory for the other cases), and are written as JSON. --budget, off by
+default, records points whose estimated work is over it as skipped.
+
+    python -m benchmarks.bench_suite --output baseline.json
+    python -m benchmarks.bench_suite --compare baseline.json
+
+With --compare, results are checked against a saved run. A case is
+flagged as a regression when it used more memory beyond --threshold, or
+got slower beyond both --threshold and the spread of the two runs' own
+repeats; timings are only compared when both runs repeated the case at
+least MIN_COMPARED_REPEAT times, and a case that looks slower is measured
+CONFIRM_RUNS more times, keeping the best, before it is reported. The exit
+status is then 1.
+"""
+import argparse
+import contextlib
+import json
+import math
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from html_templates import HTMLTemplates, Navigation
+from main import ProgramGenerator
+from program_builder import ProgramBuilder
+
+WEEKS = [24, 1000, 100000]
+ATHLETES = [1, 100, 10000]
+QUICK_WEEKS = [24, 1000]
+QUICK_ATHLETES = [1, 10]
+# Pages rendered per athlete by the per-page cases; their navigation still covers every week
+PAGE_SAMPLE = 24
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_REPEAT = 3
+# Short points are looped until each timed repeat lasts at least this long, as timeit.autorange does
+MIN_TIMED_SECONDS = 0.1
+# Fewer repeats give no spread to tell a slowdown from noise, so their timings are not compared
+MIN_COMPARED_REPEAT = 3
+# Extra measurements of a point that looks slower before --compare reports it
+CONFIRM_RUNS = 2
+# Larger programs use shared navigation and CSS so pages don't grow with the week count
+INLINE_MAX_WEEKS = 1000
+
+# A run returns (operations, bytes produced)
+Run = Callable[[], Tuple[int, int]]
+
+def athlete_builders(athletes: int) -> Iterator[ProgramBuilder]:
+    for athlete in range(athletes):
+        yield ProgramBuilder(ProgramBuilder.DEFAULT_START_DATE + timedelta(weeks=athlete))
+
+def week_list(builder: ProgramBuilder, weeks: int) -> List[Dict]:
+    """The week list navigation reads, without building every week"""
+    return [{"Week": week, "Date": builder.get_week_date(week).strftime('%m-%d-%Y')}
+            for week in range(1, weeks + 1)]
+
+def sample_weeks(weeks: int) -> range:
+    return range(1, min(weeks, PAGE_SAMPLE) + 1)
+
+def case_build_week(weeks: int, athletes: int, workdir: str) -> Run:
+    def run():
+        ops = 0
+        for builder in athlete_builders(athletes):
+            for week in range(1, weeks + 1):
+                builder.build_week(week)
+            ops += weeks
+        return ops, 0
+    return run
+
+def case_program_page(weeks: int, athletes: int, workdir: str) -> Run:
+    def run():
+        ops = size = 0
+        for builder in athlete_builders(athletes):
+            all_programs = week_list(builder, weeks)
+            for week in sample_weeks(weeks):
+                size += len(HTMLTemplates.generate_program_page(builder.build_week(week), all_programs))
+                ops += 1
+        return ops, size
+    return run
+
+def case_navigation_links(weeks: int, athletes: int, workdir: str) -> Run:
+    def run():
+        ops = size = 0
+        for builder in athlete_builders(athletes):
+            all_programs = week_list(builder, weeks)
+            for week in sample_weeks(weeks):
+                size += len(HTMLTemplates._generate_navigation_links(week, all_programs))
+                ops += 1
+        return ops, size
+    return run
+
+def case_index_page(weeks: int, athletes: int, workdir: str) -> Run:
+    generator = ProgramGenerator()
+    readme_content = generator.read_readme()
+    # Warm the README cache so every athlete measures page assembly alone
+    generator.render_readme(readme_content)
+
+    def run():
+        size = 0
+        for builder in athlete_builders(athletes):
+            size += len(generator.generate_index_page(week_list(builder, weeks), readme_content))
+        return athletes, size
+    return run
+
+def case_generate_program(weeks: int, athletes: int, workdir: str) -> Run:
+    mode = Navigation.INLINE if weeks <= INLINE_MAX_WEEKS else Navigation.SHARED
+
+    def run():
+        size = 0
+        for athlete, builder in enumerate(athlete_builders(athletes)):
+            output_dir = os.path.join(workdir, f"athlete-{athlete}")
+            generator = ProgramGenerator(total_weeks=weeks, nav_mode=mode, css_mode=mode,
+                                         use_manifest=False, start_date=builder.start_date,
+                                         output_dir=output_dir)
+            generator.generate_program()
+            with os.scandir(output_dir) as entries:
+                size += sum(entry.stat().st_size for entry in entries)
+            shutil.rmtree(output_dir)
+        return weeks * athletes, size
+    return run
+
+# Name -> (case, relative cost of one athlete-week)
+CASES: Dict[str, Tuple[Callable[[int, int, str], Run], float]] = {
+    "build_week": (case_build_week, 1),
+    "generate_program_page": (case_program_page, 0),
+    "navigation_links": (case_navigation_links, 0),
+    "generate_index_page": (case_index_page, 0.5),
+    "generate_program": (case_generate_program, 20),
+}
+
+def estimated_work(case: str, weeks: int, athletes: int) -> float:
+    """Rough cost of a matrix point in units of one built week"""
+    cost = CASES[case][1]
+    if cost == 0:
+        # Per-page cases render a fixed sample of pages whose navigation lists every week
+        return athletes * len(sample_weeks(weeks)) * (20 + weeks / 50)
+    work = cost * weeks * athletes
+    if case == "generate_program" and weeks <= INLINE_MAX_WEEKS:
+        # Every inline page carries the whole week list
+        work += weeks * weeks * athletes / 50
+    return work
+
+def matrix(weeks: List[int], athletes: List[int], product: bool = False) -> List[Tuple[int, int]]:
+    """Returns the (weeks, athletes) points to run.
+
+    By default every program length runs with the fewest athletes and every
+    athlete count with the shortest program; product gives every combination.
+    """
+    if product:
+        return [(week_count, athlete_count) for week_count in weeks for athlete_count in athletes]
+    points = [(week_count, min(athletes)) for week_count in weeks]
+    points += [(min(weeks), athlete_count) for athlete_count in athletes if athlete_count != min(athletes)]
+    return points
+
+def measure(case: str, weeks: int, athletes: int, repeat: int) -> Dict:
+    result = {"case": case, "weeks": weeks, "athletes": athletes}
+    make_run = CASES[case][0]
+    with tempfile.TemporaryDirectory() as workdir, open(os.devnull, 'w') as devnull, \
+            contextlib.redirect_stdout(devnull):
+        run = make_run(weeks, athletes, workdir)
+        start = time.perf_counter()
+        ops, size = run()
+        first = time.perf_counter() - start
+        loops = max(1, math.ceil(MIN_TIMED_SECONDS / max(first, 1e-9)))
+        # A long first run counts as a repeat; a short one only warmed caches and sized the loop
+        times = [first] if loops == 1 else []
+        while len(times) < repeat:
+            start = time.perf_counter()
+            for _ in range(loops):
+                ops, size = run()
+            times.append((time.perf_counter() - start) / loops)
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    seconds = min(times)
+    result.update({
+        "ops": ops,
+        "seconds": seconds,
+        # How far the slowest repeat was from the best; 0 for a single run
+        "spread": (max(times) - seconds) / seconds if seconds else 0.0,
+        "ops_per_second": ops / seconds if seconds else 0.0,
+        "peak_bytes": peak,
+        "bytes_written": size,
+        "repeat": repeat,
+        "loops": loops,
+    })
+    return result
+
+def run(cases: List[str], points: List[Tuple[int, int]], budget: Optional[float] = None,
+        repeat: int = DEFAULT_REPEAT, progress: Callable[[Dict], None] = lambda result: None) -> Dict:
+    results = []
+    for case in cases:
+        for week_count, athlete_count in points:
+            work = estimated_work(case, week_count, athlete_count)
+            if budget is not None and work > budget:
+                result = {"case": case, "weeks": week_count, "athletes": athlete_count,
+                          "skipped": f"estimated work {work:,.0f} is over the budget of {budget:,.0f}"}
+            else:
+                result = measure(case, week_count, athlete_count, repeat)
+            progress(result)
+            results.append(result)
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "budget": budget,
+        },
+        "results": results,
+    }
+
+def merge_timings(result: Dict, again: Dict) -> None:
+    """Folds a second measurement of the same point into result: the best time and the pooled spread"""
+    slowest = max(result["seconds"] * (1 + result["spread"]), again["seconds"] * (1 + again["spread"]))
+    seconds = min(result["seconds"], again["seconds"])
+    result.update({
+        "seconds": seconds,
+        "spread": slowest / seconds - 1 if seconds else 0.0,
+        "ops_per_second": result["ops"] / seconds if seconds else 0.0,
+        "repeat": result["repeat"] + again["repeat"],
+    })
+
+def result_key(result: Dict) -> Tuple[str, int, int]:
+    return result["case"], result["weeks"], result["athletes"]
+
+def compare(current: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """Returns one row per case measured in both runs, with time and memory ratios and regressions.
+
+    A slowdown only counts when both runs have enough repeats to measure
+    their noise and it is beyond the threshold and that noise; rows whose
+    timings could not be compared say so in "unchecked".
+    """
+    previous = {result_key(result): result for result in baseline["results"] if "skipped" not in result}
+    rows = []
+    for result in current["results"]:
+        before = previous.get(result_key(result))
+        if before is None or "skipped" in result:
+            continue
+        row = {"case": result["case"], "weeks": result["weeks"], "athletes": result["athletes"],
+               "regressions": [], "unchecked": None}
+        for metric in ("seconds", "peak_bytes"):
+            ratio = result[metric] / before[metric] if before[metric] else 1.0
+            row[metric] = ratio
+            allowed = threshold
+            if metric == "seconds":
+                if min(result["repeat"], before["repeat"]) < MIN_COMPARED_REPEAT:
+                    row["unchecked"] = f"fewer than {MIN_COMPARED_REPEAT} repeats"
+                    continue
+                allowed = max(threshold, result.get("spread", 0.0) + before.get("spread", 0.0))
+            if ratio > 1 + allowed:
+                row["regressions"].append(metric)
+        rows.append(row)
+    return rows
+
+def format_result(result: Dict) -> str:
+    label = f"{result['case']:<22}{result['weeks']:>8}{result['athletes']:>10}"
+    if "skipped" in result:
+        return f"{label}  skipped: {result['skipped']}"
+    return (f"{label}{result['seconds']:>11.4f}{result['ops_per_second']:>14,.0f}"
+            f"{result['peak_bytes'] / 1e6:>11.2f}{result['bytes_written'] / 1e6:>11.2f}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_suite",
+                                     description="Benchmark the generator's stages at scale")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--weeks", nargs="+", type=int, default=None, help=f"program lengths (default {WEEKS})")
+    parser.add_argument("--athletes", nargs="+", type=int, default=None,
+                        help=f"athlete counts (default {ATHLETES})")
+    parser.add_argument("--quick", action="store_true",
+                        help=f"use {QUICK_WEEKS} weeks and {QUICK_ATHLETES} athletes unless given")
+    parser.add_argument("--product", action="store_true",
+                        help="run every combination of weeks and athletes, not each axis on its own")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="skip matrix points whose estimated work, in built weeks, is above this (default: none)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help=f"timed runs per point; the best is kept, and --compare needs at least "
+                             f"{MIN_COMPARED_REPEAT} to compare timings")
+    parser.add_argument("--output", "-o", help="write the results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="flag regressions against a saved JSON run")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown or memory growth counted as a regression")
+    args = parser.parse_args(argv)
+
+    weeks = args.weeks or (QUICK_WEEKS if args.quick else WEEKS)
+    athletes = args.athletes or (QUICK_ATHLETES if args.quick else ATHLETES)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print(f"{'case':<22}{'weeks':>8}{'athletes':>10}{'seconds':>11}{'ops/s':>14}{'peak MB':>11}{'MB out':>11}")
+    results = run(args.cases, matrix(weeks, athletes, args.product), args.budget, args.repeat,
+                  lambda result: print(format_result(result), flush=True))
+
+    if baseline is not None:
+        rows = compare(results, baseline, args.threshold)
+        slower = {result_key(row) for row in rows if "seconds" in row["regressions"]}
+        if slower:
+            # A slow spell of the machine outlasts one point's repeats, so measure again before reporting
+            print(f"\nMeasuring {len(slower)} slower case(s) again")
+            for result in results["results"]:
+                if result_key(result) in slower:
+                    for _ in range(CONFIRM_RUNS):
+                        merge_timings(result, measure(result["case"], result["weeks"], result["athletes"],
+                                                      result["repeat"]))
+                    print(format_result(result), flush=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=1)
+        print(f"\nResults saved to {args.output}")
+
+    if baseline is None:
+        return 0
+    rows = compare(results, baseline, args.threshold)
+    print(f"\nCompared with {args.compare} (threshold {args.threshold:.0%})")
+    print(f"{'case':<22}{'weeks':>8}{'athletes':>10}{'time':>9}{'memory':>9}")
+    regressions = unchecked = 0
+    for row in rows:
+        flag = f"  REGRESSION ({', '.join(row['regressions'])})" if row["regressions"] else ""
+        if row["unchecked"]:
+            flag += f"  time not compared: {row['unchecked']}"
+        regressions += bool(row["regressions"])
+        unchecked += bool(row["unchecked"])
+        print(f"{row['case']:<22}{row['weeks']:>8}{row['athletes']:>10}"
+              f"{row['seconds']:>8.2f}x{row['peak_bytes']:>8.2f}x{flag}")
+    print(f"\n{regressions} regression(s) in {len(rows)} compared case(s); "
+          f"time not compared for {unchecked}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Page rendering throughput benchmark.
+
+Compares the precompiled ProgramPageRenderer with the original per-call
+f-string assembly, rendering every week of a 24-week program repeatedly
+with the same navigation so only page assembly differs.
+
+    python -m benchmarks.bench_templates
+"""
+import time
+from typing import Callable, Dict, List
+from html_templates import HTMLTemplates, Navigation, ProgramPageRenderer
+from program_builder import ProgramBuilder
+
+def legacy_week_content(week_program: Dict) -> str:
+    """The original f-string implementation of the week content"""
+    content = [
+        f'''<div class="week-header">
+                <h2>Week {week_program['Week']} - {week_program['Date']}</h2>
+                <div class="program-meta">
+                    <p><strong>Bar:</strong> {week_program['Bar Type']}</p>
+                    <p><strong>Gear:</strong> {week_program['Gear']}</p>
+                </div>
+            </div>'''
+    ]
+    for day, workout in week_program.items():
+        if day not in ['Week', 'Bar Type', 'Chains', 'Gear', 'Date']:
+            content.append(f'<div class="workout-day"><h3>{day}</h3>')
+            if isinstance(workout, dict):
+                for key, value in workout.items():
+                    if isinstance(value, list):
+                        content.append(f'<div class="workout-section"><h4>{key}:</h4><ul>')
+                        for item in value:
+                            if item.startswith('-'):
+                                content.append(f'<li class="sub-item">{item[2:]}</li>')
+                            else:
+                                content.append(f'<li>{item}</li>')
+                        content.append('</ul></div>')
+                    else:
+                        content.append(f'<div class="workout-section"><h4>{key}:</h4><p>{value}</p></div>')
+            else:
+                content.append(f'<p>{workout}</p>')
+            content.append('</div>')
+    return '\n'.join(content)
+
+def legacy_page(week_program: Dict, navigation: Navigation) -> str:
+    """The original f-string implementation of the page skeleton"""
+    nav_links = navigation.render(week_program['Week'])
+    content = legacy_week_content(week_program)
+    return f"""
+        <!DOCTYPE html>
+        <html lang="en">
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>Powerlifting Program - Week {week_program['Week']}</title>
+            {HTMLTemplates.generate_css()}
+        </head>
+        <body>
+            <div class="container">
+                <h1><a href="index.html">6-Month Powerlifting Program</a></h1>
+                <div class="week-program">
+                    <div class="program-navigation">
+                        {nav_links}
+                    </div>
+                    {content}
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+
+def measure(render: Callable[[Dict], str], programs: List[Dict], rounds: int) -> float:
+    """Returns pages rendered per second"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for program in programs:
+            render(program)
+    return rounds * len(programs) / (time.perf_counter() - start)
+
+def run(weeks: int = 24, rounds: int = 2000) -> Dict[str, float]:
+    builder = ProgramBuilder()
+    programs = [builder.build_week(week) for week in range(1, weeks + 1)]
+    navigation = Navigation.from_programs(programs, Navigation.SHARED)
+    renderer = ProgramPageRenderer(navigation)
+    for program in programs:
+        assert renderer.render(program) == legacy_page(program, navigation)
+    return {
+        "f-string pages/s": measure(lambda program: legacy_page(program, navigation), programs, rounds),
+        "compiled pages/s": measure(renderer.render, programs, rounds),
+        "f-string content/s": measure(legacy_week_content, programs, rounds),
+        "compiled content/s": measure(ProgramPageRenderer.render_week_content, programs, rounds),
+    }
+
+def main():
+    results = run()
+    for name, value in results.items():
+        print(f"{name:<22}{value:>12,.0f}")
+    print(f"\npage speedup: {results['compiled pages/s'] / results['f-string pages/s']:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Ingesting a large CSV training log and fitting e1RM trends from it.
+
+Writes a synthetic log of years of weekly sessions for thousands of
+athletes, then times a full parse, reopening the log from its saved
+columns, parsing one appended week incrementally against parsing the
+whole grown file again, and fitting every athlete's trends and next wave.
+
+    python -m benchmarks.bench_training_log
+"""
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Dict
+from training_log import TrainingLog, next_wave
+
+ATHLETES = 2000
+WEEKS = 156
+LIFTS = ("squat", "bench", "deadlift")
+SETS = 3
+FIRST_MONDAY = date(2022, 1, 3)
+
+def week_lines(week: int, athletes: int = ATHLETES) -> str:
+    """Returns one week of work sets for every athlete, slowly getting stronger"""
+    rng = random.Random(week)
+    day = (FIRST_MONDAY + timedelta(weeks=week)).isoformat()
+    lines = []
+    for athlete in range(athletes):
+        base = 200 + athlete % 300 + week * 0.5
+        for index, lift in enumerate(LIFTS):
+            for _ in range(SETS):
+                reps = rng.randint(1, 8)
+                weight = round(base * (0.7 + 0.3 * index) * (1 - reps / 40) / 2.5) * 2.5
+                lines.append(f"athlete{athlete:05d},{day},{lift},{weight:g},{reps}\n")
+    return "".join(lines)
+
+def timed(action):
+    start = time.perf_counter()
+    result = action()
+    return time.perf_counter() - start, result
+
+def run(athletes: int = ATHLETES, weeks: int = WEEKS) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, "log.csv")
+        cache_dir = os.path.join(work_dir, "cache")
+        with open(path, 'w') as f:
+            f.write("athlete,date,lift,weight,reps\n")
+            for week in range(weeks):
+                f.write(week_lines(week, athletes))
+        size = os.path.getsize(path)
+
+        parse_seconds, log = timed(lambda: TrainingLog(path, cache_dir))
+        reopen_seconds, _ = timed(lambda: TrainingLog(path, cache_dir))
+        with open(path, 'a') as f:
+            f.write(week_lines(weeks, athletes))
+        append_seconds, _ = timed(log.update)
+        reparse_seconds, _ = timed(lambda: TrainingLog(path, cache_dir=None))
+        trend_seconds, result = timed(lambda: next_wave(log))
+    return {
+        "rows": len(log), "megabytes": size / 1e6, "pairs": len(result["e1rm"]),
+        "full parse s": parse_seconds, "reopen s": reopen_seconds,
+        "append one week s": append_seconds, "reparse after append s": reparse_seconds,
+        "trends s": trend_seconds,
+    }
+
+def main():
+    results = run()
+    print(f"{results['rows']:,} sets, {results['megabytes']:.0f} MB, {results['pairs']:,} athlete-lift trends")
+    for name in ("full parse s", "reopen s", "append one week s", "reparse after append s", "trends s"):
+        print(f"{name:<24}{results[name]:>8.3f}")
+    print(f"\nparse rate: {results['rows'] / results['full parse s'] / 1e6:.1f}M sets/s, "
+          f"{results['megabytes'] / results['full parse s']:.0f} MB/s; "
+          f"incremental append speedup: {results['reparse after append s'] / results['append one week s']:.0f}x")
+
+if __name__ == "__main__":
+    main()
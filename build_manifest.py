@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, List, Sequence
+
+class BuildManifest:
+    """Tracks a content hash of the inputs for every generated page so
+    unchanged pages can be skipped on the next build"""
+
+    FILENAME = ".build-manifest.json"
+
+    def __init__(self, output_dir: str, enabled: bool = True):
+        self.output_dir = output_dir
+        self.enabled = enabled
+        self.path = os.path.join(output_dir, self.FILENAME)
+        self.previous: Dict[str, str] = {}
+        self.current: Dict[str, str] = {}
+        self.rebuilt = 0
+        self.skipped = 0
+
+    @staticmethod
+    def hash_inputs(*inputs) -> str:
+        """Returns a stable digest for any JSON-serializable inputs"""
+        payload = json.dumps(inputs, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def hash_files(paths: Iterable[str]) -> str:
+        """Returns a digest of the contents of the given files"""
+        digest = hashlib.sha256()
+        for path in paths:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest()
+
+    def load(self):
+        """Loads the manifest written by the previous build, if any"""
+        if not self.enabled:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.previous = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.previous = {}
+
+    def save(self):
+        """Writes the manifest for this build, dropping pages no longer generated"""
+        if not self.enabled:
+            return
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.current, f, indent=1, sort_keys=True)
+
+    def stale_files(self) -> List[str]:
+        """Returns files from the previous build that this build did not produce"""
+        return sorted(set(self.previous) - set(self.current))
+
+    def is_current(self, filename: str, digest: str, siblings: Sequence[str] = ()) -> bool:
+        """Returns whether filename was built from the same inputs and still exists.
+
+        Siblings are suffixes of files derived from filename, such as ".gz";
+        they are tracked under the same digest and must all be present too.
+        """
+        if not self.enabled:
+            self.rebuilt += 1
+            return False
+        current = True
+        for name in [filename] + [filename + suffix for suffix in siblings]:
+            self.current[name] = digest
+            if self.previous.get(name) != digest or not os.path.exists(os.path.join(self.output_dir, name)):
+                current = False
+        if current:
+            self.skipped += 1
+        else:
+            self.rebuilt += 1
+        return current
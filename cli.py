@@ -0,0 +1,490 @@
+"""Command line interface for the program generator.
+
+Only argparse and the standard library are imported up front; each
+subcommand imports the modules it needs when it runs, so quick queries
+such as `week` or `today` don't pay for the HTML templates or markdown.
+`worker` keeps one interpreter alive and answers a command per stdin line.
+"""
+import argparse
+import os
+import sys
+from datetime import date, datetime
+from typing import List, Optional
+
+# Mirror Navigation.MODES and HTMLTemplates.CSS_MODES without importing html_templates
+OUTPUT_MODES = ("inline", "shared")
+# Mirrors precompress.FORMATS
+COMPRESSION_FORMATS = ("gz", "zst")
+# Mirrors loads.MAIN_LIFTS
+MAIN_LIFTS = ("squat", "bench", "deadlift")
+# Mirrors ProgramGenerator.LAYOUTS
+LAYOUTS = ("pages", "app")
+EXPORT_FORMATS = ("json", "jsonl", "ics", "sqlite")
+BENCHMARKS = ("navigation", "templates", "memory", "models", "preview", "loads", "search", "app", "minify", "definitions",
+              "training_log", "suite")
+# The suite takes its own options; from here it runs its quick matrix like the other benchmarks
+BENCHMARK_ARGS = {"suite": ["--quick"]}
+
+def parse_date(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a YYYY-MM-DD date, got {value!r}")
+
+def parse_positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a whole number, got {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a number of at least 1, got {number}")
+    return number
+
+def parse_athlete(value: str):
+    """Parses NAME or NAME=YYYY-MM-DD into a (name, start date) pair"""
+    name, _, start = value.partition("=")
+    if not name:
+        raise argparse.ArgumentTypeError(f"expected NAME or NAME=YYYY-MM-DD, got {value!r}")
+    return name, parse_date(start) if start else None
+
+def parse_program_path(value: str) -> str:
+    if not os.path.isfile(value):
+        raise argparse.ArgumentTypeError(f"no program definition at {value!r}")
+    return value
+
+def parse_log_path(value: str) -> str:
+    if not os.path.isfile(value):
+        raise argparse.ArgumentTypeError(f"no training log at {value!r}")
+    return value
+
+def selected_program(args: argparse.Namespace):
+    """Returns the compiled program of --program, or of the bundled definition"""
+    from program_definition import load_program
+
+    return load_program(args.program)
+
+def make_builder(args: argparse.Namespace):
+    from program_builder import ProgramBuilder
+
+    return ProgramBuilder(args.start_date, selected_program(args))
+
+def format_week(week: dict) -> str:
+    """Formats a week dict as plain text"""
+    lines = [f"Week {week['Week']} - {week['Date']}", f"Bar: {week['Bar Type']}", f"Gear: {week['Gear']}"]
+    for day, workout in week.items():
+        if not isinstance(workout, dict):
+            continue
+        lines.append("")
+        lines.append(f"{day}:")
+        for heading, value in workout.items():
+            if isinstance(value, list):
+                lines.append(f"  {heading}:")
+                lines.extend(f"    {item}" for item in value)
+            else:
+                lines.append(f"  {heading}: {value}")
+    return "\n".join(lines)
+
+def compression_formats(args: argparse.Namespace) -> List[str]:
+    if args.compress is None:
+        return []
+    if args.compress:
+        return args.compress
+    from precompress import available_formats
+
+    return available_formats()
+
+def make_generator(args: argparse.Namespace, incremental: bool = True, instrumentation=None):
+    import importlib
+
+    # Looked up on every call so a reloaded main module is picked up
+    ProgramGenerator = importlib.import_module("main").ProgramGenerator
+    return ProgramGenerator(
+        total_weeks=args.weeks,
+        incremental=incremental,
+        jobs=args.jobs,
+        nav_mode=args.nav,
+        css_mode=args.css,
+        use_manifest=not args.no_manifest,
+        start_date=args.start_date,
+        output_dir=args.output_dir,
+        instrumentation=instrumentation,
+        compress=compression_formats(args),
+        search=args.search,
+        layout=args.layout,
+        minify=args.minify,
+        program=selected_program(args)
+    )
+
+def command_build(args: argparse.Namespace) -> int:
+    instrumentation = None
+    if args.profile or args.trace:
+        from instrumentation import Instrumentation
+
+        instrumentation = Instrumentation()
+    make_generator(args, not args.force, instrumentation).generate_program()
+    if instrumentation is not None:
+        print(f"\n{instrumentation.format_summary()}")
+        if args.profile:
+            instrumentation.write_summary(args.profile)
+            print(f"Profile saved to: {args.profile}")
+        if args.trace:
+            instrumentation.write_trace(args.trace)
+            print(f"Trace saved to: {args.trace}")
+    return 0
+
+def command_watch(args: argparse.Namespace) -> int:
+    from watcher import watch
+
+    if args.no_manifest:
+        raise ValueError("watch relies on the build manifest to find affected pages")
+    builds = iter([not args.force])
+    # Only the first build may be forced; rebuilds are always incremental
+    watch(lambda: make_generator(args, next(builds, True)), interval=args.interval, program_path=args.program)
+    return 0
+
+def logged_maxes(args: argparse.Namespace):
+    """Returns the e1RM and next-wave intensity scale per main lift of --athlete in --log"""
+    from training_log import TrainingLog, next_wave
+
+    if not args.athlete:
+        raise ValueError("--log needs --athlete NAME")
+    log = TrainingLog(args.log)
+    if args.athlete not in log.athletes:
+        raise ValueError(f"no sets for {args.athlete!r} in {args.log}")
+    result = next_wave(log, selected_program(args))
+    athlete = log.athletes.index(args.athlete)
+    lifts = {log.lifts[lift]: row for row, (code, lift) in enumerate(zip(result["athlete"], result["lift"]))
+             if code == athlete}
+    one_rep_maxes = {lift: float(result["e1rm"][lifts[lift]]) for lift in MAIN_LIFTS if lift in lifts}
+    scales = {lift: float(result["scale"][lifts[lift]]) for lift in MAIN_LIFTS if lift in lifts}
+    return one_rep_maxes, scales
+
+def command_week(args: argparse.Namespace) -> int:
+    import json
+    from program_sequence import ProgramSequence
+
+    builder = make_builder(args)
+    week = ProgramSequence(builder, args.weeks).week(args.number)
+    one_rep_maxes, scales = logged_maxes(args) if args.log else ({}, {})
+    one_rep_maxes.update({lift: getattr(args, lift) for lift in MAIN_LIFTS if getattr(args, lift) is not None})
+    prescriptions = {}
+    if one_rep_maxes:
+        from loads import LoadCalculator
+
+        prescriptions = LoadCalculator(program=builder.program).week(one_rep_maxes, args.number, builder, scales)
+    if args.json:
+        if one_rep_maxes:
+            week["Loads"] = {
+                lift: {"bar": p.bar, "intensity": p.intensity, "target": p.target, "load": p.load,
+                       "plates_per_side": list(p.plates), "capped": p.capped,
+                       "intensity_scale": scales.get(lift, 1.0)}
+                for lift, p in prescriptions.items()
+            }
+        print(json.dumps(week, indent=2))
+        return 0
+    print(format_week(week))
+    if one_rep_maxes:
+        print("\nLoads:")
+        for lift in one_rep_maxes:
+            prescription = prescriptions.get(lift)
+            detail = prescription.describe() if prescription else "by RPE this week"
+            if lift in scales:
+                detail += f" (1RM {one_rep_maxes[lift]:.1f}, intensity {scales[lift] - 1:+.1%} from the log)"
+            print(f"  {lift.capitalize()}: {detail}")
+    return 0
+
+def command_today(args: argparse.Namespace) -> int:
+    import json
+    from program_sequence import ProgramSequence
+
+    when = args.date.date() if args.date else date.today()
+    sequence = ProgramSequence(make_builder(args), args.weeks)
+    week_number = sequence.week_for_date(when)
+    if week_number is None:
+        print(f"{when.isoformat()} is outside the program")
+        return 1
+    workout = sequence.workout_for_date(when)
+    if args.json:
+        print(json.dumps({"date": when.isoformat(), "week": week_number, "workout": workout}, indent=2))
+    elif workout is None:
+        print(f"Week {week_number}, {when.strftime('%A %m-%d-%Y')}: rest day")
+    else:
+        print(f"Week {week_number}, {when.strftime('%A %m-%d-%Y')}:")
+        for heading, value in workout.items():
+            if isinstance(value, list):
+                print(f"  {heading}:")
+                for item in value:
+                    print(f"    {item}")
+            else:
+                print(f"  {heading}: {value}")
+    return 0
+
+def export_sqlite(args: argparse.Namespace) -> int:
+    from program_store import ProgramStore
+
+    if args.output == "-":
+        raise ValueError("sqlite export needs --output FILE")
+    athletes = dict(args.athletes or [("athlete", args.start_date)])
+    with ProgramStore(args.output) as store:
+        rows = store.load(athletes.items(), args.weeks, selected_program(args))
+    print(f"Stored {len(athletes)} athlete(s), {rows:,} exercises in {args.output}", file=sys.stderr)
+    return 0
+
+def command_export(args: argparse.Namespace) -> int:
+    import json
+    from program_sequence import ProgramSequence
+
+    if args.format == "sqlite":
+        return export_sqlite(args)
+    if args.athletes and args.format == "json":
+        raise ValueError("--athlete needs --format jsonl, ics or sqlite")
+    # newline="" keeps the CRLF line endings iCalendar requires on every platform
+    out = sys.stdout if args.output == "-" else open(args.output, 'w', encoding='utf-8', newline="")
+    try:
+        if args.format == "json":
+            # Stream the JSON array one week at a time
+            out.write("[")
+            for index, week in enumerate(ProgramSequence(make_builder(args), args.weeks)):
+                out.write(",\n" if index else "\n")
+                out.write(json.dumps(week))
+            out.write("\n]\n")
+        else:
+            import exporters
+            from program_builder import ProgramBuilder
+
+            program = selected_program(args)
+            programs = ((name, ProgramBuilder(start, program))
+                        for name, start in args.athletes or [(None, args.start_date)])
+            lines = exporters.ics_lines if args.format == "ics" else exporters.jsonl_lines
+            out.writelines(lines(programs, args.weeks))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+def command_log(args: argparse.Namespace) -> int:
+    import json
+    import math
+    from training_log import TrainingLog, next_wave
+
+    log = TrainingLog(args.file)
+    program = selected_program(args)
+    result = next_wave(log, program, args.as_of.date() if args.as_of else None)
+    rows = range(len(result["e1rm"]))
+    if args.athletes:
+        unknown = [name for name in args.athletes if name not in log.athletes]
+        if unknown:
+            raise ValueError(f"no sets for {', '.join(map(repr, unknown))} in {args.file}")
+        wanted = {log.athletes.index(name) for name in args.athletes}
+        rows = [row for row in rows if result["athlete"][row] in wanted]
+    records = [{
+        "athlete": log.athletes[result["athlete"][row]],
+        "lift": log.lifts[result["lift"][row]],
+        "e1rm": round(float(result["e1rm"][row]), 1),
+        "trend_per_week": round(float(result["slope"][row]), 2),
+        "weeks": int(result["weeks"][row]),
+        "week_of": str(result["week_start"][row]),
+        "intensity_scale": round(float(result["scale"][row]), 4),
+        "next_wave": [None if math.isnan(value) else round(value, 4) for value in result["intensities"][row].tolist()],
+    } for row in rows]
+    if args.json:
+        print(json.dumps(records, indent=2))
+        return 0
+    print(f"{len(log):,} sets, {len(log.athletes):,} athletes, {len(log.lifts)} lifts")
+    print(f"{'athlete':<16}{'lift':<12}{'e1RM':>8}{'trend/wk':>10}{'weeks':>7}  {'week of':<12}{'adjust':>8}  next wave")
+    for record in records:
+        if record["lift"] in program.waves:
+            wave = ' '.join("RPE" if value is None else f"{value:.1%}" for value in record["next_wave"])
+        else:
+            wave = "no wave in the program"
+        print(f"{record['athlete']:<16}{record['lift']:<12}{record['e1rm']:>8.1f}{record['trend_per_week']:>+10.2f}"
+              f"{record['weeks']:>7}  {record['week_of']:<12}{record['intensity_scale'] - 1:>+8.1%}  {wave}")
+    return 0
+
+def command_serve(args: argparse.Namespace) -> int:
+    from preview_server import serve
+
+    serve(args.host, args.port, total_weeks=args.weeks, start_date=args.start_date,
+          nav_mode=args.nav, css_mode=args.css, program_path=args.program)
+    return 0
+
+def command_bench(args: argparse.Namespace) -> int:
+    import importlib
+
+    status = 0
+    for name in args.names or BENCHMARKS:
+        print(f"== {name} ==")
+        module = importlib.import_module(f"benchmarks.bench_{name}")
+        if name in BENCHMARK_ARGS:
+            status = module.main(BENCHMARK_ARGS[name]) or status
+        else:
+            module.main()
+        print()
+    return status
+
+def command_worker(args: argparse.Namespace) -> int:
+    import contextlib
+    import io
+    import json
+    import shlex
+
+    # One request per line: a command line string or a JSON list of arguments.
+    # Each gets one JSON line back with its exit status and captured output.
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        output = io.StringIO()
+        error = None
+        try:
+            argv = json.loads(line) if line.startswith("[") else shlex.split(line)
+            if argv and argv[0] == "worker":
+                raise ValueError("worker requests cannot start another worker")
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                status = run(argv)
+        except SystemExit as exit_request:
+            status = exit_request.code if isinstance(exit_request.code, int) else 2
+        except Exception as exc:
+            status, error = 1, f"{type(exc).__name__}: {exc}"
+        response = {"status": status, "output": output.getvalue()}
+        if error is not None:
+            response["error"] = error
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Powerlifting program generator")
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+
+    program_options = argparse.ArgumentParser(add_help=False)
+    program_options.add_argument("--weeks", type=parse_positive_int, default=24, help="program length in weeks")
+    program_options.add_argument("--start-date", type=parse_date, default=None,
+                                 help="first Monday of the program, YYYY-MM-DD (default 2025-02-17)")
+    program_options.add_argument("--program", type=parse_program_path, metavar="FILE",
+                                 help="TOML or JSON program definition (default: the bundled programs/default.toml)")
+
+    build_options = argparse.ArgumentParser(add_help=False, parents=[program_options])
+    build_options.add_argument("--output-dir", default="docs", help="directory the site is written to")
+    build_options.add_argument("--jobs", "-j", type=parse_positive_int, default=1,
+                               help="number of worker processes used to render and write pages")
+    build_options.add_argument("--nav", choices=OUTPUT_MODES, default="inline",
+                               help="inline the week selector in every page or load it from one shared nav file")
+    build_options.add_argument("--css", choices=OUTPUT_MODES, default="inline",
+                               help="inline CSS in every page or link one minified, fingerprinted stylesheet")
+    build_options.add_argument("--no-manifest", action="store_true",
+                               help="neither read nor write the build manifest; keeps no per-page state in memory")
+    build_options.add_argument("--compress", nargs="*", choices=COMPRESSION_FORMATS, metavar="FORMAT",
+                               help="also write precompressed copies of each output: gz and/or zst "
+                                    "(default: gz, plus zst when the zstandard package is installed)")
+    build_options.add_argument("--layout", choices=LAYOUTS, default="pages",
+                               help="one HTML page per week, or one program.json rendered client-side by app.html "
+                                    "with redirects from the week page URLs")
+    build_options.add_argument("--minify", action="store_true",
+                               help="strip insignificant whitespace and comments from HTML and inline CSS")
+    build_options.add_argument("--search", action="store_true",
+                               help="also write a search index of exercises, gear and bars with a lookup script")
+    build_options.add_argument("--force", action="store_true",
+                               help="rebuild every page even if its inputs are unchanged")
+
+    build = subparsers.add_parser("build", parents=[build_options], help="generate the HTML site")
+    build.add_argument("--profile", metavar="PATH",
+                       help="record per-stage timings, counters and cache hit rates as JSON")
+    build.add_argument("--trace", metavar="PATH",
+                       help="record the build as a Chrome trace-event file (chrome://tracing, Perfetto)")
+    build.set_defaults(handler=command_build)
+
+    watch = subparsers.add_parser("watch", parents=[build_options],
+                                  help="build, then rebuild affected pages whenever a source changes")
+    watch.add_argument("--interval", type=float, default=0.25, help="seconds between checks for changes")
+    watch.set_defaults(handler=command_watch)
+
+    week = subparsers.add_parser("week", parents=[program_options], help="print one week of the program")
+    week.add_argument("number", type=parse_positive_int, help="1-based week number")
+    week.add_argument("--json", action="store_true", help="print the week dict as JSON")
+    for lift in MAIN_LIFTS:
+        week.add_argument(f"--{lift}", type=float, metavar="1RM",
+                          help=f"{lift} one-rep max in lb; adds loads and plates per side")
+    week.add_argument("--log", type=parse_log_path, metavar="CSV",
+                      help="training log to take the 1RMs and next-wave intensities of --athlete from")
+    week.add_argument("--athlete", metavar="NAME", help="athlete in --log")
+    week.set_defaults(handler=command_week)
+
+    today = subparsers.add_parser("today", parents=[program_options], help="print the workout for a date")
+    today.add_argument("--date", type=parse_date, default=None, help="date to look up instead of today")
+    today.add_argument("--json", action="store_true", help="print the workout as JSON")
+    today.set_defaults(handler=command_today)
+
+    export = subparsers.add_parser("export", parents=[program_options], help="export the schedule as data")
+    export.add_argument("--output", "-o", default="-", help="output file, or - for stdout")
+    export.add_argument("--format", choices=EXPORT_FORMATS, default="json",
+                        help="json array of weeks, JSON Lines, an iCalendar feed or a normalized SQLite database "
+                             "(default: json)")
+    export.add_argument("--athlete", dest="athletes", action="append", type=parse_athlete, metavar="NAME[=DATE]",
+                        help="athlete to export with jsonl, ics or sqlite, repeatable; "
+                             "defaults to one program starting at --start-date")
+    export.set_defaults(handler=command_export)
+
+    log = subparsers.add_parser("log", help="e1RM trends and next-wave intensities from a CSV training log")
+    log.add_argument("file", type=parse_log_path, metavar="CSV",
+                     help="log with athlete, date, lift, weight and reps columns; appended lines are parsed "
+                          "incrementally from .cache/training_logs")
+    log.add_argument("--athlete", dest="athletes", action="append", metavar="NAME",
+                     help="only show this athlete, repeatable")
+    log.add_argument("--as-of", type=parse_date, default=None, help="ignore sets after this date")
+    log.add_argument("--program", type=parse_program_path, metavar="FILE",
+                     help="TOML or JSON program definition whose waves are adjusted (default: the bundled one)")
+    log.add_argument("--json", action="store_true", help="print the trends as JSON")
+    log.set_defaults(handler=command_log)
+
+    serve = subparsers.add_parser("serve", parents=[program_options],
+                                  help="preview the site from memory without writing docs/")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    serve.add_argument("--port", type=int, default=8000, help="port to listen on (0 picks a free one)")
+    serve.add_argument("--nav", choices=OUTPUT_MODES, default="inline", help="navigation mode of served pages")
+    serve.add_argument("--css", choices=OUTPUT_MODES, default="inline", help="CSS mode of served pages")
+    serve.set_defaults(handler=command_serve)
+
+    bench = subparsers.add_parser("bench", help="run benchmarks")
+    bench.add_argument("names", nargs="*", choices=BENCHMARKS, metavar="name",
+                       help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default all)")
+    bench.set_defaults(handler=command_bench)
+
+    worker = subparsers.add_parser("worker", help="answer one command per stdin line without restarting")
+    worker.set_defaults(handler=command_worker)
+    return parser
+
+def is_reported_error(exc: Exception) -> bool:
+    """Returns whether a failure is reported as "error: ..." rather than traced back as a bug"""
+    if isinstance(exc, BrokenPipeError):
+        return False
+    if isinstance(exc, (IndexError, ValueError, OSError)):
+        return True
+    # sqlite3 is only imported by the commands that use it, so only then can its errors occur
+    sqlite3 = sys.modules.get("sqlite3")
+    return sqlite3 is not None and isinstance(exc, sqlite3.Error)
+
+def run(argv: List[str]) -> int:
+    """Parses argv and runs the chosen subcommand, returning its exit status"""
+    # Plain `main.py --jobs 4` style invocations keep meaning "build"
+    if not argv or (argv[0].startswith("-") and argv[0] not in ("-h", "--help")):
+        argv = ["build"] + list(argv)
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except Exception as exc:
+        if not is_reported_error(exc):
+            raise
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+def main(argv: Optional[List[str]] = None) -> int:
+    try:
+        return run(sys.argv[1:] if argv is None else argv)
+    except BrokenPipeError:
+        # Output piped into head and the like; stop quietly instead of tracing back
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
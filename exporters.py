@@ -0,0 +1,107 @@
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from models import Day, Week
+from program_builder import ProgramBuilder
+from program_sequence import ProgramSequence
+
+# (athlete name or None for a single unnamed program, builder)
+Program = Tuple[Optional[str], ProgramBuilder]
+
+CRLF = "\r\n"
+# RFC 5545 3.1: content lines are folded at 75 octets, not counting the CRLF
+MAX_LINE_OCTETS = 75
+PRODID = "-//Powerlifting Program//Schedule Export//EN"
+DAY_OFFSETS = {name: offset for offset, name in enumerate(ProgramSequence.DAY_NAMES)}
+
+def fold(line: str) -> str:
+    """Folds a content line at 75 octets without splitting UTF-8 characters, and ends it with CRLF"""
+    data = line.encode("utf-8")
+    if len(data) <= MAX_LINE_OCTETS:
+        return line + CRLF
+    parts = []
+    start = 0
+    # Continuation lines start with a space, which counts towards their 75 octets
+    limit = MAX_LINE_OCTETS
+    while len(data) - start > limit:
+        end = start + limit
+        while data[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(data[start:end].decode("utf-8"))
+        start = end
+        limit = MAX_LINE_OCTETS - 1
+    parts.append(data[start:].decode("utf-8"))
+    return (CRLF + " ").join(parts) + CRLF
+
+def escape_text(value: str) -> str:
+    """Escapes a TEXT property value (RFC 5545 3.3.11)"""
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+def day_summary(day: Day) -> str:
+    heading, value = day.sections[0]
+    line = (value if isinstance(value, str) else value[0]).strip()
+    return line if heading == "Main" else f"{heading}: {line}"
+
+def day_description(day: Day) -> str:
+    lines = []
+    for heading, value in day.sections:
+        if isinstance(value, str):
+            lines.append(f"{heading}: {value.strip()}")
+        else:
+            lines.append(f"{heading}:")
+            lines.extend(value)
+    return "\n".join(lines)
+
+def ics_events(athlete: Optional[str], builder: ProgramBuilder, total_weeks: int, stamp: str,
+               bodies: Dict[Day, Tuple[str, str]]) -> Iterator[str]:
+    """Yields the folded VEVENT lines of one program's training days"""
+    suffix = "" if athlete is None else f"-{athlete}"
+    prefix = "" if athlete is None else f"{athlete}: "
+    for number in range(1, total_weeks + 1):
+        week: Week = builder.build_week_model(number)
+        monday = builder.get_week_date(number)
+        header = f"Week {week.number} - Bar: {week.bar_type} - Gear: {week.gear}"
+        for day in week.days:
+            body = bodies.get(day)
+            if body is None:
+                body = bodies[day] = (escape_text(day_summary(day)), escape_text(day_description(day)))
+            summary, description = body
+            when = monday + timedelta(days=DAY_OFFSETS[day.name])
+            yield "BEGIN:VEVENT" + CRLF
+            yield fold(f"UID:{escape_text(f'{when:%Y%m%d}-{day.name.lower()}{suffix}')}@powerlifting-program")
+            yield "DTSTAMP:" + stamp + CRLF
+            yield f"DTSTART;VALUE=DATE:{when:%Y%m%d}" + CRLF
+            yield f"DTEND;VALUE=DATE:{when + timedelta(days=1):%Y%m%d}" + CRLF
+            yield fold(f"SUMMARY:{escape_text(prefix)}{summary}")
+            yield fold(f"DESCRIPTION:{escape_text(header)}\\n\\n{description}")
+            yield "END:VEVENT" + CRLF
+
+def ics_lines(programs: Iterable[Program], total_weeks: int, stamp: Optional[datetime] = None) -> Iterator[str]:
+    """Yields an RFC 5545 calendar with one all-day event per training day, line by line.
+
+    Weeks are built as they are written, so memory stays flat however many
+    weeks and athletes are exported; join or writelines() the result.
+    """
+    stamp = (stamp or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    # Days are interned by the builder, so most events reuse an escaped body
+    bodies: Dict[Day, Tuple[str, str]] = {}
+    yield "BEGIN:VCALENDAR" + CRLF
+    yield "VERSION:2.0" + CRLF
+    yield fold(f"PRODID:{PRODID}")
+    yield "CALSCALE:GREGORIAN" + CRLF
+    for athlete, builder in programs:
+        yield from ics_events(athlete, builder, total_weeks, stamp, bodies)
+    yield "END:VCALENDAR" + CRLF
+
+def jsonl_lines(programs: Iterable[Program], total_weeks: int) -> Iterator[str]:
+    """Yields one JSON object per week in the shape of build_week, each on its own line.
+
+    Weeks of named athletes carry an "Athlete" key first.
+    """
+    for athlete, builder in programs:
+        for number in range(1, total_weeks + 1):
+            week = builder.build_week(number)
+            if athlete is not None:
+                week = {"Athlete": athlete, **week}
+            yield json.dumps(week) + "\n"
@@ -0,0 +1,276 @@
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from fragment_cache import LRUCache
+from html_templates import HTMLTemplates, utf8_length
+from template_engine import CompiledTemplate
+
+# Elements whose content is copied as is; style content is minified as CSS instead
+RAW_TAGS = frozenset(["pre", "code", "textarea", "script", "style"])
+# Whitespace next to these tags never renders, so it is dropped rather than collapsed
+BLOCK_TAGS = frozenset([
+    "!doctype", "html", "head", "body", "title", "meta", "link", "style", "script", "noscript",
+    "div", "p", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "li", "pre", "blockquote", "hr", "br",
+    "table", "thead", "tbody", "tr", "th", "td", "select", "option", "form", "header", "footer", "section",
+])
+_SPACE = r'[ \t\n\r\f]'
+# Next thing that ends a plain stretch of markup: a raw element's opening tag or a comment.
+# Conditional comments are markup for old browsers and are minified like the rest.
+SPECIAL = re.compile(r'<(?:(pre|code|textarea|script|style)\b[^>]*>|!--(?!\[if))', re.I)
+RAW_CLOSE = {name: re.compile(rf'</{name}\s*>', re.I) for name in RAW_TAGS}
+TAG_SPLIT = re.compile(r'(<[^>]*>)')
+TAG_NAME = re.compile(r'</?([A-Za-z][A-Za-z0-9-]*|![A-Za-z]+)')
+# A non-breaking space is content, not whitespace
+WHITESPACE = re.compile(rf'{_SPACE}+')
+HTML_SPACE = ' \t\n\r\f'
+
+# Parser state between fragments: (unprocessed text, open raw element, whether the last tag was a block)
+State = Tuple[str, Optional[str], bool]
+START: State = ('', None, True)
+# Stands in for a template slot while the template's static text is minified
+SLOT_MARKER = re.compile('\x00([A-Za-z_][A-Za-z0-9_]*)\x00')
+
+def is_block(tag: str) -> bool:
+    """Returns whether a tag such as '</div>' or '<p class="x">' is a block-level tag"""
+    match = TAG_NAME.match(tag)
+    return match is not None and match.group(1).lower() in BLOCK_TAGS
+
+# Tags repeat from page to page, so their block-ness is looked up once per distinct tag
+_block_tags: Dict[str, bool] = {}
+
+def minify_text(text: str, after_block: bool, before_block: bool) -> str:
+    """Collapses a text run to single spaces, dropping the ones next to block tags"""
+    core = text.strip(HTML_SPACE)
+    if not core:
+        return '' if after_block or before_block else ' '
+    if '  ' in core or '\n' in core or '\t' in core or '\r' in core or '\f' in core:
+        core = WHITESPACE.sub(' ', core)
+    if not after_block and text[0] in HTML_SPACE:
+        core = ' ' + core
+    if not before_block and text[-1] in HTML_SPACE:
+        core += ' '
+    return core
+
+def minify_markup(markup: str, after_block: bool) -> Tuple[str, bool]:
+    """Minifies markup that ends with a complete tag and holds no raw elements or comments.
+
+    Returns the minified markup and whether its last tag is a block tag.
+    """
+    # Alternating text and tags, starting and ending with (possibly empty) text
+    parts = TAG_SPLIT.split(markup)
+    previous_block = after_block
+    for index in range(0, len(parts) - 1, 2):
+        tag = parts[index + 1]
+        next_block = _block_tags.get(tag)
+        if next_block is None:
+            next_block = _block_tags[tag] = is_block(tag)
+        text = parts[index]
+        if text:
+            if text.isspace() and text.isascii():
+                # The common case: indentation between two tags
+                parts[index] = '' if previous_block or next_block else ' '
+            else:
+                parts[index] = minify_text(text, previous_block, next_block)
+        previous_block = next_block
+    return ''.join(parts), previous_block
+
+def minify_fragment(state: State, fragment: str) -> Tuple[str, State]:
+    """Minifies as much of fragment as can be decided, returning the output and the state to continue from.
+
+    Whitespace is only decided once the tags on both sides of it are known,
+    so trailing whitespace, partial tags, incomplete comments and unclosed
+    raw elements are held back until more of the document arrives.
+    """
+    pending, raw, after_block = state
+    buffer = pending + fragment if pending else fragment
+    out = []
+    position = 0
+    while True:
+        if raw is not None:
+            close = RAW_CLOSE[raw].search(buffer, position)
+            if close is None:
+                if raw != "style":
+                    # Keep back only what could be the start of the closing tag
+                    keep = buffer.rfind('<', position)
+                    keep = len(buffer) if keep == -1 else keep
+                    out.append(buffer[position:keep])
+                    position = keep
+                break
+            content = buffer[position:close.start()]
+            out.append(HTMLTemplates.minify_css(content) if raw == "style" else content)
+            out.append(close.group())
+            after_block = raw in BLOCK_TAGS
+            raw = None
+            position = close.end()
+            continue
+
+        special = SPECIAL.search(buffer, position)
+        if special is not None and special.group(1) is None:
+            end = buffer.find('-->', special.end())
+            if end == -1:
+                stop = special.start()
+            else:
+                # Drop the comment and let the text around it join up
+                buffer = buffer[position:special.start()] + buffer[end + 3:]
+                position = 0
+                continue
+        elif special is not None:
+            stop = special.end()
+        else:
+            stop = len(buffer)
+        # Only markup up to the last complete tag can be decided
+        cut = buffer.rfind('>', position, stop) + 1
+        if cut <= position:
+            break
+        markup, after_block = minify_markup(buffer[position:cut], after_block)
+        out.append(markup)
+        position = cut
+        if special is None or cut != special.end():
+            break
+        raw = special.group(1).lower()
+    pending = buffer[position:]
+    if raw is None and pending and '<' not in pending:
+        # Trailing text only waits on its final whitespace, so week numbers
+        # and dates in slots do not make every later fragment a cache miss
+        text = pending.rstrip(HTML_SPACE)
+        if text:
+            out.append(minify_text(text, after_block, False))
+            after_block = False
+        pending = ' ' if len(text) < len(pending) and not after_block else ''
+    return ''.join(out), (pending, raw, after_block)
+
+def finish(state: State) -> str:
+    """Returns the output still held back in state once the document has ended"""
+    pending, raw, after_block = state
+    if not pending:
+        return ''
+    # Whatever is left is trailing text or an element the document never closed
+    return pending if raw is not None else minify_text(pending, after_block, True)
+
+def minify_html(html: str) -> str:
+    """Minifies a whole document, or a fragment that closes every element it opens"""
+    out, state = minify_fragment(START, html)
+    return out + finish(state)
+
+class HTMLMinifier:
+    """Streaming HTML minifier that strips insignificant whitespace and comments.
+
+    Whitespace runs collapse to one space and disappear entirely next to
+    block-level tags; <pre>, <code>, <textarea> and <script> pass through
+    untouched and <style> content is minified as CSS. Fragments may split
+    tags anywhere. Pages repeat most of their fragments, so results are
+    cached per (state, fragment) and a repeated fragment costs a lookup.
+    """
+
+    CACHE_SIZE = 512
+    # Long fragments are minified in pieces cut after a tag, so one minify
+    # step never has to hold a whole large fragment
+    CHUNK_LENGTH = 2048
+
+    def __init__(self):
+        self.cache = LRUCache(self.CACHE_SIZE)
+        self.documents = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def minify(self, fragments: Iterable[str]) -> Iterator[str]:
+        """Yields the minified document as its fragments stream in"""
+        state = START
+        cache = self.cache
+        for piece in self.pieces(fragments):
+            result = cache.get((state, piece))
+            if result is None:
+                out, next_state = minify_fragment(state, piece)
+                result = (out, next_state, utf8_length(piece), utf8_length(out))
+                cache.put((state, piece), result)
+            out, state, bytes_in, bytes_out = result
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            if out:
+                yield out
+        out = finish(state)
+        if out:
+            self.bytes_out += utf8_length(out)
+            yield out
+        self.documents += 1
+
+    def pieces(self, fragments: Iterable[str]) -> Iterator[str]:
+        """Regroups fragments into pieces of about CHUNK_LENGTH characters.
+
+        Short fragments, like one index link per week, are joined so each
+        minify step and cache lookup covers a CHUNK_LENGTH worth of markup.
+        """
+        batch: List[str] = []
+        length = 0
+        for fragment in fragments:
+            if len(fragment) > self.CHUNK_LENGTH:
+                if batch:
+                    yield ''.join(batch)
+                    batch, length = [], 0
+                yield from self.chunks(fragment)
+                continue
+            batch.append(fragment)
+            length += len(fragment)
+            if length >= self.CHUNK_LENGTH:
+                yield ''.join(batch)
+                batch, length = [], 0
+        if batch:
+            yield ''.join(batch)
+
+    def chunks(self, fragment: str) -> Iterator[str]:
+        """Cuts a long fragment after the first tag end past every CHUNK_LENGTH characters.
+
+        Cut points are offsets, not content: an edit that changes the length
+        of the fragment, like a "selected" marker, moves every later cut, so
+        the pieces after it no longer come from the cache.
+        """
+        start = 0
+        while len(fragment) - start > self.CHUNK_LENGTH:
+            cut = fragment.find('>', start + self.CHUNK_LENGTH) + 1
+            if not cut:
+                break
+            yield fragment[start:cut]
+            start = cut
+        yield fragment[start:]
+
+    def minify_document(self, html: str) -> str:
+        return ''.join(self.minify((html,)))
+
+    @staticmethod
+    def minify_html(html: str) -> str:
+        """Minifies a document or self-contained fragment without counting it"""
+        return minify_html(html)
+
+    @staticmethod
+    def minify_template(template: CompiledTemplate) -> CompiledTemplate:
+        """Returns the template with its static text minified and its slots in place.
+
+        Slots stand in as plain text while minifying, so whitespace between a
+        slot and a block tag is dropped and whitespace next to text is kept as
+        one space. Slot values are expected to be minified separately.
+        """
+        source = ''.join(
+            segment if name is None else f'\x00{name}\x00'
+            for segment, name in zip(template.segments, template.slot_names())
+        )
+        parts = SLOT_MARKER.split(minify_html(source))
+        # Alternating literal text and slot names, starting and ending with text
+        return CompiledTemplate(''.join(
+            part.replace('{', '{{').replace('}', '}}') if index % 2 == 0 else f'{{{part}}}'
+            for index, part in enumerate(parts)
+        ))
+
+    def add_counts(self, documents: int, bytes_in: int, bytes_out: int):
+        """Adds the counts of a minifier that ran in another process"""
+        self.documents += documents
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+
+    def take_counts(self) -> Tuple[int, int, int]:
+        """Returns and resets the counts, to hand them to the parent process"""
+        counts = (self.documents, self.bytes_in, self.bytes_out)
+        self.documents = self.bytes_in = self.bytes_out = 0
+        return counts
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_in - self.bytes_out
@@ -1,6 +1,154 @@
-from typing import Dict, List
+import hashlib
+import json
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from fragment_cache import LRUCache
+from models import Day, Week
+from template_engine import CompiledTemplate
+
+# Patterns of HTMLTemplates.minify_css, compiled once
+CSS_STYLE_TAG = re.compile(r'</?style>')
+CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+CSS_SPACE = re.compile(r'\s+')
+CSS_PUNCTUATION = re.compile(r'\s*([{};:,])\s*')
+
+def utf8_length(text: str) -> int:
+    return len(text) if text.isascii() else len(text.encode('utf-8'))
+
+class Navigation:
+    """Week navigation shared by every page of a build.
+
+    The option list is built once; pages only differ in which option carries
+    the "selected" marker and in their prev/next links. In shared mode the
+    option list is left out of the pages entirely and filled in client-side
+    from a single nav data script. With minify, the navigation comes out
+    already minified: it is built without the whitespace a minifier would
+    drop, so pages pay nothing extra for it.
+    """
+
+    INLINE = "inline"
+    SHARED = "shared"
+    MODES = (INLINE, SHARED)
+    DATA_FILENAME = "nav.js"
+
+    def __init__(self, weeks: Sequence[Tuple[int, str]], mode: str = INLINE, minify: bool = False):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown navigation mode: {mode}")
+        self.weeks = weeks
+        self.mode = mode
+        self.minify = minify
+        # Newlines next to the div, select and option tags never render, so minified navigation leaves them out
+        self._newline = '' if minify else '\n'
+        self._select_open = (f'<div class="week-links">{self._newline}'
+                             f'<select class="week-select" onchange="window.location.href=this.value">{self._newline}')
+        self._options = ''
+        self._selected_offsets: Dict[int, int] = {}
+        if mode == self.INLINE:
+            self._build_options()
+
+    @classmethod
+    def from_programs(cls, all_programs: List[Dict], mode: str = INLINE) -> "Navigation":
+        """Builds the navigation for a list of week programs"""
+        return cls([(program["Week"], program["Date"]) for program in all_programs], mode)
+
+    def _build_options(self):
+        """Joins every option once, remembering where each " selected" marker goes"""
+        parts = []
+        offset = 0
+        for week_num, date in self.weeks:
+            head = f'<option value="{date}-program.html"'
+            self._selected_offsets.setdefault(week_num, offset + len(head))
+            option = f'{head}>Week {week_num} - {date}</option>{self._newline}'
+            parts.append(option)
+            offset += len(option)
+        self._options = ''.join(parts)
+
+    def render(self, current_week: int) -> str:
+        """Generates navigation links for the page of the given week"""
+        return ''.join(self.iter_render(current_week))
+
+    def iter_render(self, current_week: int) -> Iterator[str]:
+        """Yields the navigation of a week piece by piece, leaving the option list unjoined"""
+        links = self._links(current_week)
+        if self.mode == self.INLINE:
+            yield self._select_open
+            options = self._options
+            offset = self._selected_offsets.get(current_week)
+            if offset is not None:
+                yield options[:offset]
+                yield ' selected'
+                options = options[offset:]
+            yield options
+            yield '</select>'
+            # The select is already out; an empty head still puts a newline after it
+            head = ['']
+        else:
+            head = self._shared_head(current_week)
+        if self.minify:
+            # Only the space between the two links renders
+            yield ''.join(head)
+            yield ' '.join(links)
+            yield '</div>'
+        else:
+            yield '\n'.join(head + links + ['</div>'])
+
+    def _shared_head(self, current_week: int) -> List[str]:
+        """Returns the empty week selector and nav script tag of shared mode"""
+        return [
+            '<div class="week-links">',
+            f'<select class="week-select" data-current-week="{current_week}" '
+            'onchange="window.location.href=this.value"></select>',
+            f'<script src="{self.DATA_FILENAME}"></script>'
+        ]
+
+    def _links(self, current_week: int) -> List[str]:
+        """Returns the prev/next links of a week"""
+        links = []
+        if current_week > 1:
+            prev_date = self.weeks[current_week - 2][1]
+            links.append(
+                f'<a href="{prev_date}-program.html" class="nav-link">← Week {current_week - 1}</a>'
+            )
+        
+        if current_week < len(self.weeks):
+            next_date = self.weeks[current_week][1]
+            links.append(
+                f'<a href="{next_date}-program.html" class="nav-link">Week {current_week + 1} →</a>'
+            )
+        return links
+
+    def generate_data_file(self) -> str:
+        """Generates the shared nav script that fills in the week selector"""
+        return ''.join(self.iter_data_file())
+
+    def iter_data_file(self) -> Iterator[str]:
+        """Yields the shared nav script one week entry at a time"""
+        yield "(function () {\n    var weeks = ["
+        separator = ''
+        for week_num, date in self.weeks:
+            yield f'{separator}[{week_num},{json.dumps(date)}]'
+            separator = ','
+        yield """];
+    var select = document.currentScript.previousElementSibling;
+    var current = Number(select.getAttribute('data-current-week'));
+    for (var i = 0; i < weeks.length; i++) {
+        var option = document.createElement('option');
+        option.value = weeks[i][1] + '-program.html';
+        option.textContent = 'Week ' + weeks[i][0] + ' - ' + weeks[i][1];
+        option.selected = weeks[i][0] === current;
+        select.appendChild(option);
+    }
+})();
+"""
 
 class HTMLTemplates:
+    CSS_INLINE = "inline"
+    CSS_SHARED = "shared"
+    CSS_MODES = (CSS_INLINE, CSS_SHARED)
+    PROGRAM_PAGE_CLASS = "program-page"
+    INDEX_PAGE_CLASS = "index-page"
+
     @staticmethod
     def generate_css() -> str:
         """Generates CSS styling for the program"""
@@ -269,21 +417,251 @@ class HTMLTemplates:
         """
 
     @staticmethod
-    def generate_program_page(week_program: Dict, all_programs: List[Dict]) -> str:
+    def generate_index_css() -> str:
+        """Generates CSS styling for the index page"""
+        return """<style>
+                body {
+                    font-family: Arial, sans-serif;
+                    max-width: 1200px;
+                    margin: 40px auto;
+                    padding: 0 20px;
+                    line-height: 1.6;
+                }
+                .program-container {
+                    display: grid;
+                    grid-template-columns: 250px 1fr;
+                    gap: 30px;
+                    margin-top: 30px;
+                }
+                .sidebar {
+                    background: white;
+                    padding: 20px;
+                    border-radius: 8px;
+                    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+                    height: fit-content;
+                    position: sticky;
+                    top: 20px;
+                }
+                .main-content {
+                    background: white;
+                    padding: 30px;
+                    border-radius: 8px;
+                    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+                }
+                h1, h2, h3 {
+                    color: #2c3e50;
+                }
+                h1 {
+                    border-bottom: 2px solid #eee;
+                    padding-bottom: 10px;
+                }
+                h2 {
+                    margin-top: 30px;
+                    border-bottom: 1px solid #eee;
+                    padding-bottom: 5px;
+                }
+                .week-links {
+                    list-style-type: none;
+                    padding: 0;
+                }
+                .week-links li {
+                    margin: 10px 0;
+                    padding: 10px;
+                    background: #f8f9fa;
+                    border-radius: 4px;
+                }
+                a {
+                    color: #2c3e50;
+                    text-decoration: none;
+                }
+                a:hover {
+                    color: #3498db;
+                }
+                /* README content styles */
+                .readme-content {
+                    margin-top: 20px;
+                }
+                .readme-content h1 {
+                    font-size: 2em;
+                    margin-top: 0;
+                }
+                .readme-content h2 {
+                    font-size: 1.5em;
+                    margin-top: 25px;
+                }
+                .readme-content h3 {
+                    font-size: 1.2em;
+                    margin-top: 20px;
+                }
+                .readme-content p {
+                    margin: 15px 0;
+                }
+                .readme-content ul, .readme-content ol {
+                    padding-left: 25px;
+                    margin: 15px 0;
+                }
+                .readme-content li {
+                    margin: 5px 0;
+                }
+                .readme-content code {
+                    background-color: #f6f8fa;
+                    padding: 2px 4px;
+                    border-radius: 3px;
+                    font-family: monospace;
+                }
+                .readme-content pre {
+                    background-color: #f6f8fa;
+                    padding: 16px;
+                    border-radius: 6px;
+                    overflow-x: auto;
+                }
+                .readme-content blockquote {
+                    margin: 15px 0;
+                    padding: 0 15px;
+                    border-left: 4px solid #ddd;
+                    color: #666;
+                }
+                .readme-content table {
+                    border-collapse: collapse;
+                    width: 100%;
+                    margin: 15px 0;
+                }
+                .readme-content th, .readme-content td {
+                    border: 1px solid #ddd;
+                    padding: 8px;
+                    text-align: left;
+                }
+                .readme-content th {
+                    background-color: #f6f8fa;
+                }
+            </style>"""
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def minify_css(css: str) -> str:
+        """Strips style tags, comments and insignificant whitespace from CSS"""
+        css = CSS_STYLE_TAG.sub('', css)
+        css = CSS_COMMENT.sub('', css)
+        css = CSS_SPACE.sub(' ', css)
+        css = CSS_PUNCTUATION.sub(lambda match: match.group(1), css)
+        return css.replace(';}', '}').strip()
+
+    @staticmethod
+    def _scope_css(css: str, scope: str) -> str:
+        """Prefixes every selector of minified CSS with body.<scope>"""
+        def scope_selector(selector: str) -> str:
+            if selector == 'body' or selector.startswith(('body.', 'body ', 'body:')):
+                return f'body.{scope}{selector[4:]}'
+            return f'body.{scope} {selector}'
+
+        rules = []
+        for selectors, declarations in re.findall(r'([^{}]+)\{([^{}]*)\}', css):
+            scoped = ','.join(scope_selector(selector) for selector in selectors.split(','))
+            rules.append(f'{scoped}{{{declarations}}}')
+        return ''.join(rules)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def generate_shared_stylesheet() -> Tuple[str, str]:
+        """Returns the fingerprinted filename and minified contents of the stylesheet shared by all pages.
+
+        Program and index styles are each scoped to their page's body class so
+        one file can serve both without their rules leaking into each other.
+        """
+        css = (
+            HTMLTemplates._scope_css(HTMLTemplates.minify_css(HTMLTemplates.generate_css()),
+                                     HTMLTemplates.PROGRAM_PAGE_CLASS) +
+            HTMLTemplates._scope_css(HTMLTemplates.minify_css(HTMLTemplates.generate_index_css()),
+                                     HTMLTemplates.INDEX_PAGE_CLASS)
+        )
+        fingerprint = hashlib.sha256(css.encode('utf-8')).hexdigest()[:10]
+        return f"styles.{fingerprint}.css", css
+
+    @staticmethod
+    def page_styles(stylesheet: Optional[str], inline_css: str, page_class: str) -> Tuple[str, str]:
+        """Returns the head styles and body attributes for inline or linked CSS"""
+        if stylesheet is None:
+            return inline_css, ''
+        return f'<link rel="stylesheet" href="{stylesheet}">', f' class="{page_class}"'
+
+    @staticmethod
+    def generate_program_page(week_program: Dict, all_programs: List[Dict],
+                              navigation: Optional["Navigation"] = None,
+                              stylesheet: Optional[str] = None) -> str:
         """Generates a complete HTML file for a week's program"""
-        nav_links = HTMLTemplates._generate_navigation_links(week_program['Week'], all_programs)
-        content = HTMLTemplates._generate_week_content(week_program)
-        
-        return f"""
+        if navigation is None:
+            navigation = Navigation.from_programs(all_programs)
+        return ProgramPageRenderer(navigation, stylesheet).render(week_program)
+
+    @staticmethod
+    def iter_index_page(weeks: Iterable[Tuple[int, str]], readme_html: str,
+                        stylesheet: Optional[str] = None, search_html: str = '') -> Iterator[str]:
+        """Yields the index page, streaming one sidebar link per week"""
+        index_styles, body_attrs = HTMLTemplates.page_styles(
+            stylesheet, HTMLTemplates.generate_index_css(), HTMLTemplates.INDEX_PAGE_CLASS
+        )
+        links = (
+            f'<li><a href="{date}-program.html">Week {week_num} - {date}</a></li>'
+            for week_num, date in weeks
+        )
+        return INDEX_PAGE_TEMPLATE.iter_render(
+            index_styles=index_styles,
+            body_attrs=body_attrs,
+            links_html=links,
+            readme_html=readme_html,
+            search_html=search_html
+        )
+
+    @staticmethod
+    def _generate_navigation_links(current_week: int, all_programs: List[Dict]) -> str:
+        """Generates navigation links for the program pages"""
+        return Navigation.from_programs(all_programs).render(current_week)
+
+    @staticmethod
+    def _generate_week_content(week_program: Dict) -> str:
+        """Generates the HTML content for a week's program"""
+        return ProgramPageRenderer.render_week_content(week_program)
+
+INDEX_PAGE_TEMPLATE = CompiledTemplate("""
         <!DOCTYPE html>
         <html lang="en">
         <head>
             <meta charset="UTF-8">
             <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Powerlifting Program - Week {week_program['Week']}</title>
-            {HTMLTemplates.generate_css()}
+            <title>6-Month Powerlifting Program</title>
+            {index_styles}
         </head>
-        <body>
+        <body{body_attrs}>
+            <h1>6-Month Powerlifting Program</h1>
+            
+            <div class="program-container">
+                <div class="sidebar">
+                    <h3>Quick Navigation</h3>{search_html}
+                    <ul class="week-links">
+                        {links_html}
+                    </ul>
+                </div>
+                
+                <div class="main-content">
+                    <div class="readme-content">
+                        {readme_html}
+                    </div>
+                </div>
+            </div>
+        </body>
+        </html>
+        """)
+
+PROGRAM_PAGE_TEMPLATE = CompiledTemplate("""
+        <!DOCTYPE html>
+        <html lang="en">
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>Powerlifting Program - Week {week}</title>
+            {styles}
+        </head>
+        <body{body_attrs}>
             <div class="container">
                 <h1><a href="index.html">6-Month Powerlifting Program</a></h1>
                 <div class="week-program">
@@ -295,71 +673,230 @@ class HTMLTemplates:
             </div>
         </body>
         </html>
+        """)
+
+WEEK_HEADER_TEMPLATE = CompiledTemplate('''<div class="week-header">
+                <h2>Week {week} - {date}</h2>
+                <div class="program-meta">
+                    <p><strong>Bar:</strong> {bar}</p>
+                    <p><strong>Gear:</strong> {gear}</p>
+                </div>
+            </div>''')
+
+# Keys of a week dict that describe the week rather than a training day
+WEEK_META_KEYS = frozenset(['Week', 'Bar Type', 'Chains', 'Gear', 'Date'])
+
+@lru_cache(maxsize=1024)
+def _render_list_section(key: str, items: Tuple[str, ...]) -> str:
+    """Renders a list section; lines starting with '-' become indented sub-items"""
+    lines = [f'<div class="workout-section"><h4>{key}:</h4><ul>\n']
+    for item in items:
+        if item.startswith('-'):
+            lines.append(f'<li class="sub-item">{item[2:]}</li>\n')
+        else:
+            lines.append(f'<li>{item}</li>\n')
+    lines.append('</ul></div>')
+    return ''.join(lines)
+
+class ProgramPageRenderer:
+    """Reusable renderer for week pages built on precompiled templates.
+
+    Navigation and styles are fixed per renderer, so a build, server or batch
+    job creates one and calls render() for every week. Accessory lists repeat
+    from week to week, so each distinct list is rendered only once. For Week
+    models the workout-day blocks of each distinct set of days are cached
+    too, leaving only the header and navigation to render per week.
+
+    Given a minifier, Week pages come out already minified: the templates,
+    styles and each distinct days fragment are minified once and navigation
+    must be built with minify. Each page is measured as it comes out and
+    against the page it would have been unminified, which is what the
+    minifier's counts are kept from instead of streaming every page through it.
+    """
+
+    FRAGMENT_CACHE_SIZE = 256
+
+    def __init__(self, navigation: Navigation, stylesheet: Optional[str] = None, minifier=None):
+        if minifier is not None and not navigation.minify:
+            raise ValueError("Minified pages need navigation built with minify")
+        self.navigation = navigation
+        self.stylesheet = stylesheet
+        self.minifier = minifier
+        self.styles, self.body_attrs = HTMLTemplates.page_styles(
+            stylesheet, HTMLTemplates.generate_css(), HTMLTemplates.PROGRAM_PAGE_CLASS
+        )
+        self.page_template = PROGRAM_PAGE_TEMPLATE
+        self.header_template = WEEK_HEADER_TEMPLATE
+        if minifier is not None:
+            # The unminified navigation and styles are kept to measure what each page saves
+            self.plain_navigation = Navigation(navigation.weeks, navigation.mode)
+            self.plain_styles = self.styles
+            self.styles = minifier.minify_html(self.styles)
+            self.page_template = minifier.minify_template(PROGRAM_PAGE_TEMPLATE)
+            self.header_template = minifier.minify_template(WEEK_HEADER_TEMPLATE)
+        self.fragment_cache = LRUCache(self.FRAGMENT_CACHE_SIZE)
+        self.day_cache = LRUCache(self.FRAGMENT_CACHE_SIZE)
+
+    @property
+    def minified(self) -> bool:
+        """Whether Week pages come out minified"""
+        return self.minifier is not None
+
+    def days_fragment(self, week: Week) -> Tuple[str, str]:
+        """Returns the rendered workout-day blocks of a week and their digest.
+
+        Builders share one days tuple between weeks with the same signature,
+        so the tuple itself is the cache key. A lookup still hashes the whole
+        nested tuple; only the key comparison on a hit is by identity.
         """
+        return self._days_entry(week)[:2]
 
-    @staticmethod
-    def _generate_navigation_links(current_week: int, all_programs: List[Dict]) -> str:
-        """Generates navigation links for the program pages"""
-        links = ['<div class="week-links">']
-        
-        # Add week selector dropdown
-        links.append('<select class="week-select" onchange="window.location.href=this.value">')
-        for program in all_programs:
-            week_num = program["Week"]
-            date = program["Date"]
-            selected = ' selected' if week_num == current_week else ''
-            links.append(
-                f'<option value="{date}-program.html"{selected}>'
-                f'Week {week_num} - {date}</option>'
-            )
-        links.append('</select>')
-        
-        # Add prev/next navigation
-        if current_week > 1:
-            prev_program = all_programs[current_week - 2]
-            links.append(
-                f'<a href="{prev_program["Date"]}-program.html" class="nav-link">← Week {current_week - 1}</a>'
-            )
-        
-        if current_week < len(all_programs):
-            next_program = all_programs[current_week]
-            links.append(
-                f'<a href="{next_program["Date"]}-program.html" class="nav-link">Week {current_week + 1} →</a>'
+    def _days_entry(self, week: Week) -> Tuple[str, str, str]:
+        """Returns the days fragment and digest, with the fragment as it renders unminified"""
+        fragment = self.fragment_cache.get(week.days)
+        if fragment is None:
+            if self.minifier is None:
+                html = plain = ''.join(
+                    f'\n{ProgramPageRenderer.render_day(day.name, day.to_dict())}' for day in week.days
+                )
+            else:
+                # Day blocks open and close with block tags, so the newlines between them go and
+                # each block minifies on its own; weeks share most of their days, so blocks are cached
+                days = [self._minified_day(day) for day in week.days]
+                html = ''.join(day[0] for day in days)
+                plain = ''.join(f'\n{day[1]}' for day in days)
+            fragment = (html, hashlib.sha256(html.encode('utf-8')).hexdigest(), plain)
+            self.fragment_cache.put(week.days, fragment)
+        return fragment
+
+    def _minified_day(self, day: Day) -> Tuple[str, str]:
+        """Returns a workout-day block minified and as it renders unminified"""
+        block = self.day_cache.get(day)
+        if block is None:
+            html = ProgramPageRenderer.render_day(day.name, day.to_dict())
+            block = (self.minifier.minify_html(html), html)
+            self.day_cache.put(day, block)
+        return block
+
+    def render_week_header(self, week: Week) -> str:
+        """Renders the header block of a week"""
+        return self.header_template.render(
+            week=str(week.number),
+            date=week.date,
+            bar=week.bar_type,
+            gear=week.gear
+        )
+
+
+    def _count(self, week: Week, plain_days: str, bytes_out: int):
+        """Adds a minified page to the minifier's counts, measuring the page it replaces"""
+        unminified = PROGRAM_PAGE_TEMPLATE.iter_render(
+            week=str(week.number),
+            styles=self.plain_styles,
+            body_attrs=self.body_attrs,
+            nav_links=self.plain_navigation.iter_render(week.number),
+            content=(
+                WEEK_HEADER_TEMPLATE.render(week=str(week.number), date=week.date, bar=week.bar_type, gear=week.gear),
+                plain_days
             )
-            
-        links.append('</div>')
-        return '\n'.join(links)
+        )
+        self.minifier.add_counts(1, sum(utf8_length(fragment) for fragment in unminified), bytes_out)
+
+    def render_week(self, week: Week) -> str:
+        """Renders the complete page for a Week model"""
+        days, _, plain_days = self._days_entry(week)
+        page = self.page_template.render(
+            week=str(week.number),
+            styles=self.styles,
+            body_attrs=self.body_attrs,
+            nav_links=self.navigation.render(week.number),
+            content=self.render_week_header(week) + days
+        )
+        if self.minifier is not None:
+            self._count(week, plain_days, utf8_length(page))
+        return page
+
+    def iter_render_week(self, week: Week) -> Iterator[str]:
+        """Yields the page for a Week model as fragments, ready to stream to a file"""
+        days, _, plain_days = self._days_entry(week)
+        fragments = self.page_template.iter_render(
+            week=str(week.number),
+            styles=self.styles,
+            body_attrs=self.body_attrs,
+            nav_links=self.navigation.iter_render(week.number),
+            content=(self.render_week_header(week), days)
+        )
+        if self.minifier is None:
+            return fragments
+        return self._iter_counted(week, plain_days, fragments)
+
+    def _iter_counted(self, week: Week, plain_days: str, fragments: Iterator[str]) -> Iterator[str]:
+        """Yields a minified page's fragments, counting the page once they are all out"""
+        bytes_out = 0
+        for fragment in fragments:
+            bytes_out += utf8_length(fragment)
+            yield fragment
+        self._count(week, plain_days, bytes_out)
 
     @staticmethod
-    def _generate_week_content(week_program: Dict) -> str:
-        """Generates the HTML content for a week's program"""
-        content = [
-            f'''<div class="week-header">
-                <h2>Week {week_program['Week']} - {week_program['Date']}</h2>
-                <div class="program-meta">
-                    <p><strong>Bar:</strong> {week_program['Bar Type']}</p>
-                    <p><strong>Gear:</strong> {week_program['Gear']}</p>
-                </div>
-            </div>'''
-        ]
-        
+    def render_week_content(week_program: Dict) -> str:
+        """Renders the header and workout days of a week"""
+        content = [WEEK_HEADER_TEMPLATE.render(
+            week=str(week_program['Week']),
+            date=week_program['Date'],
+            bar=week_program['Bar Type'],
+            gear=week_program['Gear']
+        )]
         for day, workout in week_program.items():
-            if day not in ['Week', 'Bar Type', 'Chains', 'Gear', 'Date']:
-                content.append(f'<div class="workout-day"><h3>{day}</h3>')
-                if isinstance(workout, dict):
-                    for key, value in workout.items():
-                        if isinstance(value, list):
-                            content.append(f'<div class="workout-section"><h4>{key}:</h4><ul>')
-                            for item in value:
-                                if item.startswith('-'):
-                                    content.append(f'<li class="sub-item">{item[2:]}</li>')
-                                else:
-                                    content.append(f'<li>{item}</li>')
-                            content.append('</ul></div>')
-                        else:
-                            content.append(f'<div class="workout-section"><h4>{key}:</h4><p>{value}</p></div>')
+            if day not in WEEK_META_KEYS:
+                content.append(ProgramPageRenderer.render_day(day, workout))
+        return '\n'.join(content)
+
+    @staticmethod
+    def iter_week_content(week_program: Dict) -> Iterator[str]:
+        """Yields the header and then each workout day of a week"""
+        yield WEEK_HEADER_TEMPLATE.render(
+            week=str(week_program['Week']),
+            date=week_program['Date'],
+            bar=week_program['Bar Type'],
+            gear=week_program['Gear']
+        )
+        for day, workout in week_program.items():
+            if day not in WEEK_META_KEYS:
+                yield '\n'
+                yield ProgramPageRenderer.render_day(day, workout)
+
+    @staticmethod
+    def render_day(day: str, workout) -> str:
+        """Renders one workout-day block"""
+        parts = [f'<div class="workout-day"><h3>{day}</h3>']
+        if isinstance(workout, dict):
+            for key, value in workout.items():
+                if isinstance(value, list):
+                    parts.append(_render_list_section(key, tuple(value)))
                 else:
-                    content.append(f'<p>{workout}</p>')
-                content.append('</div>')
-        
-        return '\n'.join(content)
\ No newline at end of file
+                    parts.append(f'<div class="workout-section"><h4>{key}:</h4><p>{value}</p></div>')
+        else:
+            parts.append(f'<p>{workout}</p>')
+        parts.append('</div>')
+        return '\n'.join(parts)
+
+    def render(self, week_program: Dict) -> str:
+        """Renders the complete page for a week"""
+        return PROGRAM_PAGE_TEMPLATE.render(
+            week=str(week_program['Week']),
+            styles=self.styles,
+            body_attrs=self.body_attrs,
+            nav_links=self.navigation.render(week_program['Week']),
+            content=self.render_week_content(week_program)
+        )
+
+    def iter_render(self, week_program: Dict) -> Iterator[str]:
+        """Yields the page for a week as fragments, ready to stream to a file"""
+        return PROGRAM_PAGE_TEMPLATE.iter_render(
+            week=str(week_program['Week']),
+            styles=self.styles,
+            body_attrs=self.body_attrs,
+            nav_links=self.navigation.render(week_program['Week']),
+            content=self.iter_week_content(week_program)
+        )
@@ -0,0 +1,131 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List, Optional
+
+class Instrumentation:
+    """Opt-in per-stage timings, counters and cache statistics for a build.
+
+    Stages are timed with a context manager and nest; each run becomes a
+    complete ("X") event in the Chrome trace and adds to its stage's summary.
+    A disabled instance hands out one shared no-op context and ignores
+    counts, so instrumented code costs a method call when it is off.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.caches: Dict[str, Dict[str, float]] = {}
+        self.events: List[Dict] = []
+        self._null = nullcontext()
+        if not enabled:
+            self.stage = self._disabled_stage
+            self.count = self._disabled_count
+            self.count_file = self._disabled_count
+
+    @classmethod
+    def disabled(cls) -> "Instrumentation":
+        return cls(enabled=False)
+
+    def _disabled_stage(self, name: str, **args):
+        return self._null
+
+    def _disabled_count(self, name: str, amount: int = 1):
+        pass
+
+    @contextmanager
+    def stage(self, name: str, **args) -> Iterator[None]:
+        """Times the enclosed block as one run of the named stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            elapsed = end - start
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = {"calls": 0, "seconds": 0.0, "max_seconds": 0.0}
+            stats["calls"] += 1
+            stats["seconds"] += elapsed
+            stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+            event = {
+                "name": name, "cat": "build", "ph": "X", "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "ts": (start - self.origin) * 1e6, "dur": elapsed * 1e6
+            }
+            if args:
+                event["args"] = args
+            self.events.append(event)
+
+    def count(self, name: str, amount: int = 1):
+        """Adds amount to a counter such as bytes written"""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def count_file(self, name: str, path: str):
+        """Adds the size of a written file to a counter"""
+        self.count(name, os.path.getsize(path))
+
+    def take(self) -> Dict:
+        """Returns and resets the stage timings, counters and events, to hand them to the parent process"""
+        taken = {"stages": self.stages, "counters": self.counters, "events": self.events}
+        self.stages, self.counters, self.events = {}, {}, []
+        return taken
+
+    def merge(self, taken: Dict):
+        """Adds the stage timings, counters and events an instance in another process took"""
+        for name, stats in taken["stages"].items():
+            own = self.stages.get(name)
+            if own is None:
+                self.stages[name] = dict(stats)
+                continue
+            own["calls"] += stats["calls"]
+            own["seconds"] += stats["seconds"]
+            own["max_seconds"] = max(own["max_seconds"], stats["max_seconds"])
+        for name, amount in taken["counters"].items():
+            self.counters[name] = self.counters.get(name, 0) + amount
+        self.events.extend(taken["events"])
+
+    def record_cache(self, name: str, hits: int, misses: int, size: Optional[int] = None):
+        """Records the hit statistics of a cache at the end of a build"""
+        if not self.enabled:
+            return
+        lookups = hits + misses
+        stats = {"hits": hits, "misses": misses, "hit_rate": hits / lookups if lookups else 0.0}
+        if size is not None:
+            stats["size"] = size
+        self.caches[name] = stats
+
+    def summary(self) -> Dict:
+        """Returns stage timings, counters and cache statistics as plain data"""
+        return {
+            "total_seconds": time.perf_counter() - self.origin,
+            "stages": self.stages,
+            "counters": self.counters,
+            "caches": self.caches,
+        }
+
+    def write_summary(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=1)
+
+    def write_trace(self, path: str):
+        """Writes the stage events in Chrome trace-event format (chrome://tracing, Perfetto)"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+    def format_summary(self) -> str:
+        """Returns the summary as a table for the terminal"""
+        lines = [f"{'stage':<24}{'calls':>8}{'total ms':>12}{'max ms':>10}"]
+        for name, stats in self.stages.items():
+            lines.append(f"{name:<24}{stats['calls']:>8}{stats['seconds'] * 1000:>12.2f}"
+                         f"{stats['max_seconds'] * 1000:>10.2f}")
+        for name, value in self.counters.items():
+            lines.append(f"{name:<24}{value:>30,}")
+        for name, stats in self.caches.items():
+            lines.append(f"{name + ' cache':<24}{stats['hits']:>8} hits {stats['misses']:>6} misses"
+                         f"{stats['hit_rate']:>8.1%}")
+        return "\n".join(lines)
@@ -0,0 +1,221 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Mapping, Optional, Tuple
+import numpy as np
+from program_builder import ProgramBuilder
+from program_definition import CompiledProgram, load_program
+
+# Bar weights in pounds for the bars programs rotate through
+BAR_WEIGHTS: Dict[str, float] = {"Straight": 45.0, "SSB": 65.0, "Cambered": 60.0}
+# Bars without a listed weight are taken to weigh as much as a standard bar
+DEFAULT_BAR_WEIGHT = 45.0
+STRAIGHT_BAR = "Straight"
+MAIN_LIFTS = ("squat", "bench", "deadlift")
+# Squat follows the week's bar rotation; bench and deadlift always use the straight bar
+ROTATING_BAR_LIFTS = frozenset(["squat"])
+
+@dataclass(frozen=True)
+class PlateInventory:
+    """Plates available per side of the bar, as (weight, count) pairs, heaviest first"""
+    plates: Tuple[Tuple[float, int], ...] = ((45.0, 8), (35.0, 1), (25.0, 1), (10.0, 2), (5.0, 1), (2.5, 1))
+    unit: str = "lb"
+
+    @property
+    def step(self) -> float:
+        """Smallest change in per-side load the inventory can make"""
+        return min(weight for weight, _ in self.plates)
+
+DEFAULT_INVENTORY = PlateInventory()
+
+@dataclass(frozen=True)
+class LoadPrescription:
+    lift: str
+    bar: str
+    intensity: float
+    target: float
+    load: float
+    plates: Tuple[float, ...]
+    capped: bool = False
+
+    def describe(self, unit: str = "lb") -> str:
+        per_side = ', '.join(f"{plate:g}" for plate in self.plates) or "none"
+        note = " (inventory limit)" if self.capped else ""
+        return f"{self.load:g} {unit}{note} on the {self.bar} bar, per side: {per_side}"
+
+class PlateSolver:
+    """Lookup table from per-side load to the fewest plates that make it.
+
+    Loads are indexed in steps of the lightest plate. The table holds, for
+    every step up to the inventory's capacity, the nearest loadable step
+    and its plate counts, so solving many loads is a pair of array lookups.
+    Use for_inventory() to share one table per inventory.
+    """
+
+    def __init__(self, inventory: PlateInventory):
+        self.inventory = inventory
+        self.step = inventory.step
+        self.weights = np.array([weight for weight, _ in inventory.plates])
+        units = [round(weight / self.step) for weight in self.weights]
+        if any(abs(unit * self.step - weight) > 1e-9 for unit, weight in zip(units, self.weights)):
+            raise ValueError("Plate weights must be multiples of the lightest plate")
+        capacity = sum(unit * count for unit, (_, count) in zip(units, inventory.plates))
+
+        # Bounded knapsack over single plates: fewest plates reaching each step
+        unreachable = np.iinfo(np.int64).max
+        fewest = np.full(capacity + 1, unreachable, dtype=np.int64)
+        fewest[0] = 0
+        counts = np.zeros((capacity + 1, len(units)), dtype=np.int64)
+        for index, (unit, (_, count)) in enumerate(zip(units, inventory.plates)):
+            for _ in range(count):
+                for total in range(capacity, unit - 1, -1):
+                    previous = fewest[total - unit]
+                    if previous != unreachable and previous + 1 < fewest[total]:
+                        fewest[total] = previous + 1
+                        counts[total] = counts[total - unit]
+                        counts[total, index] += 1
+
+        # Map every step to the nearest reachable one, preferring the lighter on ties.
+        # Zero and the full capacity are always reachable, so both neighbours exist.
+        reachable = np.flatnonzero(fewest != unreachable)
+        positions = np.arange(capacity + 1)
+        index = np.searchsorted(reachable, positions)
+        above = reachable[index]
+        below = reachable[np.maximum(index - 1, 0)]
+        self.nearest = np.where(
+            above == positions, positions,
+            np.where(positions - below <= above - positions, below, above)
+        )
+        self.counts = counts
+        self.capacity = capacity
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def for_inventory(inventory: PlateInventory) -> "PlateSolver":
+        """Returns the shared solver for an inventory, building its table on first use"""
+        return PlateSolver(inventory)
+
+    def solve(self, per_side: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns (loadable per-side weights, plate counts per weight, capped) for per-side targets"""
+        steps = np.rint(np.maximum(np.asarray(per_side, dtype=float), 0.0) / self.step).astype(np.int64)
+        capped = steps > self.capacity
+        steps = self.nearest[np.minimum(steps, self.capacity)]
+        return steps * self.step, self.counts[steps], capped
+
+    def plates(self, counts: np.ndarray) -> Tuple[float, ...]:
+        """Expands one row of plate counts into the plates loaded on each side, heaviest first"""
+        return tuple(float(weight) for weight, count in zip(self.weights, counts) for _ in range(count))
+
+
+class LoadCalculator:
+    """Turns athletes' one-rep maxes into bar loads and plate breakdowns.
+
+    Each main lift follows its own wave in the compiled program, the bundled
+    one by default; weeks prescribed by RPE, and lifts the program has no
+    wave for, have no percentage and therefore no load. Bar codes index the
+    program's bars as CompiledProgram.coded_column("bar") orders them, the
+    same codes ScheduleEngine produces.
+    """
+
+    def __init__(self, inventory: PlateInventory = DEFAULT_INVENTORY,
+                 bar_weights: Optional[Mapping[str, float]] = None,
+                 program: Optional[CompiledProgram] = None):
+        self.inventory = inventory
+        self.bar_weights = dict(BAR_WEIGHTS if bar_weights is None else bar_weights)
+        self.solver = PlateSolver.for_inventory(inventory)
+        self.program = program if program is not None else load_program()
+        # Percentages per lift, indexed by week of the wave from 1
+        self.wave_intensities = {}
+        for lift in MAIN_LIFTS:
+            steps = [exercise.intensity if isinstance(exercise.intensity, float) else np.nan
+                     for exercise in self.program.waves.get(lift, ())]
+            self.wave_intensities[lift] = np.array([np.nan] + (steps or [np.nan] * self.program.wave_length))
+        self.bars, bar_codes = self.program.coded_column("bar")
+        self.bar_codes = np.array(bar_codes)
+        # Bar weights in the order of self.bars, indexed by bar code
+        self.bar_code_weights = np.array([self.bar_weight(bar) for bar in self.bars])
+
+    def bar_weight(self, bar: str) -> float:
+        return self.bar_weights.get(bar, DEFAULT_BAR_WEIGHT)
+
+    def loads(self, one_rep_maxes: np.ndarray, week_in_cycle: np.ndarray,
+              bar_code: np.ndarray, lift: str, intensity_scale=1.0) -> Dict[str, np.ndarray]:
+        """Computes one lift's loads for many rows at once.
+
+        Arguments are aligned arrays, such as ScheduleEngine columns with each
+        row's athlete 1RM. intensity_scale, a number or one per row, scales the
+        wave's percentages, as training_log.next_wave suggests from e1RM trends.
+        Returns target and rounded loads, per-side plate counts (one column per
+        inventory plate), the bar weight and whether the inventory capped the
+        load; rows without a percentage get NaN loads.
+        """
+        if lift not in MAIN_LIFTS:
+            raise ValueError(f"Unknown lift: {lift}")
+        week_in_cycle = np.asarray(week_in_cycle)
+        intensity = self.wave_intensities[lift][week_in_cycle] * np.asarray(intensity_scale, dtype=float)
+        if lift in ROTATING_BAR_LIFTS:
+            bar = self.bar_code_weights[bar_code]
+        else:
+            bar = np.full(week_in_cycle.shape, self.bar_weight(STRAIGHT_BAR))
+        target = np.asarray(one_rep_maxes, dtype=float) * intensity
+        prescribed = ~np.isnan(target)
+        per_side, counts, capped = self.solver.solve(np.where(prescribed, (target - bar) / 2, 0.0))
+        return {
+            "intensity": intensity,
+            "target": target,
+            "load": np.where(prescribed, bar + 2 * per_side, np.nan),
+            "bar_weight": bar,
+            "plate_counts": np.where(prescribed[:, None], counts, 0),
+            "capped": capped & prescribed,
+        }
+
+    def batch(self, schedule: Dict[str, np.ndarray], one_rep_maxes: Mapping[str, np.ndarray],
+              intensity_scales: Optional[Mapping[str, np.ndarray]] = None) -> Dict[str, Dict]:
+        """Computes every main lift for the output of a ScheduleEngine on the same program.
+
+        one_rep_maxes, and the optional intensity_scales, map each lift to one
+        value per athlete, in the order the athletes were passed to the engine.
+        """
+        athlete_rows = schedule["athlete_index"]
+        intensity_scales = intensity_scales or {}
+        return {
+            lift: self.loads(np.asarray(one_rep_maxes[lift], dtype=float)[athlete_rows],
+                             schedule["week_in_cycle"], schedule["bar_code"], lift,
+                             np.asarray(intensity_scales[lift], dtype=float)[athlete_rows]
+                             if lift in intensity_scales else 1.0)
+            for lift in MAIN_LIFTS if lift in one_rep_maxes
+        }
+
+    def week(self, one_rep_maxes: Mapping[str, float], week_number: int,
+             builder: Optional[ProgramBuilder] = None,
+             intensity_scales: Optional[Mapping[str, float]] = None) -> Dict[str, LoadPrescription]:
+        """Returns the prescriptions of one athlete's main lifts for a week of builder's program.
+
+        builder defaults to one for this calculator's program.
+        """
+        if builder is None:
+            builder = ProgramBuilder(program=self.program)
+        elif builder.program is not self.program:
+            return LoadCalculator(self.inventory, self.bar_weights, builder.program).week(
+                one_rep_maxes, week_number, builder, intensity_scales)
+        intensity_scales = intensity_scales or {}
+        week_in_cycle = np.array([(week_number - 1) % self.program.wave_length + 1])
+        bar_code = self.bar_codes[[self.program.row(week_number)]]
+        prescriptions = {}
+        for lift in MAIN_LIFTS:
+            if lift not in one_rep_maxes:
+                continue
+            result = self.loads(np.array([one_rep_maxes[lift]]), week_in_cycle, bar_code, lift,
+                                intensity_scales.get(lift, 1.0))
+            if np.isnan(result["load"][0]):
+                continue
+            bar = self.bars[bar_code[0]] if lift in ROTATING_BAR_LIFTS else STRAIGHT_BAR
+            prescriptions[lift] = LoadPrescription(
+                lift=lift,
+                bar=bar,
+                intensity=float(result["intensity"][0]),
+                target=float(result["target"][0]),
+                load=float(result["load"][0]),
+                plates=self.solver.plates(result["plate_counts"][0]),
+                capped=bool(result["capped"][0])
+            )
+        return prescriptions
@@ -1,15 +1,82 @@
 # main.py
+import hashlib
 import os
-from typing import List, Dict
-import markdown
-from program_builder import ProgramBuilder
-from html_templates import HTMLTemplates
+import sys
+from datetime import datetime
+from typing import Iterable, Iterator, List, Dict, Optional, Sequence, Tuple
+from build_manifest import BuildManifest
+from models import Week
+from program_builder import ProgramBuilder, WeekDates
+from program_definition import PROGRAM_CACHE, CompiledProgram
+from program_sequence import ProgramSequence
+from readme_cache import ReadmeCache
+from html_templates import HTMLTemplates, Navigation, ProgramPageRenderer, _render_list_section
+from instrumentation import Instrumentation
+
+# Modules of optional features are imported only by builds that turn them on,
+# so these mirror precompress.FORMATS and the SearchIndex and AppShell filenames
+PRECOMPRESSED_SUFFIXES = (".gz", ".zst")
+# Files only some builds write, removed once a build no longer produces them
+OPTIONAL_FILES = ("search-index.json", "search.js", Navigation.DATA_FILENAME, "program.json", "app.html")
+
+# Per-process state for parallel page rendering, set once by the pool initializer
+_worker_generator = None
+_worker_renderer: Optional[ProgramPageRenderer] = None
+
+def _init_page_worker(generator: "ProgramGenerator", renderer: ProgramPageRenderer):
+    global _worker_generator, _worker_renderer
+    _worker_generator = generator
+    _worker_renderer = renderer
+    # Forked workers start with the parent's counts; report only their own
+    if generator.minifier is not None:
+        generator.minifier.take_counts()
+    if generator.instrumentation.enabled:
+        generator.instrumentation.take()
+
+def _write_pages_in_worker(weeks: List[Week]) -> Tuple[Optional[Tuple[int, int, int]], Optional[Dict]]:
+    """Writes a batch of pages, returning the minifier counts and instrumentation for the parent to add up"""
+    for week in weeks:
+        _worker_generator.write_program_page(week, _worker_renderer)
+    if _worker_generator.precompressor is not None:
+        _worker_generator.precompressor.drain()
+    minified = _worker_generator.minifier.take_counts() if _worker_generator.minifier is not None else None
+    instrumentation = _worker_generator.instrumentation
+    return minified, instrumentation.take() if instrumentation.enabled else None
 
 class ProgramGenerator:
-    def __init__(self, total_weeks: int = 24):
-        self.program_builder = ProgramBuilder()
+    PAGE_BATCH_SIZE = 16
+    PAGES = "pages"
+    APP = "app"
+    LAYOUTS = (PAGES, APP)
+
+    def __init__(self, total_weeks: int = 24, incremental: bool = True, jobs: int = 1,
+                 nav_mode: str = Navigation.INLINE, css_mode: str = HTMLTemplates.CSS_INLINE,
+                 use_manifest: bool = True, start_date: Optional[datetime] = None,
+                 output_dir: str = "docs", instrumentation: Optional[Instrumentation] = None,
+                 compress: Sequence[str] = (), search: bool = False, layout: str = PAGES,
+                 minify: bool = False, program: Optional[CompiledProgram] = None):
+        if layout not in self.LAYOUTS:
+            raise ValueError(f"Unknown layout: {layout}")
+        self.program_builder = ProgramBuilder(start_date, program)
         self.total_weeks = total_weeks
-        self.output_dir = "docs"
+        self.output_dir = output_dir
+        self.incremental = incremental
+        self.jobs = jobs
+        self.nav_mode = nav_mode
+        self.css_mode = css_mode
+        self.use_manifest = use_manifest
+        self.readme_cache = ReadmeCache()
+        self.instrumentation = instrumentation or Instrumentation.disabled()
+        self.precompressor = None
+        if compress:
+            from precompress import Precompressor
+            self.precompressor = Precompressor(compress)
+        self.search = search
+        self.layout = layout
+        self.minifier = None
+        if minify:
+            from html_minifier import HTMLMinifier
+            self.minifier = HTMLMinifier()
         
     def ensure_output_directory(self):
         """Ensures the output directory exists"""
@@ -18,210 +85,343 @@ class ProgramGenerator:
             
     def generate_all_programs(self) -> List[Dict]:
         """Generates program data for all weeks"""
-        return [
-            self.program_builder.build_week(week) 
-            for week in range(1, self.total_weeks + 1)
-        ]
+        return list(self.iter_programs())
+
+    def iter_programs(self) -> Iterator[Dict]:
+        """Generates program data one week at a time"""
+        for week in self.iter_weeks():
+            yield week.to_dict()
+
+    def iter_weeks(self) -> Iterator[Week]:
+        """Generates compact Week models one week at a time"""
+        stage = self.instrumentation.stage
+        for week in range(1, self.total_weeks + 1):
+            with stage("build week"):
+                model = self.program_builder.build_week_model(week)
+            yield model
+
+    def program_sequence(self) -> ProgramSequence:
+        """Returns the program as a lazy sequence of week dicts"""
+        return ProgramSequence(self.program_builder, self.total_weeks)
+
+    def week_dates(self) -> WeekDates:
+        """Returns the (week, date) pairs of the program without building any weeks"""
+        return WeekDates(self.program_builder, self.total_weeks)
         
-    def generate_index_page(self, all_programs: List[Dict]) -> str:
-        """Generates the index.html content"""
-        # Generate week links for sidebar
-        links_html = ""
-        for program in all_programs:
-            week_num = program["Week"]
-            date = program["Date"]
-            links_html += f'<li><a href="{date}-program.html">Week {week_num} - {date}</a></li>'
-
-        # Parse README.md if it exists
+    def read_readme(self) -> Optional[str]:
+        """Returns the README.md contents, or None if it does not exist"""
         try:
             with open('README.md', 'r', encoding='utf-8') as f:
-                readme_content = f.read()
-            
-            md = markdown.Markdown(extensions=[
-                'extra',
-                'codehilite',
-                'meta'
-            ])
-            readme_html = md.convert(readme_content)
+                return f.read()
         except FileNotFoundError:
-            readme_html = "<p>Program documentation not found.</p>"
-
-        return f"""
-        <!DOCTYPE html>
-        <html lang="en">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>6-Month Powerlifting Program</title>
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    max-width: 1200px;
-                    margin: 40px auto;
-                    padding: 0 20px;
-                    line-height: 1.6;
-                }}
-                .program-container {{
-                    display: grid;
-                    grid-template-columns: 250px 1fr;
-                    gap: 30px;
-                    margin-top: 30px;
-                }}
-                .sidebar {{
-                    background: white;
-                    padding: 20px;
-                    border-radius: 8px;
-                    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                    height: fit-content;
-                    position: sticky;
-                    top: 20px;
-                }}
-                .main-content {{
-                    background: white;
-                    padding: 30px;
-                    border-radius: 8px;
-                    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                }}
-                h1, h2, h3 {{
-                    color: #2c3e50;
-                }}
-                h1 {{
-                    border-bottom: 2px solid #eee;
-                    padding-bottom: 10px;
-                }}
-                h2 {{
-                    margin-top: 30px;
-                    border-bottom: 1px solid #eee;
-                    padding-bottom: 5px;
-                }}
-                .week-links {{
-                    list-style-type: none;
-                    padding: 0;
-                }}
-                .week-links li {{
-                    margin: 10px 0;
-                    padding: 10px;
-                    background: #f8f9fa;
-                    border-radius: 4px;
-                }}
-                a {{
-                    color: #2c3e50;
-                    text-decoration: none;
-                }}
-                a:hover {{
-                    color: #3498db;
-                }}
-                /* README content styles */
-                .readme-content {{
-                    margin-top: 20px;
-                }}
-                .readme-content h1 {{
-                    font-size: 2em;
-                    margin-top: 0;
-                }}
-                .readme-content h2 {{
-                    font-size: 1.5em;
-                    margin-top: 25px;
-                }}
-                .readme-content h3 {{
-                    font-size: 1.2em;
-                    margin-top: 20px;
-                }}
-                .readme-content p {{
-                    margin: 15px 0;
-                }}
-                .readme-content ul, .readme-content ol {{
-                    padding-left: 25px;
-                    margin: 15px 0;
-                }}
-                .readme-content li {{
-                    margin: 5px 0;
-                }}
-                .readme-content code {{
-                    background-color: #f6f8fa;
-                    padding: 2px 4px;
-                    border-radius: 3px;
-                    font-family: monospace;
-                }}
-                .readme-content pre {{
-                    background-color: #f6f8fa;
-                    padding: 16px;
-                    border-radius: 6px;
-                    overflow-x: auto;
-                }}
-                .readme-content blockquote {{
-                    margin: 15px 0;
-                    padding: 0 15px;
-                    border-left: 4px solid #ddd;
-                    color: #666;
-                }}
-                .readme-content table {{
-                    border-collapse: collapse;
-                    width: 100%;
-                    margin: 15px 0;
-                }}
-                .readme-content th, .readme-content td {{
-                    border: 1px solid #ddd;
-                    padding: 8px;
-                    text-align: left;
-                }}
-                .readme-content th {{
-                    background-color: #f6f8fa;
-                }}
-            </style>
-        </head>
-        <body>
-            <h1>6-Month Powerlifting Program</h1>
-            
-            <div class="program-container">
-                <div class="sidebar">
-                    <h3>Quick Navigation</h3>
-                    <ul class="week-links">
-                        {links_html}
-                    </ul>
-                </div>
-                
-                <div class="main-content">
-                    <div class="readme-content">
-                        {readme_html}
-                    </div>
-                </div>
-            </div>
-        </body>
-        </html>
+            return None
+
+    def template_version(self) -> str:
+        """Returns a digest of the sources of every module that shapes the generated files"""
+        from watcher import source_paths
+        return BuildManifest.hash_files(source_paths())
+
+    def stylesheet_name(self) -> Optional[str]:
+        """Returns the shared stylesheet pages link to, or None when CSS is inlined"""
+        if self.css_mode == HTMLTemplates.CSS_INLINE:
+            return None
+        return HTMLTemplates.generate_shared_stylesheet()[0]
+
+    def sibling_suffixes(self) -> List[str]:
+        """Returns the suffixes of the precompressed copies written next to each output"""
+        return self.precompressor.extensions() if self.precompressor is not None else []
+
+    def write_output(self, path: str, fragments: Iterable[str], minified: bool = False):
+        """Writes a generated file, queueing its precompressed copies from the same bytes.
+
+        HTML goes through the minifier when minifying, unless it comes minified.
         """
+        if self.minifier is not None and path.endswith(".html") and not minified:
+            fragments = self.minifier.minify(fragments)
+        if self.precompressor is None:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.writelines(fragments)
+            return
+        data = ''.join(fragments).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(data)
+        self.precompressor.submit(path, data)
+
+    def write_program_page(self, week: Week, renderer: ProgramPageRenderer):
+        """Renders a single week's page straight into its file"""
+        filename = f"{self.output_dir}/{week.date}-program.html"
+        instrumentation = self.instrumentation
+        if not instrumentation.enabled:
+            self.write_output(filename, renderer.iter_render_week(week), renderer.minified)
+            return
+        
+        # Instrumented builds render the page whole so rendering and writing time apart
+        with instrumentation.stage("render page", week=week.number):
+            html = renderer.render_week(week)
+        with instrumentation.stage("write page", week=week.number):
+            self.write_output(filename, (html,), renderer.minified)
+        size = len(html.encode('utf-8'))
+        instrumentation.count("pages written")
+        instrumentation.count("bytes rendered", size)
+        instrumentation.count_file("bytes written", filename)
+
+    def write_program_pages(self, weeks: Iterable[Week], renderer: ProgramPageRenderer) -> Iterator[Week]:
+        """Writes the page of each week, yielding weeks in order once written"""
+        if self.jobs <= 1:
+            for week in weeks:
+                self.write_program_page(week, renderer)
+                yield week
+            return
+        
+        from collections import deque
+        from concurrent.futures import ProcessPoolExecutor
+        from itertools import islice
+        
+        # Pages go to worker processes in batches; only a bounded window of
+        # batches is in flight so memory stays flat however many weeks there are
+        weeks = iter(weeks)
+        with ProcessPoolExecutor(
+            max_workers=self.jobs,
+            initializer=_init_page_worker,
+            initargs=(self, renderer)
+        ) as executor:
+            in_flight = deque()
+            while True:
+                batch = list(islice(weeks, self.PAGE_BATCH_SIZE))
+                if batch:
+                    in_flight.append((batch, executor.submit(_write_pages_in_worker, batch)))
+                if in_flight and (not batch or len(in_flight) > self.jobs * 2):
+                    done, future = in_flight.popleft()
+                    minified, instrumented = future.result()
+                    if minified is not None:
+                        self.minifier.add_counts(*minified)
+                    if instrumented is not None:
+                        self.instrumentation.merge(instrumented)
+                    yield from done
+                elif not batch:
+                    return
+
+    def write_app(self, manifest: BuildManifest, siblings: Sequence[str], search_index: Optional["SearchIndex"] = None):
+        """Writes the single-page layout: program data, the shell page and a redirect stub per week"""
+        from app_shell import AppShell
+        stage = self.instrumentation.stage
+
+        def weeks() -> Iterator[Week]:
+            for week in self.iter_weeks():
+                if search_index is not None:
+                    search_index.add(week)
+                # Stubs keep the per-week page URLs of the pages layout working
+                page_name = f"{week.date}-program.html"
+                stub = AppShell.render_redirect(week)
+                if not manifest.is_current(page_name, BuildManifest.hash_inputs(stub), siblings):
+                    with stage("write redirect", week=week.number):
+                        self.write_output(f"{self.output_dir}/{page_name}", (stub,))
+                    print(f"Generated redirect for Week {week.number}: {week.date}")
+                yield week
+
+        with stage("program data"):
+            data = ''.join(AppShell.iter_data_file(weeks()))
+        shell = AppShell.render_shell(self.stylesheet_name())
+        for filename, content in ((AppShell.DATA_FILENAME, data), (AppShell.SHELL_FILENAME, shell)):
+            if not manifest.is_current(filename, BuildManifest.hash_inputs(content), siblings):
+                path = f"{self.output_dir}/{filename}"
+                self.write_output(path, (content,))
+                self.instrumentation.count_file("bytes written", path)
+
+    def write_search_index(self, manifest: BuildManifest, siblings: Sequence[str],
+                           search_index: Optional["SearchIndex"], pages_digest: str):
+        """Writes the search index and its script when they changed.
+
+        The app layout fills search_index while writing its data and keys the
+        index on its content. The pages layout keys it on pages_digest, a digest
+        of every page's inputs, and walks the weeks again to rebuild it only when
+        that changed and no index was filled along the way.
+        """
+        from search_index import SearchIndex
+        if self.layout == self.APP:
+            data = ''.join(search_index.iter_data_file())
+            digest = BuildManifest.hash_inputs((data,))
+        else:
+            data = None
+            digest = pages_digest
+        if not manifest.is_current(SearchIndex.DATA_FILENAME, digest, siblings):
+            if data is None:
+                if search_index is None:
+                    search_index = SearchIndex(self.program_builder.start_date)
+                    for week in self.iter_weeks():
+                        search_index.add(week)
+                data = ''.join(search_index.iter_data_file())
+            path = f"{self.output_dir}/{SearchIndex.DATA_FILENAME}"
+            self.write_output(path, (data,))
+            self.instrumentation.count_file("bytes written", path)
+        script = tuple(SearchIndex.iter_script())
+        if not manifest.is_current(SearchIndex.SCRIPT_FILENAME, BuildManifest.hash_inputs(script), siblings):
+            path = f"{self.output_dir}/{SearchIndex.SCRIPT_FILENAME}"
+            self.write_output(path, script)
+            self.instrumentation.count_file("bytes written", path)
+
+    def render_readme(self, readme_content: Optional[str]) -> str:
+        """Converts the README markdown to HTML, reusing the cached rendering when unchanged"""
+        if readme_content is None:
+            return "<p>Program documentation not found.</p>"
+        with self.instrumentation.stage("render readme"):
+            return self.readme_cache.render(readme_content)
+
+    def generate_index_page(self, all_programs: List[Dict], readme_content: Optional[str] = None,
+                            stylesheet: Optional[str] = None) -> str:
+        """Generates the index.html content"""
+        if readme_content is None:
+            readme_content = self.read_readme()
+        weeks = ((program["Week"], program["Date"]) for program in all_programs)
+        return ''.join(HTMLTemplates.iter_index_page(weeks, self.render_readme(readme_content), stylesheet))
     
+    def record_cache_stats(self, renderer: ProgramPageRenderer):
+        """Records the hit rates of the caches a build went through"""
+        instrumentation = self.instrumentation
+        if not instrumentation.enabled:
+            return
+        instrumentation.record_cache("program definitions", PROGRAM_CACHE.hits, PROGRAM_CACHE.misses)
+        fragments = renderer.fragment_cache
+        instrumentation.record_cache("day fragments", fragments.hits, fragments.misses, len(fragments))
+        sections = _render_list_section.cache_info()
+        instrumentation.record_cache("list sections", sections.hits, sections.misses, sections.currsize)
+        instrumentation.record_cache("readme", self.readme_cache.hits, self.readme_cache.misses)
+        if self.minifier is not None:
+            minified = self.minifier.cache
+            instrumentation.record_cache("minified fragments", minified.hits, minified.misses, len(minified))
+            days = renderer.day_cache
+            instrumentation.record_cache("minified day blocks", days.hits, days.misses, len(days))
+            instrumentation.count("bytes saved by minify", self.minifier.bytes_saved)
+
     def generate_program(self):
         """Main method to generate all program files"""
         print(f"Program start date: {self.program_builder.start_date.strftime('%m-%d-%Y')}")
+        stage = self.instrumentation.stage
         
         # Ensure output directory exists
         self.ensure_output_directory()
         
-        # Generate all program data
-        all_programs = self.generate_all_programs()
+        # Pages depend on their own week plus the week list shown in navigation,
+        # which is fully determined by the start date and program length
+        manifest = BuildManifest(self.output_dir, self.use_manifest)
+        siblings = self.sibling_suffixes()
+        if self.incremental:
+            with stage("load manifest"):
+                manifest.load()
+        with stage("prepare navigation"):
+            template_version = BuildManifest.hash_inputs(self.template_version(), self.css_mode,
+                                                         self.minifier is not None)
+            week_dates = self.week_dates()
+            navigation = Navigation(week_dates, self.nav_mode, minify=self.minifier is not None)
+            nav_digest = BuildManifest.hash_inputs(
+                self.program_builder.start_date.isoformat(), self.total_weeks, self.nav_mode
+            )
         
-        # Generate individual program pages
-        for program in all_programs:
-            filename = f"{self.output_dir}/{program['Date']}-program.html"
-            html_content = HTMLTemplates.generate_program_page(program, all_programs)
-            
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            print(f"Generated program for Week {program['Week']}: {program['Date']}")
+        # Shared navigation lives in one data file instead of every page
+        if self.nav_mode == Navigation.SHARED and self.layout == self.PAGES:
+            digest = BuildManifest.hash_inputs(template_version, nav_digest)
+            if not manifest.is_current(Navigation.DATA_FILENAME, digest, siblings):
+                with stage("write nav data"):
+                    path = f"{self.output_dir}/{Navigation.DATA_FILENAME}"
+                    self.write_output(path, navigation.iter_data_file())
+                    self.instrumentation.count_file("bytes written", path)
+        
+        # Every page links to one fingerprinted stylesheet instead of inlining it
+        if self.css_mode == HTMLTemplates.CSS_SHARED:
+            stylesheet, css = HTMLTemplates.generate_shared_stylesheet()
+            if not manifest.is_current(stylesheet, BuildManifest.hash_inputs(css), siblings):
+                with stage("write stylesheet"):
+                    path = f"{self.output_dir}/{stylesheet}"
+                    self.write_output(path, (css,))
+                    self.instrumentation.count_file("bytes written", path)
+        
+        # Build, render and write one week at a time; weeks sharing a signature
+        # reuse both their built days and rendered day blocks
+        renderer = ProgramPageRenderer(navigation, self.stylesheet_name(), self.minifier)
+        # The search index only depends on what the pages show, so in the pages
+        # layout it is keyed on their digests and reused while none changed. It is
+        # filled along the way only when there is no earlier index to reuse
+        search_index = None
+        week_digests = None
+        if self.search:
+            from search_index import SearchIndex
+            week_digests = hashlib.sha256()
+            if self.layout == self.APP or SearchIndex.DATA_FILENAME not in manifest.previous:
+                search_index = SearchIndex(self.program_builder.start_date)
+        
+        def changed_weeks() -> Iterator[Week]:
+            for week in self.iter_weeks():
+                if search_index is not None:
+                    search_index.add(week)
+                page_name = f"{week.date}-program.html"
+                with stage("hash week"):
+                    digest = BuildManifest.hash_inputs(
+                        template_version, nav_digest, week.number, week.date, week.bar_type, week.gear,
+                        renderer.days_fragment(week)[1]
+                    )
+                if week_digests is not None:
+                    week_digests.update(digest.encode('ascii'))
+                if not manifest.is_current(page_name, digest, siblings):
+                    yield week
+        
+        if self.layout == self.APP:
+            with stage("app"):
+                self.write_app(manifest, siblings, search_index)
+        else:
+            with stage("program pages"):
+                for week in self.write_program_pages(changed_weeks(), renderer):
+                    print(f"Generated program for Week {week.number}: {week.date}")
+        
+        # The search index covers every week, so it is only complete once all pages were visited
+        if self.search:
+            with stage("search index"):
+                self.write_search_index(manifest, siblings, search_index,
+                                        BuildManifest.hash_inputs(template_version, nav_digest,
+                                                                  week_digests.hexdigest()))
         
         # Generate index page
-        index_html = self.generate_index_page(all_programs)
-        with open(f"{self.output_dir}/index.html", 'w', encoding='utf-8') as f:
-            f.write(index_html)
+        readme_content = self.read_readme()
+        digest = BuildManifest.hash_inputs(template_version, nav_digest, readme_content, self.search)
+        if not manifest.is_current("index.html", digest, siblings):
+            readme_html = self.render_readme(readme_content)
+            with stage("write index"):
+                path = f"{self.output_dir}/index.html"
+                search_html = SearchIndex.search_html() if self.search else ''
+                self.write_output(path, HTMLTemplates.iter_index_page(week_dates, readme_html, self.stylesheet_name(),
+                                                                      search_html))
+                self.instrumentation.count_file("bytes written", path)
+        
+        if self.precompressor is not None:
+            with stage("precompress"):
+                self.precompressor.close()
+        
+        # Drop stylesheets left behind by earlier builds with different CSS, files
+        # of other layouts and options, and precompressed copies that would now be
+        # served in place of newer files
+        for filename in manifest.stale_files():
+            stylesheet = filename.startswith("styles.") and filename.endswith(".css")
+            if stylesheet or filename in OPTIONAL_FILES or filename.endswith(PRECOMPRESSED_SUFFIXES):
+                path = os.path.join(self.output_dir, filename)
+                if os.path.exists(path):
+                    os.remove(path)
         
-        print(f"\nGenerated {len(all_programs)} weeks of programming")
+        with stage("save manifest"):
+            manifest.save()
+        self.record_cache_stats(renderer)
+        
+        print(f"\nGenerated {self.total_weeks} weeks of programming")
+        print(f"Files rebuilt: {manifest.rebuilt}, skipped (unchanged): {manifest.skipped}")
+        if self.minifier is not None and self.minifier.bytes_in:
+            minifier = self.minifier
+            print(f"Minified {minifier.documents} HTML files: {minifier.bytes_saved:,} of {minifier.bytes_in:,} bytes "
+                  f"saved ({minifier.bytes_saved / minifier.bytes_in:.1%})")
         print(f"Files saved to: {os.path.abspath(self.output_dir)}")
 
 def main():
-    generator = ProgramGenerator()
-    generator.generate_program()
+    # The CLI lives in cli.py so quick subcommands start without importing this module
+    from cli import main as cli_main
+    
+    sys.exit(cli_main())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,11 +1,49 @@
-from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
-import calendar
+from dataclasses import dataclass
+from typing import Dict, Tuple, Union
 
+@dataclass(frozen=True, slots=True)
 class Exercise:
-    def __init__(self, name: str, sets: int, reps: int, intensity: float, is_amrap: bool = False):
-        self.name = name
-        self.sets = sets
-        self.reps = reps
-        self.intensity = intensity
-        self.is_amrap = is_amrap
\ No newline at end of file
+    name: str
+    sets: int
+    reps: int
+    intensity: Union[float, str]
+    is_amrap: bool = False
+
+# A day's sections in display order: (heading, line) or (heading, lines)
+Section = Tuple[str, Union[str, Tuple[str, ...]]]
+
+@dataclass(frozen=True, slots=True)
+class Day:
+    name: str
+    sections: Tuple[Section, ...]
+
+    def to_dict(self) -> Dict:
+        """Returns the day in the dict shape used by HTMLTemplates"""
+        return {
+            heading: list(value) if isinstance(value, tuple) else value
+            for heading, value in self.sections
+        }
+
+# What a week's days depend on besides its number and date; see ProgramBuilder.week_signature
+WeekSignature = Tuple[int, ...]
+
+@dataclass(frozen=True, slots=True)
+class Week:
+    number: int
+    date: str
+    bar_type: str
+    gear: str
+    days: Tuple[Day, ...]
+    signature: WeekSignature = ()
+
+    def to_dict(self) -> Dict:
+        """Returns the week in the dict shape used by HTMLTemplates"""
+        week = {
+            "Date": self.date,
+            "Week": self.number,
+            "Bar Type": self.bar_type,
+            "Gear": self.gear,
+        }
+        for day in self.days:
+            week[day.name] = day.to_dict()
+        return week
@@ -0,0 +1,105 @@
+import gzip
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+GZIP = "gz"
+ZSTD = "zst"
+FORMATS = (GZIP, ZSTD)
+
+def available_formats() -> List[str]:
+    """Returns the precompression formats this interpreter can produce"""
+    return [GZIP, ZSTD] if zstandard is not None else [GZIP]
+
+def gzip_bytes(data: bytes) -> bytes:
+    # mtime=0 and no file name keep the output identical for identical input
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def zstd_bytes(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=19).compress(data)
+
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {GZIP: gzip_bytes, ZSTD: zstd_bytes}
+
+class Precompressor:
+    """Writes .gz/.zst siblings of generated files from their in-memory bytes.
+
+    Compression runs on a thread pool; zlib and zstandard release the GIL
+    while compressing, so siblings of different files compress in parallel
+    with rendering. Call drain() before relying on the files being there.
+    """
+
+    def __init__(self, formats: Sequence[str], workers: int = 0):
+        unknown = [fmt for fmt in formats if fmt not in FORMATS]
+        if unknown:
+            raise ValueError(f"Unknown compression format: {', '.join(unknown)}")
+        if ZSTD in formats and zstandard is None:
+            raise ValueError("zstd precompression needs the zstandard package")
+        self.formats = tuple(formats)
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.files_compressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_pid = 0
+        self._pending: List[Future] = []
+
+    def __getstate__(self):
+        # Process-pool workers get their own thread pool
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        state["_pending"] = []
+        return state
+
+    def extensions(self) -> List[str]:
+        return [f".{fmt}" for fmt in self.formats]
+
+    def compress_file(self, path: str, data: bytes) -> int:
+        """Writes every sibling of path and returns their total size"""
+        written = 0
+        for fmt in self.formats:
+            compressed = COMPRESSORS[fmt](data)
+            temp_path = f"{path}.{fmt}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(compressed)
+            os.replace(temp_path, f"{path}.{fmt}")
+            written += len(compressed)
+        return written
+
+    def submit(self, path: str, data: bytes):
+        """Queues the siblings of path for compression"""
+        executor = self._pool()
+        self.files_compressed += 1
+        self.bytes_in += len(data)
+        self._pending.append(executor.submit(self.compress_file, path, data))
+        if len(self._pending) > self.workers * 4:
+            self._collect(self._pending.pop(0))
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None or self._executor_pid != os.getpid():
+            # A forked worker inherits the parent's pool but none of its threads
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="precompress")
+            self._executor_pid = os.getpid()
+            self._pending = []
+        return self._executor
+
+    def _collect(self, future: Future):
+        self.bytes_out += future.result()
+
+    def drain(self):
+        """Waits for every queued file, re-raising the first compression error"""
+        if self._executor_pid != os.getpid():
+            self._pending = []
+        pending, self._pending = self._pending, []
+        for future in pending:
+            self._collect(future)
+
+    def close(self):
+        self.drain()
+        if self._executor is not None and self._executor_pid == os.getpid():
+            self._executor.shutdown()
+        self._executor = None
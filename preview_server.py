@@ -0,0 +1,337 @@
+import asyncio
+import gzip
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from fragment_cache import LRUCache
+from html_templates import HTMLTemplates, Navigation, ProgramPageRenderer
+from program_builder import ProgramBuilder, WeekDates
+from program_definition import DEFAULT_DEFINITION, CompiledProgram, load_program
+from readme_cache import ReadmeCache
+
+class Page(NamedTuple):
+    content_type: str
+    body: bytes
+    gzip_body: Optional[bytes]
+    etag: str
+
+class PreviewSite:
+    """Renders the pages of one program on demand, without touching docs/"""
+
+    def __init__(self, start_date: Optional[datetime], total_weeks: int, nav_mode: str, css_mode: str,
+                 program: Optional[CompiledProgram] = None):
+        self.builder = ProgramBuilder(start_date, program)
+        self.total_weeks = total_weeks
+        self.week_dates = WeekDates(self.builder, total_weeks)
+        self.navigation = Navigation(self.week_dates, nav_mode)
+        self.stylesheet = None
+        if css_mode == HTMLTemplates.CSS_SHARED:
+            self.stylesheet = HTMLTemplates.generate_shared_stylesheet()[0]
+        self.renderer = ProgramPageRenderer(self.navigation, self.stylesheet)
+
+    def week_for_page(self, name: str) -> Optional[int]:
+        """Returns the week number of a <mm-dd-YYYY>-program.html page name, or None"""
+        if not name.endswith("-program.html"):
+            return None
+        try:
+            week_date = datetime.strptime(name[:-len("-program.html")], '%m-%d-%Y')
+        except ValueError:
+            return None
+        days = (week_date - self.builder.start_date).days
+        week_number = days // 7 + 1
+        if days % 7 or not 1 <= week_number <= self.total_weeks:
+            return None
+        return week_number
+
+    def render(self, name: str, readme_html: str) -> Optional[Tuple[str, str]]:
+        """Returns (content type, text) of a page of the site, or None if there is no such page"""
+        if name in ("", "index.html"):
+            return "text/html; charset=utf-8", ''.join(
+                HTMLTemplates.iter_index_page(self.week_dates, readme_html, self.stylesheet)
+            )
+        if name == Navigation.DATA_FILENAME and self.navigation.mode == Navigation.SHARED:
+            return "application/javascript; charset=utf-8", self.navigation.generate_data_file()
+        if self.stylesheet is not None and name == self.stylesheet:
+            return "text/css; charset=utf-8", HTMLTemplates.generate_shared_stylesheet()[1]
+        week_number = self.week_for_page(name)
+        if week_number is None:
+            return None
+        week = self.builder.build_week_model(week_number)
+        return "text/html; charset=utf-8", self.renderer.render_week(week)
+
+
+class PreviewServer:
+    """Local asyncio HTTP server that renders program pages straight from memory.
+
+    The default program is served at the root. Other athletes' programs live
+    under /program/<YYYY-MM-DD>/<weeks>/ so the relative week links keep
+    working; ?start=YYYY-MM-DD&weeks=N redirects there. Rendered pages are
+    kept gzipped and ETagged in an LRU cache, rendering runs off the event
+    loop, and concurrent requests for the same page share one render. Sites
+    and pages are keyed on the program definition file's modification time
+    and size, so editing the definition recompiles it on the next request.
+    The file is statted at most once per VERSION_TTL seconds rather than on
+    every request, which would block the event loop on the filesystem.
+    """
+
+    PAGE_CACHE_SIZE = 512
+    SITE_CACHE_SIZE = 32
+    MAX_WEEKS = 520
+    MIN_GZIP_SIZE = 256
+    VERSION_TTL = 0.5
+    PROGRAM_PREFIX = "/program/"
+    STATUS_TEXT = {
+        200: "OK", 302: "Found", 304: "Not Modified", 400: "Bad Request",
+        404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"
+    }
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8000, total_weeks: int = 24,
+                 start_date: Optional[datetime] = None, nav_mode: str = Navigation.INLINE,
+                 css_mode: str = HTMLTemplates.CSS_INLINE, readme_path: str = "README.md",
+                 program_path: Optional[str] = None):
+        if nav_mode not in Navigation.MODES:
+            raise ValueError(f"Unknown navigation mode: {nav_mode}")
+        if css_mode not in HTMLTemplates.CSS_MODES:
+            raise ValueError(f"Unknown CSS mode: {css_mode}")
+        self.host = host
+        self.port = port
+        self.program_path = program_path or DEFAULT_DEFINITION
+        # Compiled up front so a broken definition fails at start-up rather than on the first request
+        self.default_site = (ProgramBuilder(start_date, load_program(self.program_path)).start_date, total_weeks)
+        self.nav_mode = nav_mode
+        self.css_mode = css_mode
+        self.readme_path = readme_path
+        self.readme_cache = ReadmeCache()
+        self.sites = LRUCache(self.SITE_CACHE_SIZE)
+        self.pages = LRUCache(self.PAGE_CACHE_SIZE)
+        self._pending: Dict[Tuple, "asyncio.Future[Optional[Page]]"] = {}
+        self._program_version: Optional[Tuple[int, int]] = None
+        self._program_checked = 0.0
+        # Rendering is pure Python and holds the GIL, so one thread keeps the
+        # event loop responsive without contending on the builder caches
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preview-render")
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> asyncio.AbstractServer:
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        print(f"Previewing on http://{self.host}:{self.port}/ (Ctrl+C to stop)")
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            self.executor.shutdown(wait=False)
+
+    def readme_version(self) -> int:
+        try:
+            return os.stat(self.readme_path).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def program_version(self) -> Tuple[int, int]:
+        now = time.monotonic()
+        if self._program_version is None or now - self._program_checked >= self.VERSION_TTL:
+            stat = os.stat(self.program_path)
+            self._program_version = (stat.st_mtime_ns, stat.st_size)
+            self._program_checked = now
+        return self._program_version
+
+    def readme_html(self) -> str:
+        try:
+            with open(self.readme_path, 'r', encoding='utf-8') as f:
+                return self.readme_cache.render(f.read())
+        except FileNotFoundError:
+            return "<p>Program documentation not found.</p>"
+
+    def site(self, start_date: datetime, total_weeks: int, program_version: Tuple[int, int]) -> PreviewSite:
+        key = (start_date, total_weeks, program_version)
+        site = self.sites.get(key)
+        if site is None:
+            program = load_program(self.program_path)
+            site = PreviewSite(start_date, total_weeks, self.nav_mode, self.css_mode, program)
+            self.sites.put(key, site)
+        return site
+
+    def render_page(self, key: Tuple) -> Optional[Page]:
+        """Renders, gzips and fingerprints a page; runs on the render thread"""
+        start_date, total_weeks, name, _, program_version = key
+        readme_html = self.readme_html() if name in ("", "index.html") else ""
+        rendered = self.site(start_date, total_weeks, program_version).render(name, readme_html)
+        if rendered is None:
+            return None
+        content_type, text = rendered
+        body = text.encode('utf-8')
+        gzip_body = gzip.compress(body, mtime=0) if len(body) >= self.MIN_GZIP_SIZE else None
+        return Page(content_type, body, gzip_body, hashlib.sha256(body).hexdigest()[:20])
+
+    async def get_page(self, start_date: datetime, total_weeks: int, name: str) -> Optional[Page]:
+        """Returns a cached page, rendering it once however many requests want it at the same time"""
+        # The index also depends on the README, so its key changes when the file does
+        readme_version = self.readme_version() if name in ("", "index.html") else 0
+        key = (start_date, total_weeks, name, readme_version, self.program_version())
+        page = self.pages.get(key)
+        if page is not None:
+            return page
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await pending
+
+        future = asyncio.get_running_loop().run_in_executor(self.executor, self.render_page, key)
+        self._pending[key] = future
+        try:
+            page = await future
+        finally:
+            del self._pending[key]
+        if page is not None:
+            self.pages.put(key, page)
+        return page
+
+    def resolve(self, target: str) -> Tuple[Optional[Tuple[datetime, int, str]], Optional[str]]:
+        """Maps a request target to (start date, weeks, page name), or to a redirect location"""
+        url = urlsplit(target)
+        path = url.path
+        query = parse_qs(url.query)
+        start_date, total_weeks = self.default_site
+
+        if "start" in query or "weeks" in query:
+            try:
+                start = query["start"][0] if "start" in query else start_date.strftime('%Y-%m-%d')
+                datetime.strptime(start, '%Y-%m-%d')
+                weeks = int(query["weeks"][0]) if "weeks" in query else total_weeks
+            except ValueError:
+                return None, None
+            return None, f"{self.PROGRAM_PREFIX}{start}/{weeks}/{path.rsplit('/', 1)[-1]}"
+
+        if path.startswith(self.PROGRAM_PREFIX):
+            parts = path[len(self.PROGRAM_PREFIX):].split('/')
+            if len(parts) != 3:
+                return None, None
+            try:
+                start_date = datetime.strptime(parts[0], '%Y-%m-%d')
+                total_weeks = int(parts[1])
+            except ValueError:
+                return None, None
+            path = '/' + parts[2]
+        if not 1 <= total_weeks <= self.MAX_WEEKS or start_date.weekday() != 0:
+            return None, None
+        if path.count('/') != 1:
+            return None, None
+        return (start_date, total_weeks, path[1:]), None
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serves HTTP/1.1 requests on one connection until the client closes it"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                parts = request_line.decode('latin-1').split()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                if len(parts) != 3:
+                    await self.respond(writer, 400, keep_alive=False)
+                    break
+                method, target, version = parts
+                keep_alive = keep_alive and version == "HTTP/1.1"
+                await self.handle_request(writer, method, target, headers, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, writer: asyncio.StreamWriter, method: str, target: str,
+                             headers: Dict[str, str], keep_alive: bool):
+        if method not in ("GET", "HEAD"):
+            await self.respond(writer, 405, keep_alive=keep_alive, extra={"Allow": "GET, HEAD"})
+            return
+        resolved, location = self.resolve(target)
+        if location is not None:
+            await self.respond(writer, 302, keep_alive=keep_alive, extra={"Location": location})
+            return
+        if resolved is None:
+            await self.respond(writer, 400, keep_alive=keep_alive)
+            return
+        try:
+            page = await self.get_page(*resolved)
+        except Exception as exc:
+            print(f"Error rendering {target}: {exc}")
+            await self.respond(writer, 500, keep_alive=keep_alive)
+            return
+        if page is None:
+            await self.respond(writer, 404, keep_alive=keep_alive)
+            return
+
+        use_gzip = page.gzip_body is not None and accepts_gzip(headers.get("accept-encoding", ""))
+        etag = f'"{page.etag}-gz"' if use_gzip else f'"{page.etag}"'
+        extra = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if etag_matches(headers.get("if-none-match"), etag):
+            await self.respond(writer, 304, keep_alive=keep_alive, extra=extra)
+            return
+        if use_gzip:
+            extra["Content-Encoding"] = "gzip"
+        body = page.gzip_body if use_gzip else page.body
+        await self.respond(writer, 200, body, page.content_type, keep_alive, extra, send_body=method == "GET")
+
+    async def respond(self, writer: asyncio.StreamWriter, status: int, body: bytes = b"",
+                      content_type: str = "text/plain; charset=utf-8", keep_alive: bool = True,
+                      extra: Optional[Dict[str, str]] = None, send_body: bool = True):
+        if status >= 400 and not body:
+            body = f"{status} {self.STATUS_TEXT[status]}\n".encode('utf-8')
+        lines = [f"HTTP/1.1 {status} {self.STATUS_TEXT[status]}"]
+        if status != 304:
+            lines.append(f"Content-Type: {content_type}")
+            lines.append(f"Content-Length: {len(body)}")
+        for name, value in (extra or {}).items():
+            lines.append(f"{name}: {value}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if send_body and status != 304:
+            writer.write(body)
+        await writer.drain()
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Returns whether an Accept-Encoding header allows a gzip response"""
+    for coding in accept_encoding.split(','):
+        name, _, params = coding.strip().partition(';')
+        if name.strip().lower() in ("gzip", "*"):
+            quality = params.strip()
+            if not quality.startswith("q="):
+                return True
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Returns whether an If-None-Match header matches etag"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def serve(host: str = "127.0.0.1", port: int = 8000, **options):
+    """Runs the preview server until interrupted"""
+    server = PreviewServer(host, port, **options)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\nPreview server stopped")
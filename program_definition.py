@@ -0,0 +1,379 @@
+import hashlib
+import json
+import math
+import os
+import string
+from typing import Dict, List, Optional, Tuple
+from models import Day, Exercise
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11 reads JSON definitions only
+    tomllib = None
+
+DEFAULT_DEFINITION = os.path.join(os.path.dirname(os.path.abspath(__file__)), "programs", "default.toml")
+DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+# Rotations every definition needs, since they make the week header
+HEADER_ROTATIONS = ("bar", "gear")
+# Template fields lift lines get on top of the rotations
+LIFT_FIELDS = ("name", "sets", "reps", "intensity")
+
+ROTATION_KEYS = {"values", "every", "offset", "wave_weeks", "default", "bad_weather"}
+LIFT_KEYS = {"name", "line", "wave"}
+STEP_KEYS = {"name", "sets", "reps", "percent", "rpe", "amrap"}
+SECTION_KEYS = {"heading", "line", "lift", "lines"}
+
+def parse_definition(data: bytes, source: str) -> Dict:
+    """Parses the bytes of a TOML or JSON program definition, by the extension of source"""
+    if source.endswith(".json"):
+        definition = json.loads(data)
+    elif source.endswith(".toml"):
+        if tomllib is None:
+            raise ValueError(f"{source}: TOML definitions need Python 3.11 or later; use JSON instead")
+        definition = tomllib.loads(data.decode("utf-8"))
+    else:
+        raise ValueError(f"{source}: expected a .toml or .json program definition")
+    if not isinstance(definition, dict):
+        raise ValueError(f"{source}: expected a table at the top level")
+    return definition
+
+def _check(condition: bool, where: str, message: str):
+    if not condition:
+        raise ValueError(f"{where}: {message}")
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _check_keys(table, allowed: set, where: str):
+    _check(isinstance(table, dict), where, "expected a table")
+    for key in table:
+        _check(key in allowed, where, f"unknown key {key!r}")
+
+def _check_string_list(value, where: str):
+    _check(isinstance(value, list) and value and all(isinstance(item, str) for item in value),
+           where, "expected a non-empty list of strings")
+
+def _check_template(template, fields: Tuple[str, ...], where: str):
+    _check(isinstance(template, str), where, "expected a string")
+    try:
+        names = [name for _, name, _, _ in string.Formatter().parse(template) if name is not None]
+    except ValueError as exc:
+        raise ValueError(f"{where}: {exc}") from None
+    for name in names:
+        _check(name in fields, where, f"unknown field {{{name}}}; expected one of {', '.join(fields)}")
+
+def validate(definition: Dict, source: str):
+    """Raises ValueError naming the first problem in a parsed program definition"""
+    _check_keys(definition, {"name", "wave_length", "rotations", "lifts", "days"}, source)
+    _check(isinstance(definition.get("name"), str), f"{source}: name", "expected a string")
+    wave_length = definition.get("wave_length")
+    _check(_is_int(wave_length) and wave_length > 0, f"{source}: wave_length", "expected a positive integer")
+
+    rotations = definition.get("rotations")
+    _check(isinstance(rotations, dict), f"{source}: rotations", "expected a table")
+    for name in HEADER_ROTATIONS:
+        _check(name in rotations, f"{source}: rotations", f"missing the {name} rotation")
+    for name, rotation in rotations.items():
+        where = f"{source}: rotations.{name}"
+        _check(name not in LIFT_FIELDS and name.isidentifier(), where, "not a usable field name")
+        _check_keys(rotation, ROTATION_KEYS, where)
+        _check_string_list(rotation.get("values"), f"{where}.values")
+        every = rotation.get("every", 1)
+        _check(_is_int(every) and every > 0, f"{where}.every", "expected a positive integer")
+        offset = rotation.get("offset", 0)
+        _check(_is_int(offset) and offset >= 0, f"{where}.offset", "expected a non-negative integer")
+        wave_weeks = rotation.get("wave_weeks", [])
+        _check(isinstance(wave_weeks, list) and all(_is_int(week) and 1 <= week <= wave_length for week in wave_weeks),
+               f"{where}.wave_weeks", f"expected weeks of the wave, from 1 to {wave_length}")
+        for key in ("default", "bad_weather"):
+            _check(isinstance(rotation.get(key, ""), str), f"{where}.{key}", "expected a string")
+    line_fields = tuple(rotations)
+    lift_fields = LIFT_FIELDS + line_fields
+
+    lifts = definition.get("lifts")
+    _check(isinstance(lifts, dict), f"{source}: lifts", "expected a table")
+    for name, lift in lifts.items():
+        where = f"{source}: lifts.{name}"
+        _check_keys(lift, LIFT_KEYS, where)
+        _check(isinstance(lift.get("name"), str), f"{where}.name", "expected a string")
+        _check_template(lift.get("line"), lift_fields, f"{where}.line")
+        wave = lift.get("wave")
+        _check(isinstance(wave, list) and len(wave) == wave_length, f"{where}.wave",
+               f"expected one step per week of the {wave_length}-week wave")
+        for index, step in enumerate(wave, 1):
+            step_where = f"{where}.wave[{index}]"
+            _check_keys(step, STEP_KEYS, step_where)
+            for key in ("sets", "reps"):
+                _check(_is_int(step.get(key)) and step[key] > 0, f"{step_where}.{key}", "expected a positive integer")
+            _check(("percent" in step) != ("rpe" in step), step_where, "expected exactly one of percent and rpe")
+            percent = step.get("percent", 1)
+            _check(isinstance(percent, (int, float)) and not isinstance(percent, bool) and percent > 0,
+                   f"{step_where}.percent", "expected a positive number")
+            _check(isinstance(step.get("rpe", ""), str), f"{step_where}.rpe", "expected a string")
+            _check(isinstance(step.get("amrap", False), bool), f"{step_where}.amrap", "expected true or false")
+            _check(isinstance(step.get("name", ""), str), f"{step_where}.name", "expected a string")
+
+    days = definition.get("days")
+    _check(isinstance(days, list) and days, f"{source}: days", "expected a non-empty list of days")
+    seen = set()
+    for index, day in enumerate(days, 1):
+        where = f"{source}: days[{index}]"
+        _check_keys(day, {"name", "sections"}, where)
+        _check(day.get("name") in DAY_NAMES, f"{where}.name", f"expected one of {', '.join(DAY_NAMES)}")
+        _check(day["name"] not in seen, f"{where}.name", f"{day['name']} is listed twice")
+        seen.add(day["name"])
+        sections = day.get("sections")
+        _check(isinstance(sections, list) and sections, f"{where}.sections", "expected a non-empty list")
+        for section_index, section in enumerate(sections, 1):
+            section_where = f"{where}.sections[{section_index}]"
+            _check_keys(section, SECTION_KEYS, section_where)
+            _check(isinstance(section.get("heading"), str), f"{section_where}.heading", "expected a string")
+            kinds = [key for key in ("line", "lift", "lines") if key in section]
+            _check(len(kinds) == 1, section_where, "expected exactly one of line, lift and lines")
+            if "line" in section:
+                _check_template(section["line"], line_fields, f"{section_where}.line")
+            elif "lift" in section:
+                _check(section["lift"] in lifts, f"{section_where}.lift", f"no lift named {section['lift']!r}")
+            else:
+                _check_string_list(section["lines"], f"{section_where}.lines")
+
+def render_lift_line(template: str, exercise: Exercise, label: str, fields: Dict[str, str]) -> str:
+    """Renders a lift's line for one step of its wave"""
+    reps = f"{exercise.reps}+" if exercise.is_amrap else str(exercise.reps)
+    return template.format(name=exercise.name, sets=exercise.sets, reps=reps, intensity=label, **fields)
+
+def _wave_step(lift: Dict, step: Dict) -> List:
+    """Returns a wave step as [name, sets, reps, intensity, amrap, intensity label]"""
+    if "percent" in step:
+        # The label keeps the number as written; the intensity is the fraction loads work from
+        intensity, label = step["percent"] / 100, f"{step['percent']}%"
+    else:
+        intensity = label = f"RPE {step['rpe']}"
+    return [step.get("name", lift["name"]), step["sets"], step["reps"], intensity, step.get("amrap", False), label]
+
+def compile_definition(definition: Dict) -> Dict:
+    """Compiles a validated definition into flat per-week tables, as plain data.
+
+    Every rotation and the wave repeat, so the program as a whole repeats
+    with the least common multiple of their lengths. The tables hold one row
+    per week of that period: each rotation's value and an index into the
+    distinct sets of days, which index into the distinct days. Each distinct
+    day also keeps the lift key of every section, None for other sections.
+    """
+    wave_length = definition["wave_length"]
+    rotations = definition["rotations"]
+    lifts = definition["lifts"]
+    period = wave_length
+    for rotation in rotations.values():
+        period = math.lcm(period, rotation.get("every", 1) * len(rotation["values"]))
+
+    waves = {name: [_wave_step(lift, step) for step in lift["wave"]] for name, lift in lifts.items()}
+    columns: Dict[str, List[str]] = {name: [] for name in rotations}
+    days: List[List] = []
+    day_lifts: List[List[Optional[str]]] = []
+    day_index: Dict[str, int] = {}
+    day_sets: List[List[int]] = []
+    day_set_index: Dict[Tuple[int, ...], int] = {}
+    week_days: List[int] = []
+    for row in range(period):
+        wave_week = row % wave_length + 1
+        fields = {}
+        for name, rotation in rotations.items():
+            wave_weeks = rotation.get("wave_weeks")
+            if wave_weeks and wave_week not in wave_weeks:
+                fields[name] = ""
+            else:
+                values = rotation["values"]
+                fields[name] = values[(row + rotation.get("offset", 0)) // rotation.get("every", 1) % len(values)]
+            columns[name].append(fields[name])
+
+        indexes = []
+        for day in definition["days"]:
+            sections = []
+            for section in day["sections"]:
+                if "line" in section:
+                    value = section["line"].format(**fields)
+                elif "lift" in section:
+                    step = waves[section["lift"]][wave_week - 1]
+                    value = render_lift_line(lifts[section["lift"]]["line"], Exercise(*step[:5]), step[5], fields)
+                else:
+                    value = section["lines"]
+                sections.append([section["heading"], value])
+            compiled = [day["name"], sections]
+            lifts_of_sections = [section.get("lift") for section in day["sections"]]
+            key = json.dumps([compiled, lifts_of_sections])
+            index = day_index.get(key)
+            if index is None:
+                index = day_index[key] = len(days)
+                days.append(compiled)
+                day_lifts.append(lifts_of_sections)
+            indexes.append(index)
+        key = tuple(indexes)
+        index = day_set_index.get(key)
+        if index is None:
+            index = day_set_index[key] = len(day_sets)
+            day_sets.append(indexes)
+        week_days.append(index)
+
+    return {
+        "format": CompiledProgram.FORMAT,
+        "name": definition["name"],
+        "wave_length": wave_length,
+        "period": period,
+        "rotations": {
+            name: {key: rotation[key] for key in ("values", "default", "bad_weather") if key in rotation}
+            for name, rotation in rotations.items()
+        },
+        "columns": columns,
+        "lifts": {name: {"line": lift["line"], "wave": waves[name]} for name, lift in lifts.items()},
+        "days": days,
+        "day_lifts": day_lifts,
+        "day_sets": day_sets,
+        "week_days": week_days,
+    }
+
+class CompiledProgram:
+    """A program definition compiled to flat per-week lookup tables.
+
+    Week n reads row (n - 1) % period of every table. Days are built once
+    and each distinct set of days is one tuple shared by all its weeks.
+    """
+
+    # Bump when the compiled tables change shape, to invalidate cached compilations
+    FORMAT = 2
+
+    def __init__(self, tables: Dict):
+        self.name: str = tables["name"]
+        self.wave_length: int = tables["wave_length"]
+        self.period: int = tables["period"]
+        rotations = tables["rotations"]
+        self.rotations: Dict[str, Tuple[str, ...]] = {name: tuple(r["values"]) for name, r in rotations.items()}
+        self.defaults: Dict[str, str] = {name: r.get("default", "") for name, r in rotations.items()}
+        self.bad_weather: Dict[str, str] = {name: r["bad_weather"] for name, r in rotations.items()
+                                            if "bad_weather" in r}
+        self.columns: Dict[str, Tuple[str, ...]] = {name: tuple(values) for name, values in tables["columns"].items()}
+        # The week header shows a rotation's default on the weeks it is off
+        self.bars = tuple(value or self.defaults["bar"] for value in self.columns["bar"])
+        self.gears = tuple(value or self.defaults["gear"] for value in self.columns["gear"])
+        self.lift_templates: Dict[str, str] = {name: lift["line"] for name, lift in tables["lifts"].items()}
+        self.waves: Dict[str, Tuple[Exercise, ...]] = {
+            name: tuple(Exercise(*step[:5]) for step in lift["wave"]) for name, lift in tables["lifts"].items()
+        }
+        self.intensity_labels: Dict[str, Tuple[str, ...]] = {
+            name: tuple(step[5] for step in lift["wave"]) for name, lift in tables["lifts"].items()
+        }
+        # Equal line lists become one tuple shared by every day that lists them
+        blocks: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        days = [
+            Day(name, tuple((heading, blocks.setdefault(tuple(value), tuple(value)) if isinstance(value, list)
+                             else value)
+                            for heading, value in sections))
+            for name, sections in tables["days"]
+        ]
+        self.day_sets: Tuple[Tuple[Day, ...], ...] = tuple(tuple(days[i] for i in s) for s in tables["day_sets"])
+        # Per set of days, per day, the lift key of each section or None
+        self.day_set_lifts: Tuple[Tuple[Tuple[Optional[str], ...], ...], ...] = tuple(
+            tuple(tuple(tables["day_lifts"][i]) for i in s) for s in tables["day_sets"]
+        )
+        self.week_days: Tuple[int, ...] = tuple(tables["week_days"])
+        # One signature tuple per set of days, shared by every week with those days
+        self.signatures: Tuple[Tuple[int], ...] = tuple((index,) for index in range(len(self.day_sets)))
+
+    def row(self, week_number: int) -> int:
+        """Returns the table row of a 1-based week number"""
+        return (week_number - 1) % self.period
+
+    def coded_column(self, name: str) -> Tuple[Tuple[str, ...], Tuple[int, ...]]:
+        """Returns a column's distinct values, in the order weeks first use them, and each row's index among them.
+
+        The bar and gear columns are the week header's, with defaults filled in.
+        """
+        column = {"bar": self.bars, "gear": self.gears}.get(name) or self.columns[name]
+        values = tuple(dict.fromkeys(column))
+        codes = {value: code for code, value in enumerate(values)}
+        return values, tuple(codes[value] for value in column)
+
+    def lift_line(self, lift: str, wave_week: int, **fields: str) -> str:
+        """Renders a lift's line for a week of the wave; rotations not given read as empty"""
+        values = dict.fromkeys(self.rotations, "")
+        values.update(fields)
+        return render_lift_line(self.lift_templates[lift], self.waves[lift][wave_week - 1],
+                                self.intensity_labels[lift][wave_week - 1], values)
+
+class ProgramCache:
+    """On-disk cache of compiled program definitions.
+
+    Entries are keyed by the definition file's bytes and the compiled
+    format, so repeated runs read the flat tables back as JSON instead of
+    parsing, validating and compiling the definition. Within a process a
+    compiled program is kept per path until the file changes.
+    """
+
+    MAX_ENTRIES = 16
+
+    def __init__(self, cache_dir: str = os.path.join(".cache", "programs")):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._loaded: Dict[str, Tuple[Tuple[int, int], CompiledProgram]] = {}
+
+    @staticmethod
+    def cache_key(data: bytes) -> str:
+        """Returns the digest identifying the compilation of a definition file's bytes"""
+        return hashlib.sha256(f"{CompiledProgram.FORMAT}\0".encode() + data).hexdigest()
+
+    def load(self, path: str) -> CompiledProgram:
+        """Returns the compiled program of a definition file, compiling it only on a cache miss"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        state = (stat.st_mtime_ns, stat.st_size)
+        loaded = self._loaded.get(path)
+        if loaded is not None and loaded[0] == state:
+            return loaded[1]
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        entry = os.path.join(self.cache_dir, f"{self.cache_key(data)}.json")
+        try:
+            with open(entry, 'r', encoding='utf-8') as f:
+                tables = json.load(f)
+            self.hits += 1
+        except (FileNotFoundError, ValueError):
+            self.misses += 1
+            definition = parse_definition(data, path)
+            validate(definition, path)
+            tables = compile_definition(definition)
+            self._store(entry, tables)
+        program = CompiledProgram(tables)
+        self._loaded[path] = (state, program)
+        return program
+
+    def _store(self, path: str, tables: Dict):
+        """Writes an entry atomically and drops the oldest entries beyond MAX_ENTRIES"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(tables, f, separators=(',', ':'))
+        os.replace(temp_path, path)
+
+        # Builds sharing the cache directory may prune the same entries at once
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.json'):
+                entry = os.path.join(self.cache_dir, name)
+                try:
+                    entries.append((os.path.getmtime(entry), entry))
+                except FileNotFoundError:
+                    continue
+        entries.sort(reverse=True)
+        for _, stale in entries[self.MAX_ENTRIES:]:
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+
+PROGRAM_CACHE = ProgramCache()
+
+def load_program(path: Optional[str] = None) -> CompiledProgram:
+    """Returns the compiled program of a definition file, the bundled default when path is None"""
+    return PROGRAM_CACHE.load(path or DEFAULT_DEFINITION)
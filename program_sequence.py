@@ -0,0 +1,82 @@
+import sys
+from collections.abc import Sequence
+from datetime import date, datetime
+from typing import Dict, Optional, Union
+from program_builder import ProgramBuilder
+from models import Week
+
+DateLike = Union[date, datetime]
+
+class ProgramSequence(Sequence):
+    """Lazy, random-access view of a program's weeks.
+
+    Weeks are built on access from the ProgramBuilder, so indexing, slicing
+    and date lookups cost the same for a 24-week plan as for an open-ended
+    one. Items are week dicts in the shape returned by build_week; slices
+    are lazy ProgramSequence views of the same program.
+    """
+
+    DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+    def __init__(self, builder: ProgramBuilder, total_weeks: Optional[int] = None):
+        self.builder = builder
+        self.open_ended = total_weeks is None
+        stop = sys.maxsize if total_weeks is None else total_weeks + 1
+        self._weeks = range(1, stop)
+
+    @classmethod
+    def _view(cls, builder: ProgramBuilder, weeks: range, open_ended: bool) -> "ProgramSequence":
+        view = cls.__new__(cls)
+        view.builder = builder
+        view.open_ended = open_ended
+        view._weeks = weeks
+        return view
+
+    def __len__(self) -> int:
+        if self.open_ended:
+            raise TypeError("an open-ended program has no length")
+        return len(self._weeks)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if self.open_ended and ((index.step or 1) < 0 or any(
+                    bound is not None and bound < 0 for bound in (index.start, index.stop))):
+                raise IndexError("negative slices need a program with a fixed length")
+            open_ended = self.open_ended and index.stop is None
+            return self._view(self.builder, self._weeks[index], open_ended)
+        if index < 0 and self.open_ended:
+            raise IndexError("negative indexes need a program with a fixed length")
+        return self.builder.build_week(self._weeks[index])
+
+    def week(self, week_number: int) -> Dict:
+        """Returns the week dict for a 1-based week number of this program"""
+        if week_number not in self._weeks:
+            raise IndexError(f"week {week_number} is not part of this program")
+        return self.builder.build_week(week_number)
+
+    def week_model(self, week_number: int) -> Week:
+        """Returns the compact Week model for a 1-based week number of this program"""
+        if week_number not in self._weeks:
+            raise IndexError(f"week {week_number} is not part of this program")
+        return self.builder.build_week_model(week_number)
+
+    def week_for_date(self, when: DateLike) -> Optional[int]:
+        """Returns the week number containing a date, or None if the date is outside the program"""
+        if isinstance(when, datetime):
+            when = when.date()
+        days = (when - self.builder.start_date.date()).days
+        if days < 0:
+            return None
+        week_number = days // 7 + 1
+        return week_number if week_number in self._weeks else None
+
+    def workout_for_date(self, when: DateLike) -> Optional[Dict]:
+        """Returns the training day scheduled on a date, or None on rest days and outside the program"""
+        week_number = self.week_for_date(when)
+        if week_number is None:
+            return None
+        day_name = self.DAY_NAMES[when.weekday()]
+        for day in self.builder.build_week_model(week_number).days:
+            if day.name == day_name:
+                return day.to_dict()
+        return None
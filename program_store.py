@@ -0,0 +1,246 @@
+import sqlite3
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from program_builder import ProgramBuilder
+from program_definition import CompiledProgram, load_program
+
+DateLike = Union[date, datetime, str]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS athletes (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    start_date TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS weeks (
+    id INTEGER PRIMARY KEY,
+    athlete_id INTEGER NOT NULL REFERENCES athletes(id) ON DELETE CASCADE,
+    week INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    bar_type TEXT NOT NULL,
+    gear TEXT NOT NULL,
+    UNIQUE (athlete_id, week)
+);
+CREATE TABLE IF NOT EXISTS days (
+    id INTEGER PRIMARY KEY,
+    week_id INTEGER NOT NULL REFERENCES weeks(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    date TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS exercises (
+    id INTEGER PRIMARY KEY,
+    day_id INTEGER NOT NULL REFERENCES days(id) ON DELETE CASCADE,
+    section TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    lift TEXT,
+    name TEXT,
+    sets INTEGER,
+    reps INTEGER,
+    amrap INTEGER,
+    intensity TEXT,
+    percent REAL
+);
+CREATE INDEX IF NOT EXISTS weeks_athlete_date ON weeks (athlete_id, date);
+CREATE INDEX IF NOT EXISTS weeks_date ON weeks (date);
+CREATE INDEX IF NOT EXISTS weeks_gear ON weeks (gear);
+CREATE INDEX IF NOT EXISTS days_week ON days (week_id);
+CREATE INDEX IF NOT EXISTS days_date ON days (date);
+CREATE INDEX IF NOT EXISTS exercises_day ON exercises (day_id);
+CREATE INDEX IF NOT EXISTS exercises_lift ON exercises (lift, day_id) WHERE lift IS NOT NULL;
+"""
+
+# Offsets of training days from the Monday that starts their week
+DAY_OFFSETS = {name: offset for offset, name in enumerate(
+    ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+)}
+# Lift fields of the lines that are not a lift's
+NO_LIFT = (None, None, None, None, None, None, None)
+
+def iso_date(value: DateLike) -> str:
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+def lift_fields(program: CompiledProgram, lift: str, wave_week: int) -> Tuple:
+    """Returns (lift, name, sets, reps, amrap, intensity, percent) of a lift's step of the wave.
+
+    intensity is the label the line shows, such as "62.5%" or "RPE 9-10";
+    percent is only set for percentage steps.
+    """
+    step = program.waves[lift][wave_week - 1]
+    label = program.intensity_labels[lift][wave_week - 1]
+    percent = float(label[:-1]) if label.endswith("%") else None
+    return lift, step.name, step.sets, step.reps, int(step.is_amrap), label, percent
+
+
+class ProgramStore:
+    """Normalized SQLite store of athletes' programs: athletes, weeks, days and exercises.
+
+    load() bulk-inserts whole programs with batched executemany calls in one
+    transaction. Dates are stored as ISO strings so date ranges use the
+    indexes; main-lift lines carry their lift, sets, reps and intensity from
+    the compiled program's waves.
+    """
+
+    BATCH_SIZE = 5000
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self) -> "ProgramStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _next_id(self, table: str) -> int:
+        return self.connection.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}").fetchone()[0]
+
+    def load(self, athletes: Iterable[Tuple[str, Optional[datetime]]], total_weeks: int = 24,
+             program: Optional[CompiledProgram] = None) -> int:
+        """Loads the programs of (name, start date) pairs, replacing athletes already stored.
+
+        Every athlete follows program, the bundled one by default. A name
+        given more than once is loaded once, with its last start date.
+        Returns the number of exercise rows written.
+        """
+        # Rows are buffered across athletes, so a repeated name would be
+        # deleted and re-inserted while its first copy's rows are still pending
+        athletes = dict(athletes)
+        if program is None:
+            program = load_program()
+        connection = self.connection
+        with connection:
+            week_id = self._next_id("weeks")
+            day_id = self._next_id("days")
+            exercise_id = self._next_id("exercises")
+            week_rows: List[Tuple] = []
+            day_rows: List[Tuple] = []
+            exercise_rows: List[Tuple] = []
+            written = 0
+            # The lift fields of each lift and week of the wave, shared by every line of that step
+            steps: Dict[Tuple[str, int], Tuple] = {}
+
+            def flush():
+                connection.executemany("INSERT INTO weeks VALUES (?, ?, ?, ?, ?, ?)", week_rows)
+                connection.executemany("INSERT INTO days VALUES (?, ?, ?, ?)", day_rows)
+                connection.executemany(
+                    "INSERT INTO exercises VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", exercise_rows
+                )
+                week_rows.clear()
+                day_rows.clear()
+                exercise_rows.clear()
+
+            for name, start_date in athletes.items():
+                builder = ProgramBuilder(start_date, program)
+                connection.execute("DELETE FROM athletes WHERE name = ?", (name,))
+                athlete_id = connection.execute(
+                    "INSERT INTO athletes (name, start_date) VALUES (?, ?)",
+                    (name, iso_date(builder.start_date))
+                ).lastrowid
+                for number in range(1, total_weeks + 1):
+                    week = builder.build_week_model(number)
+                    monday = builder.get_week_date(number)
+                    wave_week = (number - 1) % program.wave_length + 1
+                    section_lifts = program.day_set_lifts[program.week_days[program.row(number)]]
+                    week_rows.append((week_id, athlete_id, number, iso_date(monday), week.bar_type, week.gear))
+                    for day, lifts in zip(week.days, section_lifts):
+                        day_date = iso_date(monday + timedelta(days=DAY_OFFSETS[day.name]))
+                        day_rows.append((day_id, week_id, day.name, day_date))
+                        position = 0
+                        for (heading, value), lift in zip(day.sections, lifts):
+                            fields = NO_LIFT
+                            if lift is not None:
+                                fields = steps.get((lift, wave_week))
+                                if fields is None:
+                                    fields = steps[lift, wave_week] = lift_fields(program, lift, wave_week)
+                            for text in ((value,) if isinstance(value, str) else value):
+                                exercise_rows.append((exercise_id, day_id, heading, position, text) + fields)
+                                exercise_id += 1
+                                position += 1
+                        day_id += 1
+                    week_id += 1
+                    if len(exercise_rows) >= self.BATCH_SIZE:
+                        written += len(exercise_rows)
+                        flush()
+            written += len(exercise_rows)
+            flush()
+        return written
+
+    def athletes(self) -> List[sqlite3.Row]:
+        return self.connection.execute("SELECT * FROM athletes ORDER BY name").fetchall()
+
+    def week(self, athlete: str, week_number: int) -> Optional[sqlite3.Row]:
+        """Returns one athlete's week row"""
+        return self.connection.execute(
+            "SELECT weeks.* FROM weeks JOIN athletes ON athletes.id = weeks.athlete_id "
+            "WHERE athletes.name = ? AND weeks.week = ?", (athlete, week_number)
+        ).fetchone()
+
+    def workout_on(self, athlete: str, when: DateLike) -> List[sqlite3.Row]:
+        """Returns the exercises an athlete has scheduled on a date, in order; empty on rest days"""
+        return self.connection.execute(
+            "SELECT days.name AS day, exercises.section, exercises.text, exercises.lift, "
+            "exercises.sets, exercises.reps, exercises.amrap, exercises.intensity, exercises.percent "
+            "FROM days JOIN weeks ON weeks.id = days.week_id "
+            "JOIN athletes ON athletes.id = weeks.athlete_id "
+            "JOIN exercises ON exercises.day_id = days.id "
+            "WHERE athletes.name = ? AND days.date = ? ORDER BY exercises.position",
+            (athlete, iso_date(when))
+        ).fetchall()
+
+    def main_lifts(self, lift: Optional[str] = None, athlete: Optional[str] = None,
+                   gear: Optional[Union[str, Sequence[str]]] = None, start: Optional[DateLike] = None,
+                   end: Optional[DateLike] = None) -> List[sqlite3.Row]:
+        """Returns main-lift sets filtered by lift, athlete, gear and an inclusive date range.
+
+        gear matches exactly; pass a sequence for several values, such as
+        ("Suit", "Briefs + Suit") for every week worn in a suit.
+        """
+        conditions = ["exercises.lift IS NOT NULL"]
+        params: List = []
+        if lift is not None:
+            conditions.append("exercises.lift = ?")
+            params.append(lift)
+        if athlete is not None:
+            conditions.append("athletes.name = ?")
+            params.append(athlete)
+        if gear is not None:
+            gears = [gear] if isinstance(gear, str) else list(gear)
+            conditions.append(f"weeks.gear IN ({', '.join('?' * len(gears))})")
+            params.extend(gears)
+        if start is not None:
+            conditions.append("days.date >= ?")
+            params.append(iso_date(start))
+        if end is not None:
+            conditions.append("days.date <= ?")
+            params.append(iso_date(end))
+        return self.connection.execute(
+            "SELECT athletes.name AS athlete, weeks.week, days.date, days.name AS day, weeks.bar_type, "
+            "weeks.gear, exercises.lift, exercises.name, exercises.sets, exercises.reps, "
+            "exercises.amrap, exercises.intensity, exercises.percent, exercises.text "
+            "FROM exercises JOIN days ON days.id = exercises.day_id "
+            "JOIN weeks ON weeks.id = days.week_id "
+            "JOIN athletes ON athletes.id = weeks.athlete_id "
+            f"WHERE {' AND '.join(conditions)} ORDER BY athletes.name, days.date",
+            params
+        ).fetchall()
+
+    def explain(self, sql: str, params: Sequence = ()) -> List[str]:
+        """Returns SQLite's query plan for a statement, to check which indexes it uses"""
+        return [row[-1] for row in self.connection.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+def iter_rows(rows: Iterable[sqlite3.Row]) -> Iterator[Dict]:
+    """Converts query rows to plain dicts"""
+    for row in rows:
+        yield dict(row)
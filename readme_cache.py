@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# Distributions whose upgrades can change the rendered HTML
+RENDERING_PACKAGES = ("markdown", "pygments")
+
+@lru_cache(maxsize=None)
+def package_versions() -> Tuple[Optional[str], ...]:
+    """Returns the installed version of each RENDERING_PACKAGES entry, None when missing.
+
+    Versions come from the installed metadata, so reading them does not
+    import markdown or Pygments themselves.
+    """
+    from importlib import metadata
+
+    versions = []
+    for name in RENDERING_PACKAGES:
+        try:
+            versions.append(metadata.version(name))
+        except metadata.PackageNotFoundError:
+            versions.append(None)
+    return tuple(versions)
+
+class ReadmeCache:
+    """On-disk cache of the README rendered to HTML.
+
+    Entries are keyed by the README contents, the markdown extensions used
+    and the installed markdown and Pygments versions, so the markdown
+    package (and Pygments, via codehilite) is only imported when the README
+    or one of them changed.
+    """
+
+    EXTENSIONS: Tuple[str, ...] = ('extra', 'codehilite', 'meta')
+    MAX_ENTRIES = 16
+
+    def __init__(self, cache_dir: str = os.path.join(".cache", "readme"),
+                 extensions: Tuple[str, ...] = EXTENSIONS):
+        self.cache_dir = cache_dir
+        self.extensions = tuple(extensions)
+        self.hits = 0
+        self.misses = 0
+
+    def cache_key(self, readme_content: str) -> str:
+        """Returns the digest identifying a rendering of readme_content"""
+        payload = json.dumps([readme_content, self.extensions, package_versions()])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def render(self, readme_content: str) -> str:
+        """Returns the README as HTML, converting it only on a cache miss"""
+        path = os.path.join(self.cache_dir, f"{self.cache_key(readme_content)}.html")
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                html = f.read()
+            self.hits += 1
+            return html
+        except FileNotFoundError:
+            pass
+        
+        self.misses += 1
+        import markdown
+        
+        md = markdown.Markdown(extensions=list(self.extensions))
+        html = md.convert(readme_content)
+        self._store(path, html)
+        return html
+
+    def _store(self, path: str, html: str):
+        """Writes an entry atomically and drops the oldest entries beyond MAX_ENTRIES"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        os.replace(temp_path, path)
+        
+        # Builds sharing the cache directory may prune the same entries at once
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.html'):
+                entry = os.path.join(self.cache_dir, name)
+                try:
+                    entries.append((os.path.getmtime(entry), entry))
+                except FileNotFoundError:
+                    continue
+        entries.sort(reverse=True)
+        for _, stale in entries[self.MAX_ENTRIES:]:
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,83 @@
+from datetime import date, datetime
+from typing import Dict, Optional, Sequence, Union
+import numpy as np
+from program_definition import CompiledProgram, load_program
+
+DateLike = Union[date, datetime, str, np.datetime64]
+
+class ScheduleEngine:
+    """Computes the weekly schedule columns of a compiled program for many athletes at once.
+
+    Every athlete contributes one row per week, laid out athlete by athlete in
+    week order. Rows are plain NumPy columns rather than week dicts, so whole
+    populations of lifters can be scheduled without a Python loop per week.
+    Each rotation's column is read from the program's per-week tables, the
+    same way ProgramBuilder reads them, so both always agree.
+    """
+
+    def __init__(self, program: Optional[CompiledProgram] = None):
+        self.program = program if program is not None else load_program()
+        # Per rotation: its distinct values and, per table row, the code of the row's value
+        self.values: Dict[str, np.ndarray] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        for name in self.program.columns:
+            values, codes = self.program.coded_column(name)
+            self.values[name] = np.array(values)
+            self.codes[name] = np.array(codes, dtype=np.int64)
+
+    @staticmethod
+    def _to_days(start_dates: Sequence[DateLike]) -> np.ndarray:
+        """Converts start dates to datetime64[D], accepting datetimes and ISO strings"""
+        if isinstance(start_dates, np.ndarray) and np.issubdtype(start_dates.dtype, np.datetime64):
+            return start_dates.astype('datetime64[D]')
+        return np.array([
+            d.date() if isinstance(d, datetime) else d for d in start_dates
+        ], dtype='datetime64[D]')
+
+    def build(self, athletes: Sequence, start_dates: Sequence[DateLike],
+              total_weeks: Union[int, Sequence[int]]) -> Dict[str, np.ndarray]:
+        """Returns every schedule column for each (athlete, start_date, total_weeks) row.
+
+        Besides the week, date, week of the wave ("week_in_cycle") and wave
+        count ("month"), every rotation gets a value column and a "<name>_code"
+        column indexing self.values[name]; bar and gear are the week header's.
+        """
+        athletes = np.asarray(athletes)
+        starts = self._to_days(start_dates)
+        counts = np.broadcast_to(np.asarray(total_weeks, dtype=np.int64), athletes.shape)
+        if len(athletes) != len(starts):
+            raise ValueError("athletes and start_dates must have the same length")
+        if np.any(counts < 0):
+            raise ValueError("total_weeks must not be negative")
+
+        # 1970-01-01 was a Thursday, so Mondays are the days where (days + 3) % 7 == 0
+        not_monday = (starts.astype(np.int64) + 3) % 7 != 0
+        if np.any(not_monday):
+            bad = starts[not_monday][0]
+            raise ValueError(f"Start date {bad} is not a Monday")
+
+        # Flatten the ragged (athlete, week) grid into one row per athlete-week
+        athlete_index = np.repeat(np.arange(len(athletes)), counts)
+        offsets = np.cumsum(counts) - counts
+        week = np.arange(athlete_index.size, dtype=np.int64) - np.repeat(offsets, counts) + 1
+
+        week_zero = week - 1
+        wave_length = self.program.wave_length
+        week_in_cycle = week_zero % wave_length + 1
+        month = week_zero // wave_length + 1
+        row = week_zero % self.program.period
+        columns = {
+            "athlete": athletes[athlete_index],
+            "athlete_index": athlete_index,
+            "week": week,
+            "date": starts[athlete_index] + (7 * week_zero).astype('timedelta64[D]'),
+            "week_in_cycle": week_in_cycle,
+            "month": month,
+            # Chains alternate waves and are off on the wave's last week, as in ProgramBuilder
+            "chains": (week_in_cycle != wave_length) & (month % 2 == 1),
+        }
+        for name, codes in self.codes.items():
+            code = codes[row]
+            columns[f"{name}_code"] = code
+            columns[name] = self.values[name][code]
+        return columns
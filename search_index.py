@@ -0,0 +1,245 @@
+import json
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from models import Day, Week, WeekSignature
+
+EXERCISE = "exercise"
+GEAR = "gear"
+BAR = "bar"
+CATEGORIES = (EXERCISE, GEAR, BAR)
+
+def exercise_name(line: str) -> Optional[str]:
+    """Returns the exercise a program line names, or None for block headings like "Superset (3-5 rounds):"
+
+    "- Cable Woodchopper: 15 reps" names Cable Woodchopper and the cardio
+    line "Light Farmers Carry - 1 hour" names Light Farmers Carry.
+    """
+    line = line.strip()
+    if line.startswith("- "):
+        line = line[2:]
+    if not line or line.endswith(":"):
+        return None
+    name = line.split(":", 1)[0] if ":" in line else line.split(" - ", 1)[0]
+    return name.strip() or None
+
+def day_exercises(days: Tuple[Day, ...]) -> List[str]:
+    """Returns the distinct exercises of a week's days in program order"""
+    names: Dict[str, None] = {}
+    for day in days:
+        for _, value in day.sections:
+            for line in ((value,) if isinstance(value, str) else value):
+                name = exercise_name(line)
+                if name is not None:
+                    names[name] = None
+    return list(names)
+
+class SearchIndex:
+    """Inverted index from exercises, gear levels and bar types to the weeks that have them.
+
+    Weeks are added in order and each term keeps its weeks as runs of
+    consecutive weeks. The payload stores every run as a (gap from the end of
+    the previous run, length) pair, so a term present every week is a single
+    pair however long the program is; dates are derived from the start date.
+    """
+
+    DATA_FILENAME = "search-index.json"
+    SCRIPT_FILENAME = "search.js"
+    FORMAT = 1
+
+    def __init__(self, start_date: datetime):
+        self.start_date = start_date
+        self.total_weeks = 0
+        # (category, term) -> [[first week, last week], ...]
+        self.runs: Dict[Tuple[str, str], List[List[int]]] = {}
+        # Weeks with the same signature have the same days, so their exercises are listed once
+        self._exercises: Dict[WeekSignature, List[str]] = {}
+
+    def add(self, week: Week):
+        """Indexes the next week of the program"""
+        number = week.number
+        if number != self.total_weeks + 1:
+            raise ValueError(f"weeks must be added in order: expected week {self.total_weeks + 1}, got {number}")
+        self.total_weeks = number
+        exercises = self._exercises.get(week.signature)
+        if exercises is None:
+            exercises = self._exercises[week.signature] = day_exercises(week.days)
+        self._add_term(GEAR, week.gear, number)
+        self._add_term(BAR, week.bar_type, number)
+        for name in exercises:
+            self._add_term(EXERCISE, name, number)
+
+    def _add_term(self, category: str, term: str, week_number: int):
+        runs = self.runs.get((category, term))
+        if runs is None:
+            self.runs[(category, term)] = [[week_number, week_number]]
+        elif runs[-1][1] == week_number - 1:
+            runs[-1][1] = week_number
+        else:
+            runs.append([week_number, week_number])
+
+    def weeks(self, category: str, term: str) -> List[int]:
+        """Returns every week that has a term, in order"""
+        return [week for first, last in self.runs.get((category, term), ()) for week in range(first, last + 1)]
+
+    def next_week(self, category: str, term: str, week_number: int) -> Optional[int]:
+        """Returns the first week from week_number on that has a term, or None"""
+        runs = self.runs.get((category, term), [])
+        index = bisect_left(runs, week_number, key=lambda run: run[1])
+        if index == len(runs):
+            return None
+        return max(runs[index][0], week_number)
+
+    def payload(self) -> Dict:
+        """Returns the delta-encoded index as plain data"""
+        terms: Dict[str, Dict[str, List[int]]] = {category: {} for category in CATEGORIES}
+        for (category, term), runs in sorted(self.runs.items()):
+            encoded = []
+            end = 0
+            for first, last in runs:
+                encoded.append(first - end)
+                encoded.append(last - first + 1)
+                end = last
+            terms[category][term] = encoded
+        return {
+            "format": self.FORMAT,
+            "start": self.start_date.strftime("%Y-%m-%d"),
+            "weeks": self.total_weeks,
+            "terms": terms,
+        }
+
+    def iter_data_file(self) -> Iterator[str]:
+        yield json.dumps(self.payload(), separators=(',', ':'))
+
+    @staticmethod
+    def decode(encoded: List[int]) -> List[Tuple[int, int]]:
+        """Turns a term's (gap, length) pairs back into (first week, last week) runs"""
+        runs = []
+        end = 0
+        for index in range(0, len(encoded), 2):
+            first = end + encoded[index]
+            end = first + encoded[index + 1] - 1
+            runs.append((first, end))
+        return runs
+
+    @staticmethod
+    def search_html() -> str:
+        """Returns the search box the index page shows when the build writes an index"""
+        return (
+            '\n<form class="program-search" data-program-search="' + SearchIndex.DATA_FILENAME + '" '
+            'onsubmit="return false">\n'
+            '<input type="search" placeholder="Exercise, gear or bar" aria-label="Search the program">\n'
+            '<ul class="search-results"></ul>\n'
+            '</form>\n'
+            f'<script src="{SearchIndex.SCRIPT_FILENAME}" defer></script>'
+        )
+
+    @staticmethod
+    def iter_script() -> Iterator[str]:
+        yield SEARCH_SCRIPT
+
+# Client-side lookups: terms decode into run arrays on first use, after which
+# "next week with X" is a binary search over the runs
+SEARCH_SCRIPT = """(function () {
+    var WEEK_MS = 7 * 86400000;
+    function pad(n) { return (n < 10 ? '0' : '') + n; }
+
+    function SearchIndex(data) {
+        var start = data.start.split('-');
+        this.start = Date.UTC(+start[0], +start[1] - 1, +start[2]);
+        this.weekCount = data.weeks;
+        this.terms = data.terms;
+        this.cache = {};
+    }
+    SearchIndex.prototype.dateOf = function (week) {
+        var d = new Date(this.start + (week - 1) * WEEK_MS);
+        return pad(d.getUTCMonth() + 1) + '-' + pad(d.getUTCDate()) + '-' + d.getUTCFullYear();
+    };
+    SearchIndex.prototype.weekOf = function (date) {
+        var day = Date.UTC(date.getFullYear(), date.getMonth(), date.getDate());
+        return Math.floor((day - this.start) / WEEK_MS) + 1;
+    };
+    SearchIndex.prototype.runs = function (category, term) {
+        var key = category + '\\u0000' + term;
+        var runs = this.cache[key];
+        if (runs) return runs;
+        var encoded = (this.terms[category] || {})[term] || [];
+        var count = encoded.length / 2;
+        runs = {first: new Int32Array(count), last: new Int32Array(count)};
+        for (var i = 0, end = 0; i < count; i++) {
+            runs.first[i] = end + encoded[2 * i];
+            end = runs.first[i] + encoded[2 * i + 1] - 1;
+            runs.last[i] = end;
+        }
+        return this.cache[key] = runs;
+    };
+    SearchIndex.prototype.weeks = function (category, term) {
+        var runs = this.runs(category, term), weeks = [];
+        for (var i = 0; i < runs.first.length; i++) {
+            for (var week = runs.first[i]; week <= runs.last[i]; week++) weeks.push(week);
+        }
+        return weeks;
+    };
+    SearchIndex.prototype.count = function (category, term) {
+        var runs = this.runs(category, term), total = 0;
+        for (var i = 0; i < runs.first.length; i++) total += runs.last[i] - runs.first[i] + 1;
+        return total;
+    };
+    SearchIndex.prototype.next = function (category, term, week) {
+        var runs = this.runs(category, term), low = 0, high = runs.last.length;
+        while (low < high) {
+            var middle = (low + high) >> 1;
+            if (runs.last[middle] < week) low = middle + 1; else high = middle;
+        }
+        return low < runs.last.length ? Math.max(runs.first[low], week) : null;
+    };
+    SearchIndex.prototype.find = function (query) {
+        var matches = [];
+        query = query.trim().toLowerCase();
+        if (!query) return matches;
+        for (var category in this.terms) {
+            for (var term in this.terms[category]) {
+                if (term.toLowerCase().indexOf(query) !== -1) matches.push({category: category, term: term});
+            }
+        }
+        return matches;
+    };
+
+    function load(url) {
+        return fetch(url).then(function (response) { return response.json(); })
+            .then(function (data) { return new SearchIndex(data); });
+    }
+
+    if (typeof module !== 'undefined') {
+        module.exports = {SearchIndex: SearchIndex};
+        return;
+    }
+    window.ProgramSearch = {SearchIndex: SearchIndex, load: load};
+
+    var form = document.querySelector('[data-program-search]');
+    if (!form) return;
+    var input = form.querySelector('input'), results = form.querySelector('.search-results'), index = null;
+    input.addEventListener('input', function () {
+        var show = function () {
+            results.textContent = '';
+            var today = index.weekOf(new Date());
+            index.find(input.value).slice(0, 10).forEach(function (match) {
+                var next = index.next(match.category, match.term, Math.max(today, 1));
+                var item = document.createElement('li');
+                var text = match.term + ' (' + match.category + '): ' + index.count(match.category, match.term) + ' weeks';
+                if (next === null) {
+                    item.textContent = text;
+                } else {
+                    var link = document.createElement('a');
+                    link.href = index.dateOf(next) + '-program.html';
+                    link.textContent = text + ', next Week ' + next + ' - ' + index.dateOf(next);
+                    item.appendChild(link);
+                }
+                results.appendChild(item);
+            });
+        };
+        if (index) return show();
+        load(form.getAttribute('data-program-search')).then(function (loaded) { index = loaded; show(); });
+    });
+})();
+"""
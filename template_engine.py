@@ -0,0 +1,63 @@
+from string import Formatter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+class CompiledTemplate:
+    """A template compiled once into static segments and slot positions.
+
+    The source uses str.format syntax: {name} marks a slot and doubled braces
+    are literal. Rendering copies the preallocated segment list, drops each
+    value into its slot positions and joins, with no parsing per call.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.segments: List[str] = []
+        slots: Dict[str, List[int]] = {}
+        for literal, field_name, format_spec, conversion in Formatter().parse(source):
+            if literal:
+                self.segments.append(literal)
+            if field_name is None:
+                continue
+            if not field_name.isidentifier() or format_spec or conversion:
+                raise ValueError(f"Unsupported template slot: {{{field_name}}}")
+            slots.setdefault(field_name, []).append(len(self.segments))
+            self.segments.append('')
+        self.slots: Tuple[Tuple[str, Tuple[int, ...]], ...] = tuple(
+            (name, tuple(positions)) for name, positions in slots.items()
+        )
+        self._slot_names: Dict[int, str] = {
+            position: name for name, positions in self.slots for position in positions
+        }
+
+    def slot_names(self) -> List[Optional[str]]:
+        """Returns, per segment, the name of the slot it holds or None for static text"""
+        return [self._slot_names.get(position) for position in range(len(self.segments))]
+
+    def _fill(self, values: Dict[str, str]) -> List[str]:
+        parts = self.segments.copy()
+        for name, positions in self.slots:
+            value = values[name]
+            for position in positions:
+                parts[position] = value
+        return parts
+
+    def render(self, **values: str) -> str:
+        """Renders the template with every slot filled from values"""
+        return ''.join(self._fill(values))
+
+    def iter_render(self, **values: Union[str, Iterable[str]]) -> Iterator[str]:
+        """Yields the rendered template piece by piece.
+
+        Slot values may be strings or iterables of string fragments, which are
+        streamed in place without being joined first.
+        """
+        for position, segment in enumerate(self.segments):
+            name = self._slot_names.get(position)
+            if name is None:
+                yield segment
+                continue
+            value = values[name]
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value
@@ -0,0 +1,95 @@
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from program_definition import ProgramCache  # noqa: E402
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# A program unlike the bundled one in every rotation: a 3-week wave, other
+# bars, rotation lengths and offsets, and a lift without a percentage wave
+CUSTOM_DEFINITION = '''
+name = "Custom"
+wave_length = 3
+
+[rotations.bar]
+every = 2
+values = ["Safety", "Straight", "Cambered"]
+
+[rotations.gear]
+every = 3
+wave_weeks = [3]
+default = "Sleeves"
+values = ["Belt", "Suit"]
+
+[rotations.cardio]
+offset = 2
+every = 2
+values = ["Bike", "Walk"]
+bad_weather = "Rower"
+
+[rotations.deadlift_style]
+every = 3
+values = ["Deadlift", "Block Pull", "Deficit Deadlift"]
+
+[lifts.squat]
+name = "Squat"
+line = "{name} on {bar}: {sets}x{reps} @ {intensity}"
+wave = [
+    { sets = 5, reps = 5, percent = 50 },
+    { sets = 3, reps = 3, percent = 80.0 },
+    { sets = 1, reps = 1, percent = 95, amrap = true },
+]
+
+[lifts.bench]
+name = "Bench Press"
+line = "{name}: {sets}x{reps} @ {intensity}"
+wave = [
+    { sets = 4, reps = 8, rpe = "7" },
+    { sets = 4, reps = 6, rpe = "8" },
+    { sets = 4, reps = 4, rpe = "9" },
+]
+
+[lifts.deadlift]
+name = "Deadlift"
+line = "{deadlift_style}: {sets}x{reps} @ {intensity}"
+wave = [
+    { sets = 3, reps = 5, percent = 70 },
+    { sets = 3, reps = 3, percent = 82.5 },
+    { sets = 1, reps = 2, percent = 90 },
+]
+
+[[days]]
+name = "Monday"
+sections = [
+    { heading = "Main", lift = "squat" },
+    { heading = "Cardio", line = "{cardio}" },
+]
+
+[[days]]
+name = "Thursday"
+sections = [
+    { heading = "Main", lift = "bench" },
+    { heading = "Pull", lift = "deadlift" },
+    { heading = "Accessories", lines = ["Rows: 4x10", "Curls: 3x12"] },
+]
+'''
+
+@pytest.fixture
+def program_cache(tmp_path):
+    return ProgramCache(str(tmp_path / "programs"))
+
+@pytest.fixture
+def default_program(program_cache):
+    from program_definition import DEFAULT_DEFINITION
+
+    return program_cache.load(DEFAULT_DEFINITION)
+
+@pytest.fixture
+def custom_program(tmp_path, program_cache):
+    path = tmp_path / "custom.toml"
+    path.write_text(CUSTOM_DEFINITION, encoding="utf-8")
+    return program_cache.load(str(path))
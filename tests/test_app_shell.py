@@ -0,0 +1,38 @@
+import contextlib
+import io
+import json
+from app_shell import AppShell
+from main import ProgramGenerator
+from program_builder import ProgramBuilder
+
+def build(output_dir, weeks: int = 6, layout: str = ProgramGenerator.APP):
+    with contextlib.redirect_stdout(io.StringIO()):
+        ProgramGenerator(total_weeks=weeks, output_dir=str(output_dir), layout=layout).generate_program()
+
+def test_data_file_lists_each_day_once(tmp_path):
+    build(tmp_path)
+    data = json.loads((tmp_path / AppShell.DATA_FILENAME).read_text(encoding="utf-8"))
+    builder = ProgramBuilder()
+    assert data["format"] == AppShell.FORMAT and len(data["weeks"]) == 6
+    for number, date, bar, gear, indexes in data["weeks"]:
+        week = builder.build_week(number)
+        assert (date, bar, gear) == (week["Date"], week["Bar Type"], week["Gear"])
+        assert {data["days"][index][0]: data["days"][index][1] for index in indexes} == {
+            name: value for name, value in week.items() if name not in ("Date", "Week", "Bar Type", "Gear")}
+    assert len(data["days"]) == len({json.dumps(day) for day in data["days"]})
+
+def test_week_pages_become_redirect_stubs(tmp_path):
+    build(tmp_path)
+    assert (tmp_path / AppShell.SHELL_FILENAME).exists()
+    pages = sorted(tmp_path.glob("*-program.html"))
+    assert len(pages) == 6
+    for page in pages:
+        stub = page.read_text(encoding="utf-8")
+        target = f"{AppShell.SHELL_FILENAME}#{page.name[:10]}"
+        assert f'content="0; url={target}"' in stub and f'href="{target}"' in stub
+
+def test_switching_back_to_pages_drops_the_app_files(tmp_path):
+    build(tmp_path)
+    build(tmp_path, layout=ProgramGenerator.PAGES)
+    assert not (tmp_path / AppShell.DATA_FILENAME).exists() and not (tmp_path / AppShell.SHELL_FILENAME).exists()
+    assert "refresh" not in next(tmp_path.glob("*-program.html")).read_text(encoding="utf-8")
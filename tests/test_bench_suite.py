@@ -0,0 +1,23 @@
+import pytest
+from benchmarks.bench_suite import compare, matrix
+
+def suite(seconds: float, repeat: int = 3, spread: float = 0.0, peak_bytes: int = 1000):
+    return {"results": [{"case": "build_week", "weeks": 24, "athletes": 1, "seconds": seconds,
+                         "repeat": repeat, "spread": spread, "peak_bytes": peak_bytes}]}
+
+def test_default_matrix_runs_each_axis():
+    assert matrix([24, 1000], [1, 100]) == [(24, 1), (1000, 1), (24, 100)]
+    assert len(matrix([24, 1000], [1, 100], product=True)) == 4
+
+@pytest.mark.parametrize("current, regressions", [
+    (suite(0.2), ["seconds"]),
+    (suite(0.2, repeat=1), []),
+    (suite(0.14), ["seconds"]),
+    (suite(0.14, spread=0.5), []),
+    (suite(0.105), []),
+    (suite(0.1, repeat=1, peak_bytes=2000), ["peak_bytes"]),
+])
+def test_regressions_need_repeats_beyond_noise(current, regressions):
+    [row] = compare(current, suite(0.1))
+    assert row["regressions"] == regressions
+    assert (row["unchecked"] is not None) == (current["results"][0]["repeat"] == 1)
@@ -0,0 +1,35 @@
+import sqlite3
+import pytest
+from cli import run
+
+@pytest.mark.parametrize("argv", [
+    ["build", "--weeks", "0"],
+    ["build", "--weeks", "-3"],
+    ["build", "--jobs", "0"],
+    ["week", "0"],
+    ["week", "1", "--weeks", "two"],
+])
+def test_rejects_counts_below_one(argv, capsys):
+    with pytest.raises(SystemExit) as exit_request:
+        run(argv)
+    assert exit_request.value.code == 2
+    assert "expected a" in capsys.readouterr().err
+
+def test_unwritable_output_is_an_error(tmp_path, capsys):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    assert run(["build", "--weeks", "2", "--output-dir", str(blocker / "docs")]) == 2
+    assert capsys.readouterr().err.startswith("error: ")
+
+def test_database_failure_is_an_error(tmp_path, capsys):
+    path = tmp_path / "other.db"
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE athletes (id INTEGER PRIMARY KEY, nickname TEXT)")
+    assert run(["export", "--format", "sqlite", "--output", str(path)]) == 2
+    assert capsys.readouterr().err.startswith("error: ")
+
+def test_repeated_sqlite_athlete(tmp_path, capsys):
+    path = tmp_path / "program.db"
+    assert run(["export", "--format", "sqlite", "--weeks", "2", "--athlete", "bob", "--athlete", "bob",
+                "--output", str(path)]) == 0
+    assert "Stored 1 athlete(s)" in capsys.readouterr().err
@@ -0,0 +1,43 @@
+import json
+from datetime import datetime, timezone
+import pytest
+from exporters import MAX_LINE_OCTETS, escape_text, fold, ics_lines, jsonl_lines
+from program_builder import ProgramBuilder
+
+STAMP = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+def unfold(text: str) -> list:
+    return text.replace("\r\n ", "").split("\r\n")
+
+@pytest.mark.parametrize("line", ["SUMMARY:short", "DESCRIPTION:" + "x" * 200, "SUMMARY:" + "é" * 100])
+def test_fold_keeps_lines_within_75_octets(line):
+    folded = fold(line)
+    assert folded.endswith("\r\n")
+    physical = folded[:-2].split("\r\n")
+    assert all(len(part.encode("utf-8")) <= MAX_LINE_OCTETS for part in physical)
+    assert all(part.startswith(" ") for part in physical[1:])
+    assert unfold(folded) == [line, ""]
+
+def test_escape_text():
+    assert escape_text("a,b;c\\d\ne") == r"a\,b\;c\\d\ne"
+
+def test_calendar_has_one_event_per_training_day(default_program):
+    builder = ProgramBuilder(program=default_program)
+    text = "".join(ics_lines([(None, builder), ("ann, jr", builder)], 2, STAMP))
+    assert "\n" not in text.replace("\r\n", "")
+    lines = unfold(text)
+    assert lines[0] == "BEGIN:VCALENDAR" and lines[-2:] == ["END:VCALENDAR", ""]
+    days = sum(len(builder.build_week_model(number).days) for number in (1, 2))
+    assert lines.count("BEGIN:VEVENT") == 2 * days
+    assert "DTSTART;VALUE=DATE:20250218" in lines
+    assert "SUMMARY:ann\\, jr: Squat: 2x15+ @ 62.5%" in lines
+    assert len(set(line for line in lines if line.startswith("UID:"))) == 2 * days
+
+def test_jsonl_has_one_week_per_line(default_program):
+    builder = ProgramBuilder(program=default_program)
+    lines = list(jsonl_lines([("ann", builder)], 3))
+    assert all(line.endswith("\n") and line.count("\n") == 1 for line in lines)
+    weeks = [json.loads(line) for line in lines]
+    assert [list(week)[0] for week in weeks] == ["Athlete"] * 3
+    assert [{key: value for key, value in week.items() if key != "Athlete"} for week in weeks] == [
+        builder.build_week(number) for number in (1, 2, 3)]
@@ -0,0 +1,27 @@
+import pytest
+from fragment_cache import LRUCache
+from html_templates import Navigation, ProgramPageRenderer
+from program_builder import ProgramBuilder, WeekDates
+
+def test_lru_cache_evicts_the_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    assert (cache.hits, cache.misses, len(cache)) == (3, 1, 2)
+    with pytest.raises(ValueError):
+        LRUCache(0)
+
+def test_weeks_sharing_a_signature_reuse_their_day_blocks(default_program):
+    builder = ProgramBuilder(program=default_program)
+    weeks = 3 * default_program.period
+    renderer = ProgramPageRenderer(Navigation(WeekDates(builder, weeks)))
+    for number in range(1, weeks + 1):
+        week = builder.build_week_model(number)
+        fresh = ProgramPageRenderer(renderer.navigation)
+        assert renderer.render_week(week) == fresh.render_week(week)
+    distinct = len(default_program.day_sets)
+    assert renderer.fragment_cache.misses == distinct
+    assert renderer.fragment_cache.hits == weeks - distinct
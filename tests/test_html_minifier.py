@@ -0,0 +1,78 @@
+import contextlib
+import io
+import pytest
+from html_minifier import HTMLMinifier, minify_html
+from html_templates import HTMLTemplates, Navigation, ProgramPageRenderer, PROGRAM_PAGE_TEMPLATE
+from main import ProgramGenerator
+from program_builder import ProgramBuilder, WeekDates
+
+def test_whitespace_rules():
+    html = """<div>
+        <p>Squat:   5x5
+           @ 80%</p>  <span>a</span>  <b>b</b>
+        <!-- dropped -->
+        <pre>  kept
+   as is </pre>
+    </div>"""
+    assert minify_html(html) == '<div><p>Squat: 5x5 @ 80%</p><span>a</span> <b>b</b><pre>  kept\n   as is </pre></div>'
+
+def test_style_content_is_minified_as_css():
+    html = '<head><style>\n  body { color: red; }\n</style></head>'
+    assert minify_html(html) == '<head><style>body{color:red}</style></head>'
+
+@pytest.mark.parametrize("size", [1, 7, 100, 5000])
+def test_any_split_gives_the_same_output(size):
+    page = HTMLTemplates.generate_program_page(
+        ProgramBuilder().build_week(1), [{"Week": n, "Date": f"2025-01-{n:02d}"} for n in range(1, 20)]
+    )
+    pieces = [page[start:start + size] for start in range(0, len(page), size)]
+    minifier = HTMLMinifier()
+    assert ''.join(minifier.minify(pieces)) == minify_html(page)
+    assert minifier.documents == 1
+    assert minifier.bytes_in == len(page.encode('utf-8'))
+    assert minifier.bytes_out == len(minify_html(page).encode('utf-8'))
+
+def test_minified_template_renders_the_minified_page():
+    values = dict(week="3", styles="<style>p { margin: 0; }</style>", body_attrs=' class="x"',
+                  nav_links="<div>nav</div>", content="<div>  content </div>")
+    template = HTMLMinifier.minify_template(PROGRAM_PAGE_TEMPLATE)
+    # Slot values are minified on their own, except attributes, which sit inside a tag
+    minified_values = {name: value if name == "body_attrs" else minify_html(value) for name, value in values.items()}
+    assert template.render(**minified_values) == minify_html(PROGRAM_PAGE_TEMPLATE.render(**values))
+
+@pytest.mark.parametrize("nav_mode", Navigation.MODES)
+@pytest.mark.parametrize("stylesheet", [None, "styles.css"])
+def test_renderer_matches_streaming_minifier(nav_mode, stylesheet):
+    builder = ProgramBuilder()
+    weeks = WeekDates(builder, 30)
+    plain = ProgramPageRenderer(Navigation(weeks, nav_mode), stylesheet)
+    minifier = HTMLMinifier()
+    minified = ProgramPageRenderer(Navigation(weeks, nav_mode, minify=True), stylesheet, minifier)
+    streaming = HTMLMinifier()
+    for week_number in (1, 2, 17, 29, 30):
+        week = builder.build_week_model(week_number)
+        page = minified.render_week(week)
+        assert page == streaming.minify_document(plain.render_week(week))
+        assert ''.join(minified.iter_render_week(week)) == page
+    # The renderer counts what streaming every page through the minifier would have
+    assert minifier.documents == 2 * streaming.documents
+    assert minifier.bytes_in == 2 * streaming.bytes_in
+    assert minifier.bytes_out == 2 * streaming.bytes_out
+
+def test_minified_renderer_needs_minified_navigation():
+    with pytest.raises(ValueError, match="minify"):
+        ProgramPageRenderer(Navigation([(1, "2025-02-17")]), minifier=HTMLMinifier())
+
+def html_sizes(output_dir) -> list:
+    return [path.stat().st_size for path in sorted(output_dir.glob("*.html"))]
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_minifier_counts_match_the_written_pages(tmp_path, jobs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        ProgramGenerator(total_weeks=20, output_dir=str(tmp_path / "plain"), jobs=jobs).generate_program()
+        generator = ProgramGenerator(total_weeks=20, output_dir=str(tmp_path / "minified"), jobs=jobs, minify=True)
+        generator.generate_program()
+    minified = html_sizes(tmp_path / "minified")
+    assert generator.minifier.documents == len(minified) > 20
+    assert generator.minifier.bytes_out == sum(minified)
+    assert generator.minifier.bytes_in == sum(html_sizes(tmp_path / "plain"))
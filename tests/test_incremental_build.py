@@ -0,0 +1,58 @@
+import contextlib
+import io
+import os
+import re
+import subprocess
+import sys
+import pytest
+import main
+import watcher
+from main import ProgramGenerator
+
+def build(output_dir: str, **options) -> str:
+    generator = ProgramGenerator(total_weeks=6, output_dir=output_dir, **options)
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        generator.generate_program()
+    return out.getvalue()
+
+def rebuilt(output: str) -> int:
+    return int(re.search(r"Files rebuilt: (\d+)", output).group(1))
+
+def test_unchanged_build_skips_every_file(tmp_path):
+    build(str(tmp_path))
+    assert rebuilt(build(str(tmp_path))) == 0
+
+@pytest.mark.parametrize("module", ["template_engine", "models", "program_builder", "html_minifier"])
+def test_output_module_change_rebuilds_pages(tmp_path, monkeypatch, module):
+    build(str(tmp_path))
+    # Stand in an edited copy of the module's source for the build's digest
+    edited = tmp_path / f"{module}.py"
+    source = next(path for path in watcher.source_paths() if os.path.basename(path) == f"{module}.py")
+    with open(source, encoding="utf-8") as f:
+        edited.write_text(f.read() + "\n# edited\n", encoding="utf-8")
+    paths = [str(edited) if path == source else path for path in watcher.source_paths()]
+    monkeypatch.setattr(watcher, "source_paths", lambda: paths)
+    assert rebuilt(build(str(tmp_path))) == 7
+
+def test_minify_toggle_rebuilds_pages(tmp_path):
+    build(str(tmp_path))
+    assert rebuilt(build(str(tmp_path), minify=True)) == 7
+
+def test_plain_build_leaves_optional_feature_modules_unimported(tmp_path):
+    script = (
+        "import sys; from main import ProgramGenerator; "
+        f"ProgramGenerator(total_weeks=3, output_dir={str(tmp_path)!r}).generate_program(); "
+        "print(sorted(set(sys.modules) & {'precompress', 'search_index', 'app_shell', 'html_minifier'}))"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(main.__file__),
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.splitlines()[-1] == "[]"
+
+def test_optional_file_names_mirror_their_modules():
+    from app_shell import AppShell
+    from precompress import FORMATS
+    from search_index import SearchIndex
+    assert main.PRECOMPRESSED_SUFFIXES == tuple(f".{fmt}" for fmt in FORMATS)
+    assert set(main.OPTIONAL_FILES) >= {SearchIndex.DATA_FILENAME, SearchIndex.SCRIPT_FILENAME,
+                                        AppShell.DATA_FILENAME, AppShell.SHELL_FILENAME}
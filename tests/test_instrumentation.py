@@ -0,0 +1,39 @@
+import contextlib
+import io
+import os
+import pytest
+from instrumentation import Instrumentation
+from main import ProgramGenerator
+
+def profiled_build(output_dir: str, jobs: int, minify: bool = False) -> Instrumentation:
+    instrumentation = Instrumentation()
+    generator = ProgramGenerator(total_weeks=40, jobs=jobs, incremental=False, output_dir=output_dir,
+                                 instrumentation=instrumentation, minify=minify)
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator.generate_program()
+    return instrumentation
+
+@pytest.mark.parametrize("minify", [False, True])
+def test_parallel_build_reports_worker_counters(tmp_path, minify):
+    serial = profiled_build(str(tmp_path / "serial"), 1, minify)
+    parallel = profiled_build(str(tmp_path / "parallel"), 3, minify)
+    assert parallel.counters == serial.counters
+    assert parallel.counters["pages written"] == 40
+    for stage in ("render page", "write page"):
+        assert parallel.stages[stage]["calls"] == serial.stages[stage]["calls"] == 40
+    workers = {event["pid"] for event in parallel.events if event["name"] == "render page"}
+    assert os.getpid() not in workers
+
+def test_merge_adds_up_stages():
+    parent, worker = Instrumentation(), Instrumentation()
+    with parent.stage("render page"):
+        pass
+    for _ in range(2):
+        with worker.stage("render page"):
+            pass
+    worker.count("pages written", 2)
+    parent.merge(worker.take())
+    assert parent.stages["render page"]["calls"] == 3
+    assert parent.counters == {"pages written": 2}
+    assert len(parent.events) == 3
+    assert worker.stages == {} and worker.counters == {} and worker.events == []
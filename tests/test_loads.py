@@ -0,0 +1,69 @@
+import math
+import numpy as np
+import pytest
+from loads import LoadCalculator, PlateInventory, PlateSolver
+from program_builder import ProgramBuilder
+from schedule_engine import ScheduleEngine
+
+def test_default_program_loads(default_program):
+    prescriptions = LoadCalculator(program=default_program).week({"squat": 400, "bench": 300}, 1)
+    squat = prescriptions["squat"]
+    assert (squat.bar, squat.intensity, squat.target, squat.load) == ("SSB", 0.625, 250.0, 250.0)
+    assert squat.plates == (45.0, 45.0, 2.5)
+    assert prescriptions["bench"].bar == "Straight"
+    # Week 4 of the wave goes by RPE
+    assert LoadCalculator(program=default_program).week({"squat": 400}, 4) == {}
+
+def test_custom_program_waves_and_bars(custom_program):
+    calculator = LoadCalculator(program=custom_program)
+    one_rep_maxes = {"squat": 400, "bench": 300, "deadlift": 500}
+    week_one = calculator.week(one_rep_maxes, 1)
+    # The custom squat wave starts at 50%, on a bar the bundled program does not have
+    assert week_one["squat"].intensity == 0.5
+    assert week_one["squat"].bar == "Safety"
+    assert week_one["squat"].load == 200.0
+    assert week_one["deadlift"].intensity == 0.7
+    # Bench goes by RPE for the whole wave
+    assert "bench" not in week_one
+    # The 3-week wave restarts on week 4, now on the straight bar
+    week_four = calculator.week(one_rep_maxes, 4)
+    assert week_four["squat"].intensity == 0.5
+    assert week_four["squat"].bar == "Straight"
+    assert calculator.week(one_rep_maxes, 3)["squat"].intensity == 0.95
+
+def test_week_follows_the_builders_program(default_program, custom_program):
+    builder = ProgramBuilder(program=custom_program)
+    prescriptions = LoadCalculator(program=default_program).week({"squat": 400}, 1, builder)
+    assert prescriptions["squat"].load == 200.0
+
+def test_intensity_scales(default_program):
+    calculator = LoadCalculator(program=default_program)
+    scaled = calculator.week({"squat": 400}, 1, intensity_scales={"squat": 1.05})["squat"]
+    assert math.isclose(scaled.intensity, 0.625 * 1.05)
+
+@pytest.mark.parametrize("program_name", ["default_program", "custom_program"])
+def test_batch_matches_week(program_name, request):
+    program = request.getfixturevalue(program_name)
+    athletes = 3
+    one_rep_maxes = {"squat": np.array([300.0, 415.0, 550.0]), "deadlift": np.array([350.0, 500.0, 640.0])}
+    schedule = ScheduleEngine(program).build(np.arange(athletes), ["2025-02-17"] * athletes, 40)
+    calculator = LoadCalculator(program=program)
+    batch = calculator.batch(schedule, one_rep_maxes)
+    builder = ProgramBuilder(program=program)
+    for row in range(len(schedule["week"])):
+        athlete = schedule["athlete_index"][row]
+        week = calculator.week({lift: values[athlete] for lift, values in one_rep_maxes.items()},
+                               int(schedule["week"][row]), builder)
+        for lift in one_rep_maxes:
+            load = batch[lift]["load"][row]
+            if lift in week:
+                assert load == week[lift].load
+            else:
+                assert np.isnan(load)
+
+def test_plate_solver_reaches_nearest_load():
+    solver = PlateSolver(PlateInventory())
+    per_side, counts, capped = solver.solve(np.array([0.0, 47.5, 101.0, 10000.0]))
+    assert list(per_side) == [0.0, 47.5, 100.0, solver.capacity * solver.step]
+    assert list(capped) == [False, False, False, True]
+    assert solver.plates(counts[1]) == (45.0, 2.5)
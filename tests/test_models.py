@@ -0,0 +1,31 @@
+import dataclasses
+import json
+import pytest
+from models import Day, Exercise, Week
+from program_builder import ProgramBuilder
+from test_program_definition import baseline_weeks
+
+def test_to_dict_matches_the_original_week_dicts(default_program):
+    builder = ProgramBuilder(program=default_program)
+    for week in baseline_weeks():
+        # Pages render days and sections in dict order, so the order must match too
+        assert json.dumps(builder.build_week_model(week["Week"]).to_dict()) == json.dumps(week)
+
+def test_models_are_frozen_and_slotted():
+    exercise = Exercise("Squat", 5, 5, 0.625)
+    day = Day("Monday", (("Main", "Squat: 5x5"), ("Accessories", ("Lunges: 4x15",))))
+    week = Week(1, "02-17-2025", "SSB", "Raw", (day,))
+    for model in (exercise, day, week):
+        assert not hasattr(model, "__dict__")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            setattr(model, dataclasses.fields(model)[0].name, "changed")
+
+def test_weeks_share_their_accessory_blocks(default_program):
+    builder = ProgramBuilder(program=default_program)
+    blocks = {}
+    for number in range(1, default_program.period + 1):
+        for day in builder.build_week_model(number).days:
+            for heading, value in day.sections:
+                if isinstance(value, tuple):
+                    assert blocks.setdefault(value, value) is value
+    assert blocks
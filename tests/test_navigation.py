@@ -0,0 +1,36 @@
+import contextlib
+import io
+import re
+import pytest
+from html_templates import Navigation
+from main import ProgramGenerator
+
+WEEKS = [(1, "02-17-2025"), (2, "02-24-2025"), (3, "03-03-2025")]
+
+@pytest.mark.parametrize("current", [1, 2, 3])
+def test_only_the_current_week_is_selected(current):
+    html = Navigation(WEEKS).render(current)
+    options = re.findall(r'<option value="([^"]+)"( selected)?>Week (\d+)', html)
+    assert [int(week) for _, _, week in options] == [1, 2, 3]
+    assert [int(week) for _, selected, week in options if selected] == [current]
+    assert f'<option value="{WEEKS[current - 1][1]}-program.html" selected>' in html
+
+def test_prev_and_next_links_stop_at_the_ends():
+    navigation = Navigation(WEEKS)
+    assert "← Week" not in navigation.render(1) and "Week 2 →" in navigation.render(1)
+    assert "← Week 2" in navigation.render(3) and "→" not in navigation.render(3)
+
+def test_shared_pages_load_one_nav_script(tmp_path):
+    generator = ProgramGenerator(total_weeks=6, nav_mode=Navigation.SHARED, output_dir=str(tmp_path))
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator.generate_program()
+    scripts = [path.name for path in tmp_path.iterdir() if path.suffix == ".js"]
+    assert scripts == [Navigation.DATA_FILENAME]
+    pages = sorted(tmp_path.glob("*-program.html"))
+    assert len(pages) == 6
+    for week, page in enumerate(pages, 1):
+        html = page.read_text(encoding="utf-8")
+        assert "<option" not in html
+        assert f'data-current-week="{week}"' in html and f'<script src="{Navigation.DATA_FILENAME}">' in html
+    data = (tmp_path / Navigation.DATA_FILENAME).read_text(encoding="utf-8")
+    assert all(f'[{week},"{page.name[:10]}"]' in data for week, page in enumerate(pages, 1))
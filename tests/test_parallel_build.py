@@ -0,0 +1,16 @@
+import contextlib
+import io
+import pytest
+from main import ProgramGenerator
+
+def build(output_dir, **options) -> dict:
+    generator = ProgramGenerator(total_weeks=40, output_dir=str(output_dir), **options)
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator.generate_program()
+    return {path.name: path.read_bytes() for path in sorted(output_dir.iterdir())}
+
+@pytest.mark.parametrize("options", [{}, {"minify": True}, {"nav_mode": "shared", "css_mode": "shared"}])
+def test_parallel_build_matches_serial(tmp_path, options):
+    serial = build(tmp_path / "serial", jobs=1, **options)
+    assert len(serial) > 40
+    assert build(tmp_path / "parallel", jobs=3, **options) == serial
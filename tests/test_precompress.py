@@ -0,0 +1,49 @@
+import contextlib
+import gzip
+import io
+import re
+import pytest
+from main import ProgramGenerator
+from precompress import GZIP, ZSTD, Precompressor, zstandard
+
+def build(output_dir, compress=(GZIP,)) -> int:
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        ProgramGenerator(total_weeks=4, output_dir=str(output_dir), compress=compress).generate_program()
+    return int(re.search(r"Files rebuilt: (\d+)", out.getvalue()).group(1))
+
+def outputs(output_dir):
+    return [path for path in output_dir.iterdir() if path.suffix in (".html", ".js", ".css")]
+
+def test_every_output_gets_a_matching_gzip_sibling(tmp_path):
+    build(tmp_path)
+    files = outputs(tmp_path)
+    assert len(files) == 5
+    for path in files:
+        assert gzip.decompress(path.with_name(path.name + ".gz").read_bytes()) == path.read_bytes()
+
+def test_unchanged_outputs_keep_their_siblings(tmp_path):
+    build(tmp_path)
+    siblings = {path.name: path.stat().st_mtime_ns for path in tmp_path.glob("*.gz")}
+    assert build(tmp_path) == 0
+    assert {path.name: path.stat().st_mtime_ns for path in tmp_path.glob("*.gz")} == siblings
+    # A missing sibling makes its file stale again
+    (tmp_path / "index.html.gz").unlink()
+    assert build(tmp_path) == 1
+    assert (tmp_path / "index.html.gz").exists()
+
+def test_build_without_compression_removes_siblings(tmp_path):
+    build(tmp_path)
+    build(tmp_path, compress=())
+    assert not list(tmp_path.glob("*.gz"))
+
+@pytest.mark.skipif(zstandard is None, reason="needs the zstandard package")
+def test_zstd_siblings(tmp_path):
+    build(tmp_path, compress=(GZIP, ZSTD))
+    decompressor = zstandard.ZstdDecompressor()
+    for path in outputs(tmp_path):
+        assert decompressor.decompress(path.with_name(path.name + ".zst").read_bytes()) == path.read_bytes()
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError, match="Unknown compression format: br"):
+        Precompressor(["br"])
@@ -0,0 +1,38 @@
+import asyncio
+import os
+from datetime import datetime
+from conftest import CUSTOM_DEFINITION
+from preview_server import PreviewServer
+
+START = datetime(2025, 2, 17)
+PAGE = "02-17-2025-program.html"
+
+def test_pages_follow_edits_to_the_definition(tmp_path):
+    path = tmp_path / "custom.toml"
+    path.write_text(CUSTOM_DEFINITION, encoding="utf-8")
+    server = PreviewServer(port=0, program_path=str(path), start_date=START)
+    server.VERSION_TTL = 60
+
+    async def fetch() -> str:
+        page = await server.get_page(START, 6, PAGE)
+        return page.body.decode('utf-8')
+
+    async def edit_between_requests():
+        before = await fetch()
+        cached = await fetch()
+        path.write_text(CUSTOM_DEFINITION.replace('"Safety"', '"Buffalo"'), encoding="utf-8")
+        stat = os.stat(path)
+        # Filesystems with coarse timestamps could leave the edit with the same mtime
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        # The definition is only statted again once its version has gone stale
+        unchecked = await fetch()
+        server.VERSION_TTL = 0
+        return before, cached, unchecked, await fetch()
+
+    try:
+        before, cached, unchecked, after = asyncio.run(edit_between_requests())
+    finally:
+        server.executor.shutdown()
+    assert "Squat on Safety" in before and cached == before == unchecked
+    assert server.pages.hits == 2
+    assert "Squat on Buffalo" in after and "Safety" not in after
@@ -0,0 +1,62 @@
+import json
+import os
+import pytest
+from conftest import DATA_DIR
+from program_builder import ProgramBuilder
+from program_definition import ProgramCache, parse_definition, validate
+
+def baseline_weeks():
+    """Weeks 1-48 as the hand-written builder the definitions replaced produced them"""
+    with open(os.path.join(DATA_DIR, "baseline_weeks.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+def test_default_definition_matches_baseline_builder(default_program):
+    builder = ProgramBuilder(program=default_program)
+    for week in baseline_weeks():
+        assert builder.build_week(week["Week"]) == week
+
+def test_weeks_repeat_with_the_period(default_program):
+    builder = ProgramBuilder(program=default_program)
+    assert default_program.period == 24
+    for week_number in range(1, 25):
+        later = builder.build_week_model(week_number + default_program.period)
+        assert later.days is builder.build_week_model(week_number).days
+
+def test_cached_compilation_matches_fresh(tmp_path, default_program):
+    from program_definition import DEFAULT_DEFINITION
+
+    cache_dir = str(tmp_path / "programs")
+    ProgramCache(cache_dir).load(DEFAULT_DEFINITION)
+    cache = ProgramCache(cache_dir)
+    cached = cache.load(DEFAULT_DEFINITION)
+    assert cache.hits == 1 and cache.misses == 0
+    fresh, reread = ProgramBuilder(program=default_program), ProgramBuilder(program=cached)
+    for week_number in range(1, 49):
+        assert reread.build_week(week_number) == fresh.build_week(week_number)
+
+def test_custom_program_rotations(custom_program):
+    builder = ProgramBuilder(program=custom_program)
+    assert custom_program.period == 36
+    assert [builder.get_bar_for_week(n) for n in range(1, 8)] == [
+        "Safety", "Safety", "Straight", "Straight", "Cambered", "Cambered", "Safety"]
+    assert [builder.get_gear_level(n) for n in range(1, 7)] == [
+        "Sleeves", "Sleeves", "Belt", "Sleeves", "Sleeves", "Suit"]
+    week = builder.build_week(6)
+    assert week["Monday"]["Main"] == "Squat on Cambered: 1x1+ @ 95%"
+    assert week["Thursday"]["Main"] == "Bench Press: 4x4 @ RPE 9"
+    assert week["Thursday"]["Pull"] == "Block Pull: 1x2 @ 90%"
+
+@pytest.mark.parametrize("change, message", [
+    (lambda d: d.pop("wave_length"), "wave_length"),
+    (lambda d: d["lifts"]["squat"]["wave"].pop(), "lifts.squat.wave"),
+    (lambda d: d["lifts"]["bench"].update(line="{chains}"), "lifts.bench.line: unknown field {chains}"),
+    (lambda d: d["rotations"].pop("bar"), "missing the bar rotation"),
+    (lambda d: d["days"][0].update(name="Someday"), "days[1].name"),
+])
+def test_validate_names_the_problem(change, message):
+    from conftest import CUSTOM_DEFINITION
+
+    definition = parse_definition(CUSTOM_DEFINITION.encode(), "custom.toml")
+    change(definition)
+    with pytest.raises(ValueError, match=message.replace("[", r"\[").replace("{", r"\{")):
+        validate(definition, "custom.toml")
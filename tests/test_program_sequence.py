@@ -0,0 +1,48 @@
+from datetime import date, datetime
+import pytest
+from program_builder import ProgramBuilder
+from program_sequence import ProgramSequence
+
+@pytest.fixture
+def builder(default_program):
+    return ProgramBuilder(datetime(2025, 2, 17), default_program)
+
+def test_indexes_and_slices_match_the_builder(builder):
+    weeks = ProgramSequence(builder, 24)
+    assert len(weeks) == 24
+    assert weeks[0] == builder.build_week(1) and weeks[-1] == builder.build_week(24)
+    with pytest.raises(IndexError):
+        weeks[24]
+    middle = weeks[4:10:2]
+    assert isinstance(middle, ProgramSequence) and len(middle) == 3
+    assert [week["Week"] for week in middle] == [5, 7, 9]
+    assert [week["Week"] for week in weeks[-2:]] == [23, 24]
+    assert len(weeks[30:]) == 0
+
+def test_open_ended_program(builder):
+    weeks = ProgramSequence(builder)
+    assert weeks[10_000]["Week"] == 10_001
+    assert weeks[5:][0]["Week"] == 6
+    with pytest.raises(TypeError):
+        len(weeks)
+    with pytest.raises(IndexError):
+        weeks[-1]
+    with pytest.raises(IndexError):
+        weeks[-3:]
+
+def test_week_for_date_boundaries(builder):
+    weeks = ProgramSequence(builder, 2)
+    assert weeks.week_for_date(date(2025, 2, 16)) is None
+    assert weeks.week_for_date(date(2025, 2, 17)) == 1
+    assert weeks.week_for_date(datetime(2025, 2, 23, 23, 59)) == 1
+    assert weeks.week_for_date(date(2025, 2, 24)) == 2
+    assert weeks.week_for_date(date(2025, 3, 2)) == 2
+    assert weeks.week_for_date(date(2025, 3, 3)) is None
+    assert weeks[1:].week_for_date(date(2025, 2, 17)) is None
+
+def test_workout_for_date(builder):
+    weeks = ProgramSequence(builder, 2)
+    assert weeks.workout_for_date(date(2025, 2, 18)) == builder.build_week(1)["Tuesday"]
+    assert weeks.workout_for_date(date(2025, 2, 17)) is None
+    with pytest.raises(IndexError):
+        weeks.week(3)
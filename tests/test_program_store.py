@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+import pytest
+from program_builder import ProgramBuilder
+from program_store import ProgramStore
+
+START = datetime(2025, 2, 17)
+
+@pytest.fixture
+def store():
+    with ProgramStore() as store:
+        yield store
+
+@pytest.mark.parametrize("program_name", ["default_program", "custom_program"])
+def test_round_trip_matches_builder(store, program_name, request):
+    program = request.getfixturevalue(program_name)
+    store.load([("ann", START)], 12, program)
+    builder = ProgramBuilder(START, program)
+    for number in range(1, 13):
+        week = builder.build_week_model(number)
+        row = store.week("ann", number)
+        assert (row["date"], row["bar_type"], row["gear"]) == (
+            builder.get_week_date(number).date().isoformat(), week.bar_type, week.gear)
+        for day in week.days:
+            offset = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"].index(day.name)
+            stored = store.workout_on("ann", builder.get_week_date(number) + timedelta(days=offset))
+            lines = [(heading, text) for heading, value in day.sections
+                     for text in ((value,) if isinstance(value, str) else value)]
+            assert [(row["section"], row["text"]) for row in stored] == lines
+
+def test_reload_replaces_athlete(store):
+    store.load([("ann", START)], 4)
+    store.load([("ann", START + timedelta(weeks=1))], 2)
+    assert [row["start_date"] for row in store.athletes()] == ["2025-02-24"]
+    assert store.week("ann", 3) is None
+    assert store.week("ann", 1)["date"] == "2025-02-24"
+
+def test_repeated_name_is_loaded_once_with_last_start(store):
+    written = store.load([("bob", START), ("ann", START), ("bob", START + timedelta(weeks=2))], 4)
+    assert [row["name"] for row in store.athletes()] == ["ann", "bob"]
+    assert store.week("bob", 1)["date"] == "2025-03-03"
+    assert written == 2 * store.load([("cy", START)], 4)
+
+def test_main_lift_filters(store):
+    store.load([("ann", START), ("bob", START)], 8)
+    squats = store.main_lifts("squat", athlete="ann", start="2025-02-17", end="2025-03-02")
+    assert squats and all(row["lift"] == "squat" and row["athlete"] == "ann" for row in squats)
+    assert all("2025-02-17" <= row["date"] <= "2025-03-02" for row in squats)
+    suits = store.main_lifts(gear=("Suit", "Briefs + Suit"))
+    assert all(row["gear"] in ("Suit", "Briefs + Suit") for row in suits)
+
+def test_lift_tags_come_from_the_definition(store, custom_program):
+    store.load([("ann", START)], 12, custom_program)
+    pulls = store.main_lifts("deadlift")
+    assert len(pulls) == 12
+    assert {row["text"].split(":")[0] for row in pulls} == {"Deadlift", "Block Pull", "Deficit Deadlift"}
+    assert {row["name"] for row in pulls} == {"Deadlift"}
+    squats = store.main_lifts("squat")
+    assert [(row["name"], row["sets"], row["reps"], row["amrap"], row["intensity"], row["percent"])
+            for row in squats[:3]] == [("Squat", 5, 5, 0, "50%", 50.0), ("Squat", 3, 3, 0, "80.0%", 80.0),
+                                       ("Squat", 1, 1, 1, "95%", 95.0)]
+    benches = store.main_lifts("bench")
+    assert benches[0]["intensity"] == "RPE 7" and benches[0]["percent"] is None
+    assert len(store.main_lifts()) == 36
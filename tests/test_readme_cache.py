@@ -0,0 +1,38 @@
+import os
+import sys
+import readme_cache
+from readme_cache import ReadmeCache
+
+README = "# Program\n\nSome *notes*.\n"
+
+def test_hit_does_not_import_markdown(tmp_path, monkeypatch):
+    html = ReadmeCache(str(tmp_path)).render(README)
+    assert "<em>notes</em>" in html
+    # Importing markdown now fails, so a conversion would raise
+    monkeypatch.setitem(sys.modules, "markdown", None)
+    cache = ReadmeCache(str(tmp_path))
+    assert cache.render(README) == html
+    assert (cache.hits, cache.misses) == (1, 0)
+
+def test_package_upgrade_misses(tmp_path, monkeypatch):
+    ReadmeCache(str(tmp_path)).render(README)
+    monkeypatch.setattr(readme_cache, "package_versions", lambda: ("99.0", None))
+    cache = ReadmeCache(str(tmp_path))
+    cache.render(README)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+def test_pruning_tolerates_entries_removed_concurrently(tmp_path, monkeypatch):
+    cache = ReadmeCache(str(tmp_path))
+    monkeypatch.setattr(ReadmeCache, "MAX_ENTRIES", 2)
+    for n in range(3):
+        cache.render(f"# Version {n}\n")
+    remove = os.remove
+
+    def raced_remove(path):
+        # Another build pruned the entry between the listing and this removal
+        remove(path)
+        remove(path)
+
+    monkeypatch.setattr(os, "remove", raced_remove)
+    cache.render("# Version 3\n")
+    assert len(list(tmp_path.glob("*.html"))) == 2
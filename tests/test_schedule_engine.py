@@ -0,0 +1,37 @@
+from datetime import datetime
+import numpy as np
+import pytest
+from program_builder import ProgramBuilder
+from schedule_engine import ScheduleEngine
+
+WEEKS = 100
+
+@pytest.mark.parametrize("program_name", ["default_program", "custom_program"])
+def test_columns_match_program_builder(program_name, request):
+    program = request.getfixturevalue(program_name)
+    starts = [datetime(2025, 2, 17), datetime(2024, 12, 30)]
+    schedule = ScheduleEngine(program).build(["a", "b"], starts, [WEEKS, WEEKS // 2])
+    assert len(schedule["week"]) == WEEKS + WEEKS // 2
+    for row in range(len(schedule["week"])):
+        athlete = schedule["athlete_index"][row]
+        builder = ProgramBuilder(starts[athlete], program)
+        week_number = int(schedule["week"][row])
+        model = builder.build_week_model(week_number)
+        month = (week_number - 1) // program.wave_length + 1
+        assert schedule["date"][row] == np.datetime64(builder.get_week_date(week_number).date())
+        assert schedule["week_in_cycle"][row] == (week_number - 1) % program.wave_length + 1
+        assert schedule["bar"][row] == model.bar_type == builder.get_bar_for_week(week_number)
+        assert schedule["gear"][row] == model.gear == builder.get_gear_level(week_number)
+        assert schedule["cardio"][row] == builder.get_cardio_workout(week_number)
+        assert schedule["deadlift_style"][row] == builder.get_deadlift_style(month)
+        assert schedule["chains"][row] == builder.get_chain_status(week_number)
+
+def test_codes_index_values(custom_program):
+    engine = ScheduleEngine(custom_program)
+    schedule = engine.build(["a"], ["2025-02-17"], 36)
+    for name in custom_program.columns:
+        assert list(engine.values[name][schedule[f"{name}_code"]]) == list(schedule[name])
+
+def test_rejects_start_dates_that_are_not_mondays(default_program):
+    with pytest.raises(ValueError, match="not a Monday"):
+        ScheduleEngine(default_program).build(["a"], ["2025-02-18"], 4)
@@ -0,0 +1,69 @@
+import contextlib
+import io
+import json
+from datetime import datetime
+import pytest
+from main import ProgramGenerator
+from models import Week
+from program_builder import ProgramBuilder
+from search_index import BAR, EXERCISE, GEAR, SearchIndex, exercise_name
+
+START = datetime(2025, 2, 17)
+
+def week(number: int, gear: str = "Raw") -> Week:
+    return Week(number, "", "SSB", gear, ())
+
+@pytest.fixture
+def index():
+    index = SearchIndex(START)
+    # Suit on weeks 2-3 and 6, raw otherwise
+    for number, gear in enumerate(["Raw", "Suit", "Suit", "Raw", "Raw", "Suit", "Raw"], 1):
+        index.add(week(number, gear))
+    return index
+
+def test_payload_decodes_to_the_runs(index):
+    terms = json.loads(''.join(index.iter_data_file()))["terms"]
+    assert terms[GEAR]["Suit"] == [2, 2, 3, 1]
+    for (category, term), runs in index.runs.items():
+        assert SearchIndex.decode(terms[category][term]) == [tuple(run) for run in runs]
+    assert index.weeks(GEAR, "Suit") == [2, 3, 6]
+    assert index.weeks(BAR, "SSB") == list(range(1, 8))
+
+@pytest.mark.parametrize("start, expected", [(1, 2), (2, 2), (3, 3), (4, 6), (6, 6), (7, None)])
+def test_next_week(index, start, expected):
+    assert index.next_week(GEAR, "Suit", start) == expected
+
+def test_unknown_term_and_out_of_order_weeks(index):
+    assert index.next_week(EXERCISE, "Curls", 1) is None and index.weeks(EXERCISE, "Curls") == []
+    with pytest.raises(ValueError, match="expected week 8, got 9"):
+        index.add(week(9))
+
+def test_exercise_names():
+    assert exercise_name("- Cable Woodchopper: 15 reps") == "Cable Woodchopper"
+    assert exercise_name("Light Farmers Carry - 1 hour") == "Light Farmers Carry"
+    assert exercise_name("Superset (3-5 rounds):") is None
+
+def build(output_dir, weeks: int = 8) -> str:
+    with contextlib.redirect_stdout(io.StringIO()):
+        ProgramGenerator(total_weeks=weeks, output_dir=str(output_dir), search=True).generate_program()
+    return (output_dir / SearchIndex.DATA_FILENAME).read_text(encoding="utf-8")
+
+def fresh_index(weeks: int) -> str:
+    builder = ProgramBuilder()
+    index = SearchIndex(builder.start_date)
+    for number in range(1, weeks + 1):
+        index.add(builder.build_week_model(number))
+    return ''.join(index.iter_data_file())
+
+def test_unchanged_build_reuses_the_saved_index(tmp_path, monkeypatch):
+    expected = fresh_index(8)
+    assert build(tmp_path) == expected
+
+    def fail(self, week):
+        raise AssertionError("the index was rebuilt")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(SearchIndex, "add", fail)
+        assert build(tmp_path) == expected
+    # More weeks change the pages' inputs, so the index is rebuilt in full
+    assert build(tmp_path, 12) == fresh_index(12)
@@ -0,0 +1,45 @@
+import contextlib
+import os
+import tracemalloc
+import pytest
+from html_templates import HTMLTemplates, Navigation, ProgramPageRenderer
+from main import ProgramGenerator
+from program_builder import ProgramBuilder, WeekDates
+
+def test_streamed_pages_match_whole_pages():
+    builder = ProgramBuilder()
+    dates = WeekDates(builder, 8)
+    renderer = ProgramPageRenderer(Navigation(dates))
+    all_programs = [builder.build_week(number) for number in range(1, 9)]
+    for number in range(1, 9):
+        week = builder.build_week_model(number)
+        page = renderer.render_week(week)
+        assert ''.join(renderer.iter_render_week(week)) == page
+        assert ''.join(renderer.iter_render(week.to_dict())) == page
+        assert HTMLTemplates.generate_program_page(all_programs[number - 1], all_programs) == page
+
+def test_week_dates_are_computed_on_access():
+    builder = ProgramBuilder()
+    dates = WeekDates(builder, 10)
+    assert len(dates) == 10
+    assert dates[0] == (1, "02-17-2025") and dates[-1] == (10, "04-21-2025")
+    assert dates[1:3] == [(2, "02-24-2025"), (3, "03-03-2025")]
+    with pytest.raises(IndexError):
+        dates[10]
+
+def peak_build_memory(output_dir: str, weeks: int) -> int:
+    generator = ProgramGenerator(total_weeks=weeks, nav_mode=Navigation.SHARED, use_manifest=False,
+                                 incremental=False, output_dir=output_dir)
+    tracemalloc.start()
+    try:
+        # Progress lines would pile up in a StringIO, so they go nowhere
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            generator.generate_program()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def test_build_memory_does_not_grow_with_program_length(tmp_path):
+    short = peak_build_memory(str(tmp_path / "short"), 60)
+    long = peak_build_memory(str(tmp_path / "long"), 600)
+    assert long < 1.5 * short
@@ -0,0 +1,28 @@
+import contextlib
+import hashlib
+import io
+from html_templates import HTMLTemplates
+from main import ProgramGenerator
+
+def build(output_dir: str, css_mode: str):
+    generator = ProgramGenerator(total_weeks=4, css_mode=css_mode, output_dir=output_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator.generate_program()
+
+def test_pages_link_the_fingerprinted_stylesheet(tmp_path):
+    build(str(tmp_path), HTMLTemplates.CSS_SHARED)
+    [stylesheet] = tmp_path.glob("styles.*.css")
+    fingerprint = hashlib.sha256(stylesheet.read_bytes()).hexdigest()[:10]
+    assert stylesheet.name == f"styles.{fingerprint}.css"
+    pages = list(tmp_path.glob("*.html"))
+    assert len(pages) == 5
+    for page in pages:
+        html = page.read_text(encoding="utf-8")
+        assert f'<link rel="stylesheet" href="{stylesheet.name}">' in html
+        assert "<style>" not in html
+
+def test_inline_build_drops_the_shared_stylesheet(tmp_path):
+    build(str(tmp_path), HTMLTemplates.CSS_SHARED)
+    build(str(tmp_path), HTMLTemplates.CSS_INLINE)
+    assert not list(tmp_path.glob("styles.*.css"))
+    assert "<style>" in (tmp_path / "index.html").read_text(encoding="utf-8")
@@ -0,0 +1,22 @@
+import pytest
+from template_engine import CompiledTemplate
+
+SOURCE = "<h1>{title}</h1>{{literal}}<p>{body}</p><footer>{title}</footer>"
+
+def test_render_matches_str_format():
+    template = CompiledTemplate(SOURCE)
+    values = {"title": "Week 1", "body": "Squat {5x5}"}
+    assert template.render(**values) == SOURCE.format(**values)
+
+def test_iter_render_matches_render():
+    template = CompiledTemplate(SOURCE)
+    streamed = template.iter_render(title="Week 1", body=iter(["<b>", "Squat", "</b>"]))
+    assert ''.join(streamed) == template.render(title="Week 1", body="<b>Squat</b>")
+
+def test_slot_names_mark_each_slot():
+    assert CompiledTemplate("a{x}b{y}{x}").slot_names() == [None, "x", None, "y", "x"]
+
+@pytest.mark.parametrize("source", ["{0}", "{name!r}", "{name:>4}", "{item.attr}"])
+def test_rejects_unsupported_slots(source):
+    with pytest.raises(ValueError, match="Unsupported template slot"):
+        CompiledTemplate(source)
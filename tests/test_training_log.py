@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+import training_log
+from training_log import TrainingLog
+
+HEADER = "reps,athlete,notes,date,lift,weight\n"
+LINES = [
+    "5,ann,,2025-02-17,Squat,225\n",
+    "3,bob,easy,2025-02-17,bench,182.5\n",
+    "\n",
+    "1,ann,,2025-02-20,deadlift,405\r\n",
+]
+
+def write(path, text: str):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(text)
+
+def rows(log: TrainingLog):
+    return [(log.athletes[athlete], str(np.datetime64(int(day), 'D')), log.lifts[lift], float(weight), int(reps))
+            for athlete, day, lift, weight, reps in zip(log.athlete, log.day, log.lift, log.weight, log.reps)]
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = tmp_path / "log.csv"
+    write(path, HEADER + "".join(LINES))
+    return path
+
+def test_parses_columns_in_any_order(log_path, tmp_path):
+    log = TrainingLog(str(log_path), str(tmp_path / "cache"))
+    assert rows(log) == [
+        ("ann", "2025-02-17", "squat", 225.0, 5),
+        ("bob", "2025-02-17", "bench", 182.5, 3),
+        ("ann", "2025-02-20", "deadlift", 405.0, 1),
+    ]
+    assert log.lines == 5
+
+def test_reopening_restores_saved_columns(log_path, tmp_path):
+    first = TrainingLog(str(log_path), str(tmp_path / "cache"))
+    reopened = TrainingLog(str(log_path), str(tmp_path / "cache"))
+    assert reopened.full_parses == 0 and rows(reopened) == rows(first)
+
+def test_appended_lines_are_parsed_incrementally(log_path, tmp_path):
+    log = TrainingLog(str(log_path), str(tmp_path / "cache"))
+    with open(log_path, 'a', encoding='utf-8') as f:
+        f.write("2,cy,,2025-02-21,squat,300\n4,ann,,2025-02-21,bench")
+    # The unfinished last line waits for its newline
+    assert log.update() == 1
+    with open(log_path, 'a', encoding='utf-8') as f:
+        f.write(",200\n")
+    assert log.update() == 1
+    assert log.full_parses == 1
+    fresh = TrainingLog(str(log_path), cache_dir=None)
+    assert rows(log) == rows(fresh)
+
+@pytest.mark.parametrize("edit", [
+    lambda text: text.replace("182.5", "187.5"),
+    lambda text: text.replace("bob", "bo"),
+    lambda text: text[:-len(LINES[-1])],
+])
+def test_edits_to_parsed_lines_reparse_the_file(log_path, tmp_path, edit):
+    log = TrainingLog(str(log_path), str(tmp_path / "cache"))
+    edited = edit(log_path.read_text(encoding='utf-8'))
+    write(log_path, edited + "2,cy,,2025-02-21,squat,300\n")
+    log.update()
+    assert log.full_parses == 2
+    assert rows(log) == rows(TrainingLog(str(log_path), cache_dir=None))
+
+def test_edit_in_the_middle_of_a_large_log_is_noticed(tmp_path, monkeypatch):
+    monkeypatch.setattr(training_log, "CHUNK_BYTES", 1 << 10)
+    path = tmp_path / "log.csv"
+    body = "".join(f"5,ann,,2025-02-17,squat,{200 + n}\n" for n in range(20000))
+    write(path, HEADER + body)
+    log = TrainingLog(str(path), str(tmp_path / "cache"))
+    middle = len(HEADER) + len(body) // 2
+    text = path.read_text(encoding='utf-8')
+    digit = middle + text[middle:].index("squat,") + len("squat,")
+    write(path, text[:digit] + "9" + text[digit + 1:])
+    log.update()
+    assert log.full_parses == 2
+    assert rows(log) == rows(TrainingLog(str(path), cache_dir=None))
+
+@pytest.mark.parametrize("text, message", [
+    ("athlete,date,lift\n", "line 1: missing column(s) weight, reps"),
+    (HEADER + "5,ann,,2025-02-17,squat\n", "line 2: expected 6 fields"),
+    (HEADER + "5,ann,,2025-02-17,squat,225\n5,ann,,2025-02-30,squat,225\n", "line 3: expected a YYYY-MM-DD date"),
+    (HEADER + "5,ann,,2025-02-17,squat,22x\n", "line 2: weight is not a number"),
+    (HEADER + "2.5,ann,,2025-02-17,squat,225\n", "line 2: reps must be a whole number"),
+    (HEADER + '5,"ann",,2025-02-17,squat,225\n', "line 2: quoted fields are not supported"),
+])
+def test_errors_name_the_line(tmp_path, text, message):
+    path = tmp_path / "log.csv"
+    write(path, text)
+    with pytest.raises(ValueError, match=message.replace("(", r"\(").replace(")", r"\)")):
+        TrainingLog(str(path), cache_dir=None)
@@ -0,0 +1,39 @@
+import contextlib
+import io
+import os
+import re
+from main import ProgramGenerator
+from watcher import SourceWatcher
+
+def touch(path, text: str):
+    path.write_text(text, encoding="utf-8")
+    stat = os.stat(path)
+    # Filesystems with coarse timestamps could leave an edit with the same mtime
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+def test_changed_reports_edited_added_and_removed_files(tmp_path):
+    edited, added, removed, untouched = (tmp_path / name for name in ("edited", "added", "removed", "untouched"))
+    for path in (edited, removed, untouched):
+        path.write_text("old", encoding="utf-8")
+    watcher = SourceWatcher([str(path) for path in (edited, added, removed, untouched)])
+    assert watcher.changed() == []
+    touch(edited, "new")
+    added.write_text("", encoding="utf-8")
+    removed.unlink()
+    assert watcher.changed() == [str(edited), str(added), str(removed)]
+    assert watcher.changed() == []
+
+def test_readme_edit_rebuilds_only_the_index(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    touch(tmp_path / "README.md", "# Notes\n")
+
+    def build() -> int:
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            ProgramGenerator(total_weeks=6, output_dir=str(tmp_path / "docs")).generate_program()
+        return int(re.search(r"Files rebuilt: (\d+)", out.getvalue()).group(1))
+
+    build()
+    touch(tmp_path / "README.md", "# Edited notes\n")
+    assert build() == 1
+    assert "Edited notes" in (tmp_path / "docs" / "index.html").read_text(encoding="utf-8")
@@ -0,0 +1,409 @@
+import hashlib
+import json
+import mmap
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Columns a training log must have, in any order; other columns are ignored
+COLUMNS = ("athlete", "date", "lift", "weight", "reps")
+# Bytes parsed per pass; every pass ends at a line break
+CHUNK_BYTES = 1 << 24
+MAX_NAME_BYTES = 64
+MAX_NUMBER_BYTES = 12
+DATE_BYTES = 10
+NEWLINE, CARRIAGE_RETURN, COMMA, QUOTE, DOT, ZERO = (ord(c) for c in '\n\r,".0')
+# Epley estimates drift on long sets, so sets beyond this many reps are left out
+MAX_REPS = 20
+# Weeks of best e1RMs, up to the latest, that the trend is fitted to
+TREND_WEEKS = 8
+# Largest change in the next wave's intensities a trend can make
+MAX_ADJUSTMENT = 0.05
+
+def _first_bad(bad: np.ndarray, line_numbers: np.ndarray, message: str):
+    if bad.any():
+        raise ValueError(f"line {line_numbers[np.argmax(bad)]}: {message}")
+
+def _field_bytes(data: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Gathers variable-length fields into a (rows, longest) byte matrix padded with zeros"""
+    width = int(lengths.max()) if len(lengths) else 1
+    matrix = np.empty((len(starts), width), dtype=np.uint8)
+    last = len(data) - 1
+    for column in range(width):
+        matrix[:, column] = np.where(lengths > column, data[np.minimum(starts + column, last)], 0)
+    return matrix
+
+def _categories(matrix: np.ndarray) -> Tuple[List[str], np.ndarray]:
+    """Returns the distinct values of a byte matrix's rows and each row's index among them.
+
+    Rows are sorted by a 64-bit hash rather than as strings, which is much
+    faster; a hash collision is caught and falls back to sorting strings.
+    """
+    width = -(-matrix.shape[1] // 8) * 8
+    padded = np.zeros((len(matrix), width), dtype=np.uint8)
+    padded[:, :matrix.shape[1]] = matrix
+    words = padded.view(np.uint64)
+    key = words[:, 0].copy()
+    for column in range(1, words.shape[1]):
+        key = key * np.uint64(0x9E3779B97F4A7C15) + words[:, column]
+    _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    if not (words[first][inverse] == words).all():
+        values, inverse = np.unique(padded.view(f"S{width}").ravel(), return_inverse=True)
+        return [value.decode('utf-8') for value in values], inverse.ravel()
+    # Values come in hash order; TrainingLog maps them onto its own codes
+    return [value.decode('utf-8') for value in padded[first].view(f"S{width}").ravel()], inverse
+
+def _numbers(matrix: np.ndarray, lengths: np.ndarray, line_numbers: np.ndarray,
+             name: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Parses unsigned decimals from a byte matrix, returning their values and decimal places"""
+    position = np.arange(matrix.shape[1])
+    inside = position < lengths[:, None]
+    is_dot = matrix == DOT
+    digits = matrix.astype(np.int64) - ZERO
+    is_digit = (digits >= 0) & (digits <= 9)
+    dots = is_dot.sum(axis=1)
+    _first_bad((inside & ~is_digit & ~is_dot).any(axis=1) | (dots > 1) | (lengths == dots),
+               line_numbers, f"{name} is not a number")
+    dot = np.where(dots == 1, is_dot.argmax(axis=1), lengths)
+    # Power of ten of each digit in the number with its dot removed
+    power = lengths[:, None] - 1 - position - (position < dot[:, None]) * (dots[:, None] == 1)
+    mantissa = (np.where(inside & is_digit, digits, 0) * 10 ** np.maximum(power, 0)).sum(axis=1)
+    decimals = np.where(dots == 1, lengths - 1 - dot, 0)
+    # Dividing the exact integer rounds the same way as float() on the text
+    return mantissa / 10.0 ** decimals, decimals
+
+def parse_header(line: bytes) -> Tuple[Dict[str, int], int]:
+    """Returns the position of each required column and the number of fields per line"""
+    names = [name.strip().lower() for name in line.decode('utf-8').rstrip('\r\n').split(',')]
+    missing = [column for column in COLUMNS if column not in names]
+    if missing:
+        raise ValueError(f"line 1: missing column(s) {', '.join(missing)}; expected {', '.join(COLUMNS)}")
+    return {column: names.index(column) for column in COLUMNS}, len(names)
+
+def parse_lines(data: np.ndarray, layout: Dict[str, int], field_count: int, first_line: int) -> Dict:
+    """Parses newline-terminated CSV lines into typed columns.
+
+    Every step works on whole arrays: line and field boundaries come from
+    the positions of newlines and commas, and each column is gathered into
+    a fixed-width byte matrix that is decoded at once. Names come back as
+    per-chunk codes with their values; blank lines are skipped.
+    """
+    if (data == QUOTE).any():
+        line = first_line + np.count_nonzero(data[:np.argmax(data == QUOTE)] == NEWLINE)
+        raise ValueError(f"line {line}: quoted fields are not supported")
+    ends = np.flatnonzero(data == NEWLINE)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    ends = ends - ((ends > starts) & (data[np.maximum(ends - 1, 0)] == CARRIAGE_RETURN))
+    line_numbers = first_line + np.arange(len(ends))
+    keep = ends > starts
+    starts, ends, line_numbers = starts[keep], ends[keep], line_numbers[keep]
+
+    commas = np.flatnonzero(data == COMMA)
+    first_comma = np.searchsorted(commas, starts)
+    _first_bad(np.searchsorted(commas, ends) - first_comma != field_count - 1,
+               line_numbers, f"expected {field_count} fields")
+    separators = commas[first_comma[:, None] + np.arange(field_count - 1)]
+    field_starts = np.column_stack([starts, separators + 1])
+    field_ends = np.column_stack([separators, ends])
+
+    def field(column: str, width: int) -> Tuple[np.ndarray, np.ndarray]:
+        index = layout[column]
+        lengths = field_ends[:, index] - field_starts[:, index]
+        _first_bad(lengths == 0, line_numbers, f"{column} is empty")
+        _first_bad(lengths > width, line_numbers, f"{column} is longer than {width} bytes")
+        return _field_bytes(data, field_starts[:, index], lengths), lengths
+
+    athletes, athlete_codes = _categories(field("athlete", MAX_NAME_BYTES)[0])
+    lift_bytes, _ = field("lift", MAX_NAME_BYTES)
+    # Lift names are matched case-insensitively against the program's lifts
+    upper = (lift_bytes >= ord('A')) & (lift_bytes <= ord('Z'))
+    lifts, lift_codes = _categories(np.where(upper, lift_bytes + 32, lift_bytes).astype(np.uint8))
+
+    date_bytes, date_lengths = field("date", DATE_BYTES)
+    _first_bad(date_lengths < DATE_BYTES, line_numbers, "expected a YYYY-MM-DD date")
+    dates = np.ascontiguousarray(date_bytes).view(f"S{DATE_BYTES}").ravel()
+    try:
+        days = dates.astype('datetime64[D]')
+    except ValueError:
+        # Only now look for the line at fault
+        for row, value in enumerate(dates):
+            try:
+                np.datetime64(value.decode('utf-8', 'replace'), 'D')
+            except ValueError:
+                raise ValueError(f"line {line_numbers[row]}: expected a YYYY-MM-DD date, got {value.decode('utf-8', 'replace')!r}")
+        raise
+
+    weight, _ = _numbers(*field("weight", MAX_NUMBER_BYTES), line_numbers, "weight")
+    reps, rep_decimals = _numbers(*field("reps", MAX_NUMBER_BYTES), line_numbers, "reps")
+    _first_bad(rep_decimals > 0, line_numbers, "reps must be a whole number")
+    return {
+        "athletes": athletes, "athlete": athlete_codes,
+        "lifts": lifts, "lift": lift_codes,
+        "day": days.astype(np.int32),
+        "weight": weight.astype(np.float32),
+        "reps": np.minimum(reps, np.iinfo(np.int16).max).astype(np.int16),
+        "lines": len(keep),
+    }
+
+class TrainingLog:
+    """Typed columns of a CSV training log, kept in step with the file as it grows.
+
+    The file is memory-mapped and parsed with NumPy in chunks that end on a
+    line break, so a log of millions of sets never becomes Python objects.
+    Parsed columns are saved under .cache/training_logs with the byte offset
+    they cover; when the file has only been appended to, update() parses
+    just the new lines. A partial last line waits for its newline.
+    """
+
+    ARRAYS = ("athlete", "lift", "day", "weight", "reps")
+    DTYPES = {"athlete": np.int32, "lift": np.int16, "day": np.int32, "weight": np.float32, "reps": np.int16}
+    # Bumped whenever the saved state changes shape or meaning
+    FORMAT = 2
+
+    def __init__(self, path: str, cache_dir: Optional[str] = os.path.join(".cache", "training_logs")):
+        self.path = os.path.abspath(path)
+        self.cache_dir = cache_dir
+        self.rows_parsed = 0
+        self.full_parses = 0
+        self._reset()
+        if cache_dir is not None:
+            self._restore()
+        self.update()
+
+    def _reset(self):
+        self.offset = 0
+        self.lines = 0
+        self.layout: Optional[Dict[str, int]] = None
+        self.field_count = 0
+        self.athletes: List[str] = []
+        self.lifts: List[str] = []
+        self._athlete_codes: Dict[str, int] = {}
+        self._lift_codes: Dict[str, int] = {}
+        self._fingerprint = ""
+        for name in self.ARRAYS:
+            setattr(self, name, np.zeros(0, dtype=self.DTYPES[name]))
+
+    def __len__(self) -> int:
+        return len(self.athlete)
+
+    @property
+    def state_path(self) -> str:
+        digest = hashlib.sha256(self.path.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.npz")
+
+    @staticmethod
+    def _digest(digest, mapped: mmap.mmap, start: int, end: int):
+        """Adds bytes start to end of the file to digest without copying them out of the map"""
+        with memoryview(mapped) as view, view[start:end] as part:
+            digest.update(part)
+
+    def update(self) -> int:
+        """Parses the lines appended since the last update and returns how many rows they added.
+
+        The whole file is parsed again if it shrank or any of its already
+        parsed bytes changed. Checking costs one hash of the parsed bytes,
+        far less than parsing them.
+        """
+        size = os.path.getsize(self.path)
+        if size == 0:
+            if self.offset:
+                self._reset()
+                self._save()
+            return 0
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # The digest of the parsed bytes carries on over the new ones, so each byte is hashed once
+            digest = hashlib.sha256()
+            if self.offset and size >= self.offset:
+                self._digest(digest, mapped, 0, self.offset)
+            if self.offset and (size < self.offset or digest.hexdigest() != self._fingerprint):
+                self._reset()
+                digest = hashlib.sha256()
+            if self.offset == size:
+                return 0
+            if self.offset == 0:
+                self.full_parses += 1
+            before, offset, lines = len(self), self.offset, self.lines
+            try:
+                chunks = self._parse(mapped, size)
+            except ValueError:
+                self.offset, self.lines = offset, lines
+                raise
+            if self.offset == offset and offset:
+                return 0
+            self._append(chunks)
+            self._digest(digest, mapped, offset, self.offset)
+            self._fingerprint = digest.hexdigest()
+        self._save()
+        added = len(self) - before
+        self.rows_parsed += added
+        return added
+
+    def _parse(self, mapped: mmap.mmap, size: int) -> List[Dict]:
+        if self.offset == 0:
+            header_end = mapped.find(b'\n')
+            if header_end == -1:
+                return []
+            self.layout, self.field_count = parse_header(mapped[:header_end + 1])
+            self.offset = header_end + 1
+            self.lines = 1
+        chunks = []
+        while self.offset < size:
+            end = mapped.rfind(b'\n', self.offset, min(self.offset + CHUNK_BYTES, size))
+            if end == -1:
+                # A line longer than a chunk, or the unfinished last line
+                end = mapped.find(b'\n', self.offset + CHUNK_BYTES, size)
+                if end == -1:
+                    break
+            # Slicing copies the chunk out of the map, so no array holds the map open
+            data = np.frombuffer(mapped[self.offset:end + 1], dtype=np.uint8)
+            chunk = parse_lines(data, self.layout, self.field_count, self.lines + 1)
+            chunks.append(chunk)
+            self.offset = end + 1
+            self.lines += chunk["lines"]
+        return chunks
+
+    def _append(self, chunks: Sequence[Dict]):
+        """Maps each chunk's name codes onto the log's and appends the columns"""
+        columns = {name: [getattr(self, name)] for name in self.ARRAYS}
+        for chunk in chunks:
+            for names, codes, column in ((self.athletes, self._athlete_codes, "athlete"),
+                                         (self.lifts, self._lift_codes, "lift")):
+                mapping = np.empty(len(chunk[f"{column}s"]), dtype=self.DTYPES[column])
+                for index, name in enumerate(chunk[f"{column}s"]):
+                    if name not in codes:
+                        codes[name] = len(names)
+                        names.append(name)
+                    mapping[index] = codes[name]
+                chunk[column] = mapping[chunk[column]]
+            for name in self.ARRAYS:
+                columns[name].append(chunk[name].astype(self.DTYPES[name], copy=False))
+        for name in self.ARRAYS:
+            setattr(self, name, np.concatenate(columns[name]))
+
+    def _restore(self):
+        """Loads the saved columns, if any, leaving a fresh log when they are missing or stale"""
+        try:
+            with np.load(self.state_path, allow_pickle=False) as saved:
+                meta = json.loads(saved["meta"].tobytes().decode('utf-8'))
+                if meta["format"] != self.FORMAT:
+                    return
+                arrays = {name: saved[name] for name in self.ARRAYS}
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            return
+        self.offset, self.lines = meta["offset"], meta["lines"]
+        self.layout, self.field_count = meta["layout"], meta["field_count"]
+        self._fingerprint = meta["fingerprint"]
+        self.athletes, self.lifts = meta["athletes"], meta["lifts"]
+        self._athlete_codes = {name: code for code, name in enumerate(self.athletes)}
+        self._lift_codes = {name: code for code, name in enumerate(self.lifts)}
+        for name, values in arrays.items():
+            setattr(self, name, values)
+
+    def _save(self):
+        """Writes the columns and their offset atomically"""
+        if self.cache_dir is None:
+            return
+        meta = {
+            "format": self.FORMAT, "offset": self.offset, "lines": self.lines,
+            "layout": self.layout, "field_count": self.field_count,
+            "fingerprint": self._fingerprint,
+            "athletes": self.athletes, "lifts": self.lifts,
+        }
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            np.savez(f, meta=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8),
+                     **{name: getattr(self, name) for name in self.ARRAYS})
+        os.replace(temp_path, self.state_path)
+
+def estimated_one_rep_maxes(weight: np.ndarray, reps: np.ndarray) -> np.ndarray:
+    """Epley estimate of the one-rep max of each set; a single is its own max"""
+    weight = weight.astype(float)
+    return np.where(reps == 1, weight, weight * (1 + reps / 30.0))
+
+def trends(log: TrainingLog, as_of: Optional[np.datetime64] = None) -> Dict[str, np.ndarray]:
+    """Fits each athlete's recent e1RM trend per lift.
+
+    Takes every week's best e1RM per (athlete, lift), then a least-squares
+    line through the last TREND_WEEKS weeks up to that pair's latest week.
+    Returns one row per pair: codes into log.athletes and log.lifts, the
+    fitted e1RM at the latest week, its slope in weight per week, the
+    number of weeks fitted and the Monday of the latest week.
+    """
+    valid = (log.reps >= 1) & (log.reps <= MAX_REPS) & (log.weight > 0)
+    if as_of is not None:
+        valid &= log.day <= np.datetime64(as_of, 'D').astype(np.int64)
+    group = log.athlete[valid].astype(np.int64) * max(len(log.lifts), 1) + log.lift[valid]
+    # Weeks start on Monday; day 0, 1970-01-01, was a Thursday
+    week = (log.day[valid].astype(np.int64) + 3) // 7
+    e1rm = estimated_one_rep_maxes(log.weight[valid], log.reps[valid])
+    if not len(group):
+        empty = np.zeros(0)
+        return {"athlete": empty.astype(np.int32), "lift": empty.astype(np.int16), "e1rm": empty,
+                "slope": empty, "weeks": empty.astype(np.int64), "week_start": empty.astype('datetime64[D]')}
+
+    # Best e1RM per (group, week), with pairs sorted by group then week
+    week_offset = week - week.min()
+    key = group * (int(week_offset.max()) + 1) + week_offset
+    order = np.argsort(key, kind='stable')
+    key = key[order]
+    starts = np.flatnonzero(np.concatenate(([True], key[1:] != key[:-1])))
+    best = np.maximum.reduceat(e1rm[order], starts)
+    point_group = group[order][starts]
+    point_week = week[order][starts]
+
+    groups, first_point = np.unique(point_group, return_index=True)
+    last_point = np.append(first_point[1:], len(point_group)) - 1
+    index = np.repeat(np.arange(len(groups)), np.diff(np.append(first_point, len(point_group))))
+    # Weeks relative to the latest, so the fitted value at 0 is the current e1RM
+    x = (point_week - point_week[last_point][index]).astype(float)
+    window = x > -TREND_WEEKS
+    n = np.bincount(index, window, len(groups))
+    sx = np.bincount(index, window * x, len(groups))
+    sy = np.bincount(index, window * best, len(groups))
+    sxx = np.bincount(index, window * x * x, len(groups))
+    sxy = np.bincount(index, window * x * best, len(groups))
+    spread = n * sxx - sx * sx
+    fitted = spread > 0
+    slope = np.where(fitted, (n * sxy - sx * sy) / np.where(fitted, spread, 1), 0.0)
+    e1rm_now = np.where(fitted, (sy - slope * sx) / n, best[last_point])
+    lift_count = max(len(log.lifts), 1)
+    return {
+        "athlete": (groups // lift_count).astype(np.int32),
+        "lift": (groups % lift_count).astype(np.int16),
+        "e1rm": e1rm_now,
+        "slope": slope,
+        "weeks": n.astype(np.int64),
+        "week_start": (point_week[last_point] * 7 - 3).astype('datetime64[D]'),
+    }
+
+def wave_scales(e1rm: np.ndarray, slope: np.ndarray, wave_length: int = 4,
+                limit: float = MAX_ADJUSTMENT) -> np.ndarray:
+    """Scales the next wave's intensities by the e1RM the trend projects to its middle week.
+
+    The change is capped at limit either way, so one noisy block cannot
+    swing a whole wave.
+    """
+    projected = slope * (wave_length + 1) / 2
+    return 1 + np.clip(projected / np.maximum(e1rm, 1e-9), -limit, limit)
+
+def next_wave(log: TrainingLog, program=None, as_of: Optional[np.datetime64] = None) -> Dict[str, np.ndarray]:
+    """Returns trends() with each pair's intensity scale and adjusted intensities for the next wave.
+
+    Intensities are fractions of the e1RM, one column per week of the
+    program's wave; RPE weeks, and lifts the program has no wave for, are NaN.
+    """
+    if program is None:
+        from program_definition import load_program
+
+        program = load_program()
+    result = trends(log, as_of)
+    waves = np.full((max(len(log.lifts), 1), program.wave_length), np.nan)
+    for code, lift in enumerate(log.lifts):
+        for week, exercise in enumerate(program.waves.get(lift, ())):
+            if isinstance(exercise.intensity, float):
+                waves[code, week] = exercise.intensity
+    result["scale"] = wave_scales(result["e1rm"], result["slope"], program.wave_length)
+    result["intensities"] = waves[result["lift"]] * result["scale"][:, None]
+    return result
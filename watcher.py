@@ -0,0 +1,96 @@
+import importlib
+import importlib.util
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Project modules in dependency order, so reloading them in turn leaves no
+# module holding classes from a stale copy of another
+RELOAD_ORDER = [
+    "models", "fragment_cache", "template_engine", "build_manifest", "readme_cache",
+    "program_definition", "program_builder", "program_sequence", "html_templates", "html_minifier", "search_index",
+    "app_shell", "precompress", "main"
+]
+# Modules whose source shapes the generated files; builds hash them into every page's digest
+SOURCE_MODULES = [
+    "models", "template_engine", "program_definition", "program_builder", "program_sequence", "html_templates",
+    "html_minifier", "search_index", "app_shell", "precompress", "main"
+]
+
+FileState = Tuple[int, int]
+
+class SourceWatcher:
+    """Polls files for changes by modification time and size"""
+
+    def __init__(self, paths: Sequence[str]):
+        self.paths = list(paths)
+        self.states: Dict[str, Optional[FileState]] = {path: self.stat(path) for path in self.paths}
+
+    @staticmethod
+    def stat(path: str) -> Optional[FileState]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def changed(self) -> List[str]:
+        """Returns the paths that changed, appeared or disappeared since the last call"""
+        changed = []
+        for path in self.paths:
+            state = self.stat(path)
+            if state != self.states[path]:
+                self.states[path] = state
+                changed.append(path)
+        return changed
+
+
+def source_paths() -> List[str]:
+    """Returns the source files of the modules that shape the generated files.
+
+    The files are found without importing the modules, so a build hashing
+    them does not load the ones its options leave unused.
+    """
+    return [os.path.abspath(importlib.util.find_spec(name).origin) for name in SOURCE_MODULES]
+
+def reload_sources():
+    """Reloads the project modules, dependencies first"""
+    for name in RELOAD_ORDER:
+        module = sys.modules.get(name)
+        if module is not None:
+            importlib.reload(module)
+
+def watch(make_generator: Callable[[], object], readme_path: str = "README.md", interval: float = 0.25,
+          program_path: Optional[str] = None):
+    """Builds once, then rebuilds whenever the README, the program definition or a source module changes.
+
+    A changed source is reloaded before the rebuild. The build manifest then
+    decides what is actually rewritten: a README edit only touches index.html,
+    a progression change only the weeks whose content differs, and a template
+    change every page. The definition defaults to the bundled one.
+    """
+    if program_path is None:
+        program_path = importlib.import_module("program_definition").DEFAULT_DEFINITION
+    make_generator().generate_program()
+    watcher = SourceWatcher([os.path.abspath(readme_path), os.path.abspath(program_path)] + source_paths())
+    print(f"\nWatching {len(watcher.paths)} files for changes (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(interval)
+            changed = watcher.changed()
+            if not changed:
+                continue
+            print(f"\nChanged: {', '.join(os.path.relpath(path) for path in changed)}")
+            start = time.perf_counter()
+            try:
+                if any(path.endswith('.py') for path in changed):
+                    reload_sources()
+                make_generator().generate_program()
+            except Exception as exc:
+                # Usually a half-saved edit; the next save triggers another try
+                print(f"Rebuild failed: {type(exc).__name__}: {exc}")
+                continue
+            print(f"Rebuilt in {(time.perf_counter() - start) * 1000:.1f} ms")
+    except KeyboardInterrupt:
+        print("\nStopped watching")